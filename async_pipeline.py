@@ -0,0 +1,631 @@
+# async_pipeline.py
+import asyncio
+import concurrent.futures
+import threading
+import time
+import traceback
+from google.api_core.exceptions import OutOfRange
+from config import (SEND_CHUNK, RECOGNIZER_BACKEND, PIPELINE_MODE, INTERIM_DEBOUNCE_SEC, CLIENT_WARMUP_TIMEOUT_SEC, CLIENT_HEALTH_CHECK_TIMEOUT_SEC,
+                    TRANSLATION_MAX_PENDING, TRANSLATION_WORKERS, TRANSLATION_BATCH_MAX_SIZE, TRANSLATION_BATCH_MAX_DELAY_SEC)
+from speech_recognizer import AsyncSpeechRecognizer
+from replay_recognizer import ReplayRecognizer
+from translator_service import TranslatorService
+from incremental_translator import StablePrefixTracker
+from translation_session import TranslationSession, parse_recognition
+
+class AsyncPipelineRuntime:
+    """
+    asyncio 파이프라인이 도는 이벤트 루프 스레드 (여러 세션이 하나를 공유).
+    큐 폴링 대신 데이터가 들어올 때만 깨어나므로 유휴 중 CPU를 쓰지 않고, 중지는 태스크 취소로 바로 전달됩니다.
+    """
+    def __init__(self, client_pool=None, executor=None, name="AsyncPipelineLoop"):
+        """
+        client_pool: SpeechAsyncClient를 만들 ClientPool (google 백엔드)
+        executor: 블로킹 호출(번역 API)을 실행할 스레드 풀. 없으면 루프 기본 풀
+        """
+        self.client_pool = client_pool
+        self.executor = executor
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self._thread = None
+        self._lock = threading.Lock()
+        # 공유 SpeechAsyncClient와 빌려 쓰는 세션 수 (루프 스레드에서만 접근)
+        self._speech_client = None
+        self._speech_leases = {} # id(클라이언트) -> 빌려 쓰는 세션 수
+        self._retired_speech_clients = {} # id -> 교체됐지만 아직 쓰는 세션이 있어 닫지 않은 클라이언트
+        self.reconnects = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive(): return
+            self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """코루틴을 루프에서 실행 (어느 스레드에서나 호출 가능). concurrent.futures.Future 반환"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, func, *args, timeout=None):
+        """동기 함수를 루프 스레드에서 실행하고 결과를 기다림 (루프에 묶이는 객체 생성용)"""
+        async def _call(): return func(*args)
+        return self.submit(_call()).result(timeout)
+
+    def warm_up_async(self):
+        """앱 시작 시 호출: 세션들이 쓸 SpeechAsyncClient를 루프에서 미리 만들고 채널 연결 (첫 시작의 자격 증명 로드/채널 연결/TLS 대기 제거)"""
+        if not (self.client_pool and self.client_pool.speech_async_factory): return
+        self.start()
+        self.submit(self._prepare_speech_client(CLIENT_WARMUP_TIMEOUT_SEC, "예열"))
+
+    def check_health_async(self):
+        """녹음 시작 시 호출: 공유 SpeechAsyncClient 채널 상태 점검을 루프에서 실행 (호출한 Tk 스레드를 막지 않음). 연결되지 않으면 교체"""
+        if not (self.client_pool and self.client_pool.speech_async_factory): return
+        self.start()
+        self.submit(self._prepare_speech_client(CLIENT_HEALTH_CHECK_TIMEOUT_SEC, "상태 점검"))
+
+    async def _prepare_speech_client(self, timeout, purpose):
+        """공유 클라이언트를 (없으면 만들고) 채널 연결까지 대기. 연결되지 않으면 새 클라이언트로 교체해 한 번 더 대기"""
+        start = time.monotonic()
+        try:
+            if self._speech_client is None: self._speech_client = self.client_pool.create_speech_async_client()
+            client = self._speech_client
+            if await self._wait_speech_channel(client, timeout):
+                print(f"Speech 비동기 클라이언트 {purpose} 완료 ({time.monotonic() - start:.2f}초)")
+                return True
+            print(f"Speech 비동기 채널 {purpose} 실패, 재연결 시도...")
+            self.reset_speech_client(client) # 대기 중 다른 세션이 이미 교체했으면 그대로 둠
+            if self._speech_client is None:
+                self._speech_client = self.client_pool.create_speech_async_client()
+                self.reconnects += 1
+                print(f"Speech 비동기 클라이언트 재연결 완료 (누적 {self.reconnects}회)")
+            return await self._wait_speech_channel(self._speech_client, timeout)
+        except Exception as e:
+            print(f"Speech 비동기 클라이언트 {purpose} 실패: {e}")
+            traceback.print_exc()
+            return False
+
+    @staticmethod
+    async def _wait_speech_channel(client, timeout):
+        """grpc.aio 채널이 연결될 때까지 대기 (연결 시도 유발). 연결되면 True, 확인할 채널이 없으면 True"""
+        channel = getattr(getattr(client, 'transport', None), 'grpc_channel', None)
+        if channel is None: return True
+        try:
+            await asyncio.wait_for(channel.channel_ready(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def acquire_speech_client(self):
+        """루프 스레드에서 호출: 모든 세션이 공유하는 SpeechAsyncClient를 빌림 (없으면 생성, 다 쓰면 release_speech_client로 반납)"""
+        if self._speech_client is None: self._speech_client = self.client_pool.create_speech_async_client()
+        client = self._speech_client
+        if client is not None: self._speech_leases[id(client)] = self._speech_leases.get(id(client), 0) + 1
+        return client
+
+    def release_speech_client(self, client):
+        """루프 스레드에서 호출: 빌린 클라이언트 반납. 교체된 클라이언트는 마지막으로 쓰던 세션이 반납할 때 닫음"""
+        if client is None: return
+        count = self._speech_leases.pop(id(client), 0) - 1
+        if count > 0:
+            self._speech_leases[id(client)] = count
+            return
+        retired = self._retired_speech_clients.pop(id(client), None)
+        if retired is not None: self._close_client(retired)
+
+    def reset_speech_client(self, failed=None):
+        """
+        스트림 오류 후 다음 인식기는 새 채널을 쓰도록 공유 클라이언트를 버림 (루프 스레드에서 호출).
+        failed: 오류가 난 스트림이 쓰던 클라이언트. 다른 세션이 이미 버렸으면(현재 클라이언트가 아니면) 그대로 둡니다.
+        다른 세션의 스트림이 아직 쓰고 있으면 닫지 않고, 마지막 세션이 반납할 때 닫습니다.
+        """
+        old = self._speech_client
+        if old is None or (failed is not None and failed is not old): return
+        self._speech_client = None
+        if self._speech_leases.get(id(old)): self._retired_speech_clients[id(old)] = old
+        else: self._close_client(old)
+
+    def _close_client(self, client):
+        transport = getattr(client, 'transport', None)
+        if transport is not None: asyncio.ensure_future(self._close_transport(transport))
+
+    @staticmethod
+    async def _close_transport(transport):
+        try: await transport.close()
+        except Exception as e: print(f"Speech 비동기 클라이언트 닫기 중 오류: {e}")
+
+    def close(self, timeout=2.0):
+        """남은 태스크 취소, 클라이언트 정리 후 루프 스레드 종료"""
+        if not (self._thread and self._thread.is_alive()):
+            self.loop.close()
+            return
+        async def _shutdown():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks: t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            clients = [self._speech_client, *self._retired_speech_clients.values()]
+            self._speech_client = None
+            self._speech_leases.clear()
+            self._retired_speech_clients.clear()
+            for client in clients:
+                transport = getattr(client, 'transport', None) if client else None
+                if transport is not None: await self._close_transport(transport)
+            await self.loop.shutdown_default_executor() # WAV 재생 등 블로킹 작업 스레드
+        try: self.submit(_shutdown()).result(timeout)
+        except Exception as e: print(f"이벤트 루프 정리 중 오류: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if self._thread.is_alive(): print(f"  경고: {self._thread.name} 스레드가 시간 내에 종료되지 않음.")
+        else: self.loop.close()
+
+
+class AsyncAudioBridge:
+    """
+    오디오 스레드(PortAudio 콜백, WAV 재생) -> 이벤트 루프 브리지.
+    데이터는 기존 링 버퍼(미리 할당된 슬롯, 오버플로우 정책)에 그대로 두고 루프를 깨우는 알림만 넘깁니다.
+    전송 단위(SEND_CHUNK)가 모이거나 버퍼가 닫힐 때만, 그리고 이미 예약된 깨우기가 없을 때만 call_soon_threadsafe를 호출합니다.
+    """
+    def __init__(self, loop, audio_buffer):
+        self.loop = loop
+        self.audio_buffer = audio_buffer
+        self._ready = asyncio.Event()
+        self._min_bytes = 1
+        self._wakeup_scheduled = False
+        self.wakeups = 0
+        audio_buffer.set_listener(self._notify)
+
+    def _notify(self, buffered, closed):
+        """오디오 스레드에서 호출"""
+        if self._wakeup_scheduled or (buffered < self._min_bytes and not closed): return
+        self._wakeup_scheduled = True
+        try: self.loop.call_soon_threadsafe(self._wake)
+        except RuntimeError: pass # 루프 종료됨
+
+    def _wake(self):
+        self._wakeup_scheduled = False
+        self.wakeups += 1
+        self._ready.set()
+
+    async def read(self, max_bytes):
+        """max_bytes만큼 모이면 꺼내서 반환. 버퍼가 닫히면 남은 데이터를, 다 읽었으면 None 반환"""
+        buffer = self.audio_buffer
+        self._min_bytes = max_bytes
+        while True:
+            self._ready.clear()
+            if buffer.closed or buffer.buffered_bytes() >= self._min_bytes:
+                return buffer.get_many(max_bytes, timeout=0)
+            await self._ready.wait()
+
+    def detach(self):
+        self.audio_buffer.set_listener(None)
+
+
+class AsyncBatchTranslationCollector:
+    """
+    BatchTranslationCollector의 asyncio 버전: 번역할 텍스트를 모아 TranslatorService.translate_batch 한 번으로 보냅니다.
+    묶음은 max_batch_size개가 모이거나 첫 텍스트 후 max_delay_sec가 지나면 전송되고(loop.call_later 타이머),
+    API 호출은 스레드 풀에서 실행하며 동시에 보내는 묶음은 max_concurrent개 이하입니다.
+    submit()/started()/close()는 이벤트 루프 스레드에서 호출합니다.
+    """
+    def __init__(self, translator, executor=None, max_batch_size=TRANSLATION_BATCH_MAX_SIZE,
+                 max_delay_sec=TRANSLATION_BATCH_MAX_DELAY_SEC, max_concurrent=TRANSLATION_WORKERS):
+        self.translator = translator
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_delay_sec = max_delay_sec
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._pending = [] # (text, future)
+        self._sent = set() # API 호출이 시작된 묶음의 future
+        self._flush_handle = None
+        self._tasks = set()
+        # 통계
+        self.batches_sent = 0
+        self.texts_sent = 0
+
+    def submit(self, text):
+        """번역 요청 접수. 결과를 담을 asyncio.Future 반환 (전송 전에 취소하면 묶음에서 빠짐)"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size: self._flush()
+        elif self._flush_handle is None: self._flush_handle = asyncio.get_running_loop().call_later(self.max_delay_sec, self._flush)
+        return future
+
+    def started(self, future):
+        """future가 든 묶음의 API 호출이 이미 시작됐으면 True"""
+        return future in self._sent
+
+    def _flush(self):
+        if self._flush_handle: self._flush_handle.cancel()
+        self._flush_handle = None
+        while self._pending:
+            batch = [(text, future) for text, future in self._pending[:self.max_batch_size] if not future.done()]
+            del self._pending[:self.max_batch_size]
+            if not batch: continue
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch):
+        async with self._slots:
+            # 대기 중 취소된(대체된 중간 결과 등) 요청은 제외
+            live = [(text, future) for text, future in batch if not future.done()]
+            if not live: return
+            futures = [future for _, future in live]
+            self._sent.update(futures)
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(self.executor, self.translator.translate_batch, [text for text, _ in live])
+            except Exception as e:
+                for future in futures:
+                    if not future.done(): future.set_exception(e)
+                return
+            finally:
+                self._sent.difference_update(futures)
+            self.batches_sent += 1
+            self.texts_sent += len(live)
+            for future, translated in zip(futures, results):
+                if not future.done(): future.set_result(translated)
+
+    def close(self):
+        """타이머와 아직 보내지 않은 요청 취소"""
+        if self._flush_handle: self._flush_handle.cancel()
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for _, future in pending: future.cancel()
+        for task in list(self._tasks): task.cancel()
+
+    def stats_summary(self):
+        avg = (self.texts_sent / self.batches_sent) if self.batches_sent else 0.0
+        return f"번역 요청 {self.batches_sent}회, 문장 {self.texts_sent}건 (요청당 평균 {avg:.1f}건)"
+
+
+class AsyncTranslationLane:
+    """
+    TranslationLane의 asyncio 버전 (번역 언어 하나).
+    중간 결과 병합(latest-wins + debounce)은 loop.call_later 타이머로, 언어별 순서 보장은 번역 태스크를 제출 순서대로
+    기다리는 게시 태스크(run)로 처리하므로 언어마다 상주 스레드가 없습니다.
+    번역할 문장은 AsyncBatchTranslationCollector가 모아 묶음 요청으로 보내며(연달아 나온 최종 결과도 한 요청),
+    translate_v2에는 비동기 클라이언트가 없어 번역 API 호출만 공유 스레드 풀에서 실행합니다.
+    submit()/finish()/close()는 이벤트 루프 스레드에서 호출합니다.
+    """
+    def __init__(self, source_lang, target_lang, translate_client, translation_cache, latency, publish, executor=None,
+                 debounce_sec=INTERIM_DEBOUNCE_SEC, max_pending=TRANSLATION_MAX_PENDING, max_concurrent=TRANSLATION_WORKERS, guard=None):
+        self.target_lang = target_lang
+        self.translator = TranslatorService(source_lang, target_lang, cache=translation_cache,
+                                            client=translate_client, latency=latency, guard=guard)
+        self.prefix_tracker = StablePrefixTracker(target_lang, cached=translation_cache is not None)
+        self.latency = latency
+        self.publish = publish
+        self.batcher = AsyncBatchTranslationCollector(self.translator, executor=executor, max_concurrent=max_concurrent)
+        self.debounce_sec = debounce_sec
+        self.max_pending = max_pending
+        self._ordered = asyncio.Queue() # (번역 태스크, 원문, is_final, 제출 시각), None이면 종료
+        self._tasks = set() # 완료되지 않은 번역 태스크
+        self._queued_interims = [] # (번역 태스크, segment future 목록)
+        self._pending_interim = None
+        self._last_interim_text = None
+        self._last_dispatch = 0.0
+        self._debounce_handle = None
+        self._pending_count = 0
+        # 통계
+        self.received_interims = 0
+        self.superseded_interims = 0
+        self.dispatched_interims = 0
+        self.dispatched_finals = 0
+        self.dropped_interims = 0
+        self.cancelled_interims = 0
+
+    def submit(self, transcript, stable_length, is_final):
+        # 안정된 완결 문장은 이전 번역 재사용, 불안정한 꼬리만 새로 번역 (증분 번역)
+        segments = self.prefix_tracker.segment(transcript, stable_length, is_final)
+        if is_final:
+            # 대기 중인 중간 결과는 버리고 즉시 번역, 다음 발화의 첫 중간 결과는 바로 전달
+            if self._pending_interim is not None: self.superseded_interims += 1
+            self._pending_interim = None
+            self._cancel_debounce()
+            self._dispatch(transcript, segments, True)
+            self._last_interim_text = None
+            self._last_dispatch = 0.0
+            return
+        self.received_interims += 1
+        if self._pending_interim is not None: self.superseded_interims += 1
+        if transcript == self._last_interim_text:
+            # 안정도만 달라지고 텍스트는 같은 중간 결과는 다시 번역하지 않음
+            self._pending_interim = None
+            return
+        self._pending_interim = (transcript, segments)
+        if self._debounce_handle is None:
+            loop = asyncio.get_running_loop()
+            self._debounce_handle = loop.call_later(max(0.0, self._last_dispatch + self.debounce_sec - loop.time()), self._flush_interim)
+
+    def _flush_interim(self):
+        self._debounce_handle = None
+        if self._pending_interim is None: return
+        (transcript, segments), self._pending_interim = self._pending_interim, None
+        self._last_interim_text = transcript
+        self._last_dispatch = asyncio.get_running_loop().time()
+        self._dispatch(transcript, segments, False)
+
+    def _cancel_debounce(self):
+        if self._debounce_handle: self._debounce_handle.cancel()
+        self._debounce_handle = None
+
+    def _dispatch(self, transcript, segments, is_final):
+        # 새 작업이 들어오면 아직 API 호출을 시작하지 않은 이전 중간 결과 번역은 취소 (latest-wins, 묶음에서도 빠짐)
+        for task, futures in self._queued_interims:
+            if not any(self.batcher.started(future) for future in futures) and task.cancel():
+                for future in futures: future.cancel()
+                self.cancelled_interims += 1
+        self._queued_interims = []
+        if not is_final and self._pending_count >= self.max_pending:
+            self.dropped_interims += 1
+            return
+        self.prefix_tracker.note_dispatched(transcript, segments, is_final)
+        segments = segments or [transcript]
+        futures = [self.batcher.submit(text) for text in segments]
+        task = asyncio.create_task(self._translate(futures))
+        self._pending_count += 1 # run()에서 게시(또는 취소 확인)한 뒤 감소
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if is_final: self.dispatched_finals += 1
+        else:
+            self.dispatched_interims += 1
+            self._queued_interims.append((task, futures))
+        self._ordered.put_nowait((task, transcript, is_final, time.monotonic()))
+
+    async def _translate(self, futures):
+        translations = await asyncio.gather(*futures)
+        return self.prefix_tracker.join(translations) if len(futures) > 1 else translations[0]
+
+    async def run(self):
+        """게시 태스크: 제출 순서대로 번역 완료를 기다려 publish. finish() 이후 남은 결과를 모두 내보내면 종료"""
+        while True:
+            entry = await self._ordered.get()
+            if entry is None: return
+            task, transcript, is_final, submitted_at = entry
+            await asyncio.wait([task]) # 이 태스크가 취소돼도 번역 태스크는 취소하지 않음
+            self._pending_count -= 1
+            if task.cancelled(): continue
+            if self.latency: self.latency.record_since("translate", submitted_at)
+            try:
+                translated_text = task.result()
+                if translated_text is None: translated_text = "[번역 실패]"
+            except Exception as e:
+                print(f"  [오류] 번역 중 오류 발생 (텍스트: '{transcript}'): {e}")
+                traceback.print_exception(e)
+                translated_text = "[번역 오류]"
+            try: self.publish(transcript, translated_text, is_final, self.target_lang)
+            except Exception as e:
+                print(f"[{self.target_lang}] 결과 게시 오류: {e}")
+                traceback.print_exc()
+
+    def finish(self):
+        """인식 스트림이 끝남: 대기 중인 중간 결과는 버리고, 이미 제출한 번역을 모두 게시한 뒤 run() 종료"""
+        self._cancel_debounce()
+        self._pending_interim = None
+        self._ordered.put_nowait(None)
+
+    def close(self):
+        """세션 중지: 타이머와 남은 번역 태스크 취소"""
+        self._cancel_debounce()
+        self._pending_interim = None
+        self.batcher.close()
+        for task in list(self._tasks): task.cancel()
+
+    def pending_count(self):
+        return self._pending_count
+
+    def print_stats(self):
+        print(f"[{self.target_lang}] 번역 스케줄러 통계: 중간 결과 수신 {self.received_interims}건, 번역 요청 {self.dispatched_interims}건 "
+              f"(병합/생략 {self.superseded_interims}건, 취소 {self.cancelled_interims}건, 버림 {self.dropped_interims}건), "
+              f"최종 결과 {self.dispatched_finals}건")
+        print(f"[{self.target_lang}] 증분 번역 통계: {self.prefix_tracker.stats_summary()}")
+        print(f"[{self.target_lang}] 묶음 번역 통계: {self.batcher.stats_summary()}")
+        if self.translator.fallbacks: print(f"[{self.target_lang}] 번역 실패로 대체 텍스트 표시 {self.translator.fallbacks}건")
+
+
+class AsyncTranslationSession(TranslationSession):
+    """
+    TranslationSession과 같은 인터페이스(start/stop/join/is_busy/stats, on_result/on_error)의 asyncio 파이프라인.
+    오디오 알림 -> VAD -> 스트리밍 인식 -> 번역 언어별 lane을 공유 이벤트 루프의 태스크 묶음(TaskGroup)으로 돌립니다.
+    한 태스크가 실패하거나 stop()이 호출되면 묶음 전체가 즉시 취소되며, 세션 전용 스레드와 폴링 대기가 없습니다.
+    콜백은 이벤트 루프 스레드에서 호출되므로 오래 걸리는 처리는 호출 측에서 다른 스레드로 넘겨야 합니다.
+    """
+    def __init__(self, source_lang, target_langs, client_pool, on_result, runtime, **kwargs):
+        """runtime: 세션들이 공유하는 AsyncPipelineRuntime. 나머지 인자는 TranslationSession과 같음"""
+        super().__init__(source_lang, target_langs, client_pool, on_result, **kwargs)
+        self.runtime = runtime
+        self.bridge = None
+        self._future = None
+        self._streaming = False # 인식 태스크 진행 중
+
+    def start(self):
+        """인식기/번역 lane 생성, 오디오 입력 열기, 세션 태스크 시작. 실패 시 예외 발생 (세션은 '중지' 상태 유지)"""
+        if self._active: raise RuntimeError(f"{self.name}: 이미 실행 중입니다.")
+        print(f"[{self.name}] Recognizer ({self.source_lang}) 및 Translator ({self.source_lang} -> {', '.join(self.target_langs)}) 초기화 (asyncio)...")
+        self.runtime.start()
+        translate_client = self.client_pool.get_translate_client()
+        self.lanes = [AsyncTranslationLane(self.source_lang, target_lang, translate_client, self.translation_cache, self.latency, self._publish,
+                                           executor=self.translate_executor or self.runtime.executor,
+                                           guard=self.client_pool.translate_guard)
+                      for target_lang in self.target_langs]
+
+        buffer = self.audio_recorder.audio_buffer
+        buffer.reset()
+        if self.vad_gate: self.vad_gate.reset()
+        self.latency.reset_utterance()
+        self._open_journal()
+        self.bridge = AsyncAudioBridge(self.runtime.loop, buffer)
+        try:
+            # Speech 클라이언트를 빌리는 인식기는 마지막에 생성 (실패하면 아래에서 반납)
+            self.recognizer = self.runtime.call(self._create_recognizer)
+            if self.audio_source: print(f"[{self.name}] 오디오 장치 대신 {type(self.audio_source).__name__} 사용")
+            else: self.audio_recorder.open_stream(self.device_index)
+        except Exception:
+            self.bridge.detach()
+            self._close_journal()
+            self.runtime.call(self._release_speech_client)
+            raise
+
+        self.stop_event.clear()
+        self._active = True
+        self.started_at = time.monotonic()
+        self._streaming = True
+        self._future = self.runtime.submit(self._run())
+
+    def stop(self):
+        """스트림 닫기, 세션 태스크 취소, 통계 출력"""
+        if not self._active: return
+        self._active = False
+        print(f"[{self.name}] 중지 요청...")
+        self.stop_event.set()
+        if self._future: self._future.cancel() # 루프에 취소 전달 (대기 중인 await에서 바로 CancelledError)
+        self.audio_recorder.stop()
+        print(self.audio_recorder.audio_buffer.stats_summary())
+        if self.vad_gate: print(self.vad_gate.stats_summary())
+        upload_summary = self.recognizer.stats_summary() if self.recognizer else None
+        if upload_summary: print(f"[{self.name}] {upload_summary}")
+        self.audio_recorder.audio_buffer.close()
+        self._close_journal()
+        if self.bridge:
+            print(f"[{self.name}] 이벤트 루프 깨우기 {self.bridge.wakeups}회")
+            self.bridge.detach()
+        for lane in self.lanes: lane.print_stats()
+
+    def join(self, timeout=2.0):
+        """세션 태스크 종료 대기"""
+        if self._future and not self._future.done():
+            concurrent.futures.wait([self._future], timeout=timeout)
+            if not self._future.done(): print(f"  경고: [{self.name}] 세션 태스크가 시간 내에 종료되지 않음.")
+
+    def is_busy(self):
+        """인식 스트림이 진행 중이거나 게시 대기 중인 번역이 남아 있으면 True"""
+        return bool((self._streaming and self._future and not self._future.done()) or any(lane.pending_count() for lane in self.lanes))
+
+    def _create_recognizer(self):
+        """루프 스레드에서 호출: RECOGNIZER_BACKEND 설정에 맞는 인식 백엔드 생성"""
+        if RECOGNIZER_BACKEND == "replay": return ReplayRecognizer(self.source_lang)
+        previous = self._speech_client
+        self._speech_client = self.runtime.acquire_speech_client()
+        if previous is not None: self.runtime.release_speech_client(previous) # 복구로 새 인식기를 만들 때 이전 클라이언트 반납
+        return AsyncSpeechRecognizer(self.source_lang, client=self._speech_client)
+
+    def _release_speech_client(self):
+        """루프 스레드에서 호출: 빌린 Speech 클라이언트 반납 (인식 태스크가 끝난 뒤)"""
+        client, self._speech_client = self._speech_client, None
+        if client is not None: self.runtime.release_speech_client(client)
+
+    async def _run(self):
+        """세션 태스크: 오디오 입력 / 인식 / 번역 lane 게시를 하나의 TaskGroup으로 실행"""
+        print(f"[{self.name}] 파이프라인 태스크 시작")
+        try:
+            async with asyncio.TaskGroup() as group:
+                if self.audio_source: group.create_task(self._feed_audio_source())
+                elif self.audio_recorder.capture_mode != "callback": group.create_task(self._record_blocking())
+                for lane in self.lanes: group.create_task(lane.run())
+                group.create_task(self._recognize())
+        except* Exception:
+            pass # 실패한 태스크에서 이미 보고하고 on_error 호출함
+        finally:
+            for lane in self.lanes: lane.close()
+            print(f"[{self.name}] 파이프라인 태스크 종료 (stop_event: {self.stop_event.is_set()})")
+
+    async def _feed_audio_source(self):
+        """WAV 파일 등을 실시간 속도로 버퍼에 공급 (재생 대기는 스레드 풀에서, 끝나면 버퍼를 닫아 스트림 종료)"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.audio_source.play, self.audio_recorder.audio_buffer,
+                                                             self.stop_event, self.audio_recorder.frames_per_buffer)
+        except Exception as e:
+            if not self.stop_event.is_set():
+                print(f"[{self.name}] 오디오 입력 오류: {e}")
+                traceback.print_exc()
+                self._fail("record", str(e))
+            raise
+
+    async def _record_blocking(self):
+        """blocking 캡처 모드: stream.read 루프만 스레드 풀에서 실행"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.audio_recorder.record, self.stop_event)
+        except Exception as e:
+            if not self.stop_event.is_set():
+                print(f"[{self.name}] 녹음 오류: {e}")
+                traceback.print_exc()
+                self._fail("record", str(e))
+            raise
+
+    async def _audio_chunks(self, replay=None):
+        """브리지에서 SEND_CHUNK 단위로 오디오를 받아 VAD를 거친 청크를 yield (버퍼가 닫히면 종료, replay: 먼저 보낼 저널 오디오)"""
+        buffer = self.audio_recorder.audio_buffer
+        max_bytes = SEND_CHUNK * self.audio_recorder.bytes_per_frame
+        for offset in range(0, len(replay or b""), max_bytes):
+            chunk = replay[offset:offset + max_bytes]
+            for voiced_chunk in (self.vad_gate.process(chunk) if self.vad_gate else [chunk]): yield voiced_chunk
+        while True:
+            chunk = await self.bridge.read(max_bytes)
+            if chunk is None:
+                print(f"[{self.name}] 오디오 버퍼 닫힘, 오디오 스트림 종료.")
+                return
+            capture_ts = buffer.last_capture_ts
+            if self.vad_gate:
+                voiced_chunks = self.vad_gate.process(chunk)
+                if voiced_chunks: self.latency.note_audio_sent(capture_ts, self.vad_gate.last_chunk_voiced)
+                for voiced_chunk in voiced_chunks: yield voiced_chunk
+            else:
+                self.latency.note_audio_sent(capture_ts)
+                yield chunk
+
+    async def _recognize(self):
+        """
+        인식 태스크: 응답을 번역 언어별 lane으로 분배 (lane은 번역을 기다리지 않고 바로 반환).
+        인식 스트림 오류 시 저널 오디오를 재전송하는 새 스트림으로 복구합니다.
+        """
+        replay = None
+        try:
+            while True:
+                audio = self._audio_chunks(replay)
+                try:
+                    async for response in self.recognizer.stream_responses_async(audio):
+                        parsed = parse_recognition(response)
+                        if parsed is None: continue
+                        transcript, stable_length, is_final = parsed
+                        self.latency.note_result(is_final)
+                        if is_final: self._note_final()
+                        if transcript:
+                            for lane in self.lanes: lane.submit(transcript, stable_length, is_final)
+                    print(f"[{self.name}] Streaming API 응답 처리 정상 종료.")
+                    for lane in self.lanes: lane.finish()
+                    return
+                except OutOfRange as e:
+                    print(f"[{self.name}] Google API 스트리밍 세션 종료됨 (OutOfRange): {e}")
+                    error, kind = e, "out_of_range"
+                except Exception as e:
+                    if self.stop_event.is_set(): raise
+                    print(f"[{self.name}] 인식 태스크에서 예외 발생: {e}")
+                    traceback.print_exc()
+                    # 채널 문제일 수 있으므로 새 Speech 클라이언트 사용 (다른 세션이 이미 교체했으면 그 클라이언트 사용)
+                    self.runtime.reset_speech_client(self._speech_client)
+                    error, kind = e, "process"
+                if self.stop_event.is_set(): raise error
+                try: await audio.aclose() # 이전 스트림이 버퍼를 더 읽지 않도록 (재전송 구간과 겹치지 않게)
+                except RuntimeError: pass # 요청 소비 태스크에서 실행 중 (곧 취소됨)
+                replay = self._recovery_replay()
+                if replay is None:
+                    self._fail(kind, str(error))
+                    raise error
+                self.recognizer = self._resume_recognizer(self.recognizer)
+        finally:
+            self._release_speech_client()
+            self._streaming = False
+
+    def _fail(self, kind, message):
+        """세션을 중단시키는 오류 (세션당 한 번만 알림)"""
+        if self.stop_event.is_set(): return
+        super()._fail(kind, message)
+
+
+def create_session(source_lang, target_langs, client_pool, on_result, runtime=None, **kwargs):
+    """PIPELINE_MODE에 맞는 세션 생성 (asyncio 모드는 runtime 필요, threads 모드는 무시)"""
+    if PIPELINE_MODE == "asyncio" and runtime is not None:
+        return AsyncTranslationSession(source_lang, target_langs, client_pool, on_result, runtime, **kwargs)
+    return TranslationSession(source_lang, target_langs, client_pool, on_result, **kwargs)
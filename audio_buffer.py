@@ -0,0 +1,207 @@
+# audio_buffer.py
+import queue
+import threading
+import time
+from config import AUDIO_OVERFLOW_POLICY, AUDIO_BLOCK_TIMEOUT_SEC
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+class AudioRingBuffer:
+    """
+    미리 할당한 고정 크기 오디오 링 버퍼 (청크 단위 슬롯).
+    가득 찼을 때의 동작(overflow policy)을 설정할 수 있고, 오버런 횟수와 채움 정도를 집계합니다.
+    """
+    def __init__(self, capacity, slot_bytes, policy=AUDIO_OVERFLOW_POLICY, block_timeout=AUDIO_BLOCK_TIMEOUT_SEC):
+        """
+        capacity: 슬롯(청크) 개수
+        slot_bytes: 슬롯 하나의 최대 바이트 수 (청크 크기)
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"알 수 없는 오버플로우 정책: {policy} (가능: {', '.join(OVERFLOW_POLICIES)})")
+        self.capacity = capacity
+        self.slot_bytes = slot_bytes
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._storage = bytearray(capacity * slot_bytes)
+        self._view = memoryview(self._storage)
+        self._lengths = [0] * capacity # 슬롯별 남은(아직 읽지 않은) 바이트 수
+        self._starts = [0] * capacity # 슬롯별 읽기 시작 위치 (get_many가 청크 일부만 꺼낸 경우)
+        self._bytes = 0 # 버퍼에 남은 전체 바이트 수
+        self._timestamps = [0.0] * capacity # 슬롯별 캡처 시각 (time.monotonic)
+        self._journal_ends = [0] * capacity # 슬롯별 저널 위치 (청크 끝)
+        self.last_capture_ts = None # 마지막으로 꺼낸 데이터 중 가장 오래된 프레임의 캡처 시각
+        self.last_journal_pos = None # 마지막으로 꺼낸 데이터 끝의 저널 위치 (저널이 없으면 None)
+        self._head = 0 # 다음에 읽을 슬롯
+        self._count = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._listener = None # put/close 후 호출할 알림 함수 listener(남은 바이트 수, 닫힘 여부)
+        self._journal = None # 들어오는 청크를 모두 기록할 AudioJournal
+        # 통계
+        self.total_chunks = 0
+        self.overruns = 0
+        self.max_fill = 0
+
+    def set_listener(self, listener):
+        """
+        데이터가 들어오거나 버퍼가 닫힐 때 호출할 함수 등록 (None이면 해제).
+        쓰는 스레드에서 lock 밖에서 호출되므로 빠르게 반환해야 합니다 (asyncio 브리지의 깨우기용).
+        """
+        self._listener = listener
+
+    def set_journal(self, journal):
+        """들어오는 청크를 모두(오버런으로 버려지는 것 포함) 기록할 AudioJournal 등록 (None이면 해제)"""
+        with self._lock:
+            self._journal = journal
+            self.last_journal_pos = journal.position if journal else None
+
+    def put(self, data, block=True):
+        """
+        청크 추가. 버려졌으면 False 반환.
+        block=False면 "block" 정책이라도 기다리지 않음 (오디오 콜백 스레드용)
+        """
+        stored = self._put(data, block)
+        listener = self._listener
+        if stored and listener: listener(self._bytes, False)
+        return stored
+
+    def _put(self, data, block):
+        length = len(data)
+        if length > self.slot_bytes:
+            raise ValueError(f"청크 크기({length})가 슬롯 크기({self.slot_bytes})보다 큽니다.")
+        with self._lock:
+            if self._closed: return False
+            if self._count == self.capacity and self.policy == "block" and block:
+                self._not_full.wait_for(lambda: self._count < self.capacity or self._closed, self.block_timeout)
+                if self._closed: return False
+            # 저널 기록은 lock 안에서 (clear()가 돌려주는 저널 위치와 버퍼 내용이 어긋나지 않도록)
+            if self._journal: self._journal.append(data)
+            if self._count == self.capacity:
+                self.overruns += 1
+                if self.policy == "drop_oldest":
+                    self._bytes -= self._lengths[self._head]
+                    self._head = (self._head + 1) % self.capacity
+                    self._count -= 1
+                else: # drop_newest 또는 block 시간 초과
+                    return False
+            slot = (self._head + self._count) % self.capacity
+            offset = slot * self.slot_bytes
+            self._view[offset:offset + length] = data
+            self._lengths[slot] = length
+            self._starts[slot] = 0
+            self._bytes += length
+            self._timestamps[slot] = time.monotonic()
+            if self._journal: self._journal_ends[slot] = self._journal.position
+            self._count += 1
+            self.total_chunks += 1
+            if self._count > self.max_fill: self.max_fill = self._count
+            self._not_empty.notify()
+            return True
+
+    def get(self, block=True, timeout=None):
+        """
+        가장 오래된 청크를 bytes로 반환. 버퍼가 닫혔고 비어 있으면 None.
+        timeout 안에 데이터가 없으면 queue.Empty 발생 (queue.Queue와 같은 사용법)
+        """
+        with self._lock:
+            if block:
+                if not self._not_empty.wait_for(lambda: self._count > 0 or self._closed, timeout):
+                    raise queue.Empty
+            if self._count == 0:
+                if self._closed: return None
+                raise queue.Empty
+            slot = self._head
+            offset = slot * self.slot_bytes + self._starts[slot]
+            data = bytes(self._view[offset:offset + self._lengths[slot]])
+            self.last_capture_ts = self._timestamps[slot]
+            if self._journal: self.last_journal_pos = self._journal_ends[slot]
+            self._bytes -= self._lengths[slot]
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self._not_full.notify()
+            return data
+
+    def get_many(self, max_bytes, timeout=None):
+        """
+        여러 청크를 이어 붙여 최대 max_bytes 만큼 bytes로 반환 (전송 단위로 모으기).
+        청크 경계와 관계없이 바이트 단위로 자르므로(남은 부분은 다음 호출에서) 캡처 청크 크기와 무관하게 max_bytes씩 보냅니다.
+        max_bytes가 모일 때까지 timeout 동안 기다리고, 시간이 지나면 모인 만큼만 반환합니다.
+        아무것도 없으면 queue.Empty, 버퍼가 닫혔고 비어 있으면 None.
+        """
+        with self._lock:
+            self._not_empty.wait_for(lambda: self._bytes >= max_bytes or self._closed, timeout)
+            if self._count == 0:
+                if self._closed: return None
+                raise queue.Empty
+            total = min(self._bytes, max_bytes)
+            total -= total % 2 # 16bit 샘플 경계
+            if total == 0: total = self._lengths[self._head] # max_bytes가 1바이트 등 비정상적으로 작은 경우
+            out = bytearray(total) # 전송용 결과만 한 번 할당
+            self.last_capture_ts = self._timestamps[self._head]
+            pos = 0
+            while pos < total:
+                slot = self._head
+                length = min(self._lengths[slot], total - pos)
+                offset = slot * self.slot_bytes + self._starts[slot]
+                out[pos:pos + length] = self._view[offset:offset + length]
+                pos += length
+                self._lengths[slot] -= length
+                self._bytes -= length
+                if self._journal: self.last_journal_pos = self._journal_ends[slot] - self._lengths[slot]
+                if self._lengths[slot]: # 청크 일부만 꺼냄: 나머지는 슬롯에 남김
+                    self._starts[slot] += length
+                    break
+                self._head = (self._head + 1) % self.capacity
+                self._count -= 1
+            self._not_full.notify_all()
+            return bytes(out)
+
+    def clear(self):
+        """버퍼 내용 비우기. 저널이 있으면 비운 시점의 저널 위치 반환 (그 이후 청크만 버퍼로 들어옴)"""
+        with self._lock:
+            self._head = 0
+            self._count = 0
+            self._bytes = 0
+            self._not_full.notify_all()
+            return self._journal.position if self._journal else None
+
+    def reset(self):
+        """내용과 닫힘 상태, 통계 초기화 (새 녹음 시작 시)"""
+        with self._lock:
+            self._head = 0
+            self._count = 0
+            self._bytes = 0
+            self._closed = False
+            self.total_chunks = 0
+            self.overruns = 0
+            self.max_fill = 0
+
+    def close(self):
+        """더 이상 쓰지 않음을 알림. 읽는 쪽은 남은 청크를 다 읽은 뒤 None을 받음"""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        listener = self._listener
+        if listener: listener(self._bytes, True)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def fill_level(self):
+        """현재 채움 비율 (0.0 ~ 1.0)"""
+        with self._lock: return self._count / self.capacity
+
+    def buffered_bytes(self):
+        """아직 읽지 않은 바이트 수"""
+        with self._lock: return self._bytes
+
+    def __len__(self):
+        with self._lock: return self._count
+
+    def stats_summary(self):
+        return (f"오디오 버퍼: 수신 {self.total_chunks}청크, 오버런 {self.overruns}회 ({self.policy}), "
+                f"최대 채움 {self.max_fill}/{self.capacity}, 현재 {len(self)}/{self.capacity}")
@@ -0,0 +1,131 @@
+# audio_encoder.py
+import time
+from config import RATE, CHANNELS, AUDIO_UPLOAD_ENCODING, OGG_OPUS_PAGE_LATENCY_MS
+try:
+    import soundfile # 선택적: FLAC / OGG_OPUS 업로드 인코딩 (libsndfile)
+except ImportError:
+    soundfile = None
+
+# 지원하는 업로드 인코딩 (speech.RecognitionConfig.AudioEncoding 이름과 같음)
+UPLOAD_ENCODINGS = ("LINEAR16", "FLAC", "OGG_OPUS")
+# libsndfile sf_command: Ogg 페이지를 이 시간(ms)마다 내보냄 (기본값은 약 1초 분량을 모아서 내보내 지연이 커짐)
+_SFC_SET_OGG_PAGE_LATENCY_MS = 0x1302
+
+class _StreamSink:
+    """
+    soundfile 가상 파일: 인코더가 쓴 바이트를 모아 두었다가 take()로 꺼내 갑니다.
+    이미 보낸 앞부분을 다시 쓰는 경우(닫을 때 FLAC 헤더의 전체 길이 갱신 등)는 무시합니다.
+    스트리밍 FLAC/Ogg는 길이 정보 없이도 유효합니다.
+    """
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+        self._end = 0
+
+    def write(self, data):
+        size = len(data)
+        if self._pos >= self._end: self._chunks.append(bytes(data))
+        self._pos += size
+        self._end = max(self._end, self._pos)
+        return size
+
+    def seek(self, offset, whence=0):
+        if whence == 0: self._pos = offset
+        elif whence == 1: self._pos += offset
+        else: self._pos = self._end + offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def read(self, size=-1):
+        return b""
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class UploadEncoder:
+    """
+    캡처한 LINEAR16 PCM을 Speech API로 보내기 전에 압축하는 인코딩 단계.
+    스트리밍 세션마다 start()로 새 스트림(헤더 포함)을 시작하고, encode()가 돌려준 바이트를 그대로 audio_content로 보냅니다.
+    FLAC은 무손실(약 50~60%), OGG_OPUS는 손실 압축(약 10% 이하)이며 인코더가 프레임 단위로 모아서 내보내므로
+    encode()가 빈 바이트를 돌려줄 수 있습니다. 인코딩 CPU 시간과 전송 바이트를 집계합니다.
+    """
+    def __init__(self, encoding=AUDIO_UPLOAD_ENCODING):
+        if encoding not in UPLOAD_ENCODINGS: raise ValueError(f"지원하지 않는 업로드 인코딩: {encoding} ({', '.join(UPLOAD_ENCODINGS)})")
+        if encoding != "LINEAR16" and soundfile is None:
+            print(f"경고: soundfile 패키지가 없어 {encoding} 대신 LINEAR16으로 전송합니다 (pip install soundfile)")
+            encoding = "LINEAR16"
+        self.encoding = encoding
+        self._file = None
+        self._sink = None
+        # 통계
+        self.streams = 0
+        self.pcm_bytes = 0
+        self.wire_bytes = 0
+        self.cpu_sec = 0.0
+
+    def start(self):
+        """새 스트림 시작 (스트리밍 세션마다 호출, 이전 스트림의 남은 데이터는 버림)"""
+        self.close()
+        self.streams += 1
+        if self.encoding == "LINEAR16": return
+        self._sink = _StreamSink()
+        if self.encoding == "FLAC":
+            # 압축 레벨 0: 블록 크기가 작아(1152 샘플) 프레임이 자주 나옴
+            self._file = soundfile.SoundFile(self._sink, 'w', RATE, CHANNELS, 'PCM_16', format='FLAC', compression_level=0.0)
+        else:
+            self._file = soundfile.SoundFile(self._sink, 'w', RATE, CHANNELS, 'OPUS', format='OGG')
+            latency = soundfile._ffi.new("double*", float(OGG_OPUS_PAGE_LATENCY_MS))
+            soundfile._snd.sf_command(self._file._file, _SFC_SET_OGG_PAGE_LATENCY_MS, latency, soundfile._ffi.sizeof("double"))
+
+    def encode(self, pcm):
+        """PCM 청크를 인코딩해 지금 보낼 수 있는 바이트 반환 (없으면 b"")"""
+        self.pcm_bytes += len(pcm)
+        if self._file is None:
+            data = pcm
+        else:
+            cpu_start = time.thread_time()
+            self._file.buffer_write(pcm, dtype='int16')
+            data = self._sink.take()
+            self.cpu_sec += time.thread_time() - cpu_start
+        self.wire_bytes += len(data)
+        return data
+
+    def finish(self):
+        """스트림 종료: 인코더에 남은 마지막 프레임 반환"""
+        if self._file is None: return b""
+        cpu_start = time.thread_time()
+        self._file.close()
+        data = self._sink.take()
+        self.cpu_sec += time.thread_time() - cpu_start
+        self._file = self._sink = None
+        self.wire_bytes += len(data)
+        return data
+
+    def close(self):
+        if self._file is None: return
+        try: self._file.close()
+        except Exception: pass
+        self._file = self._sink = None
+
+    def report(self):
+        """전송량/인코딩 비용 스냅샷"""
+        audio_sec = self.pcm_bytes / (RATE * CHANNELS * 2)
+        return {
+            "encoding": self.encoding, "streams": self.streams,
+            "audio_sec": audio_sec, "pcm_bytes": self.pcm_bytes, "wire_bytes": self.wire_bytes,
+            "ratio": self.wire_bytes / self.pcm_bytes if self.pcm_bytes else None,
+            "kbps": self.wire_bytes * 8 / 1000 / audio_sec if audio_sec else None,
+            "encode_cpu_ms_per_audio_sec": self.cpu_sec * 1000 / audio_sec if audio_sec else None,
+        }
+
+    def stats_summary(self):
+        r = self.report()
+        if not self.pcm_bytes: return f"업로드 인코딩 {self.encoding}: 전송한 오디오 없음"
+        return (f"업로드 인코딩 {self.encoding}: 오디오 {r['audio_sec']:.1f}초, PCM {self.pcm_bytes / 1024:.1f}KB -> 전송 {self.wire_bytes / 1024:.1f}KB "
+                f"({r['ratio'] * 100:.0f}%, {r['kbps']:.1f}kbit/s), 인코딩 CPU {self.cpu_sec * 1000:.1f}ms "
+                f"(오디오 1초당 {r['encode_cpu_ms_per_audio_sec']:.2f}ms), 스트림 {self.streams}개")
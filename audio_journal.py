@@ -0,0 +1,348 @@
+# audio_journal.py
+"""
+세션 오디오 저널: 캡처한 PCM(RATE, 모노, 16bit)을 메모리 매핑한 세그먼트 파일에 계속 기록합니다.
+인식 스트림 오류 후 최근 오디오를 새 스트림에 다시 보내거나, 지난 구간을 WAV로 꺼내 오프라인으로 다시 처리할 때 사용합니다.
+
+디스크 구성 (저널 디렉터리 하나에 세그먼트 여러 개):
+    segment_00000001.pcm  미리 크기를 잡아 둔 PCM 데이터 (기록된 길이는 인덱스 헤더에)
+    segment_00000001.idx  헤더 + 인덱스 항목 (세그먼트 내 오프셋, 캡처 시각)
+
+사용 예 (오프라인 재처리: 지난 구간을 WAV로 꺼낸 뒤 헤드리스 서버의 WAV 입력으로 다시 인식):
+    python audio_journal.py results/audio_journal/마이크 out.wav --start 2024-05-01T10:15:00 --end 2024-05-01T10:20:00
+    python headless_server.py --session 영어 (미국):한국어@out.wav
+"""
+import argparse
+import bisect
+import datetime
+import glob
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import wave
+from config import RATE, CHANNELS, AUDIO_JOURNAL_SEGMENT_SEC, AUDIO_JOURNAL_RETENTION_SEC
+
+BYTES_PER_SECOND = RATE * CHANNELS * 2
+# 인덱스 파일 헤더: 식별자, 샘플레이트, 채널 수, 예약, 세그먼트 시작 위치(저널 누적 바이트), 기록된 바이트 수, 인덱스 항목 수
+_HEADER = struct.Struct('<4sIHHQII')
+# 인덱스 항목: 세그먼트 내 바이트 오프셋, 그 위치 샘플의 캡처 시각 (time.time)
+_ENTRY = struct.Struct('<Id')
+_MAGIC = b"AJ01"
+# 인덱스 항목 최소 간격(초). 캡처가 끊겨 시각이 INDEX_GAP_SEC 이상 어긋나면 간격과 무관하게 새 항목 기록
+INDEX_INTERVAL_SEC = 0.1
+INDEX_GAP_SEC = 0.25
+# 관리 스레드(다음 세그먼트 준비, 보관 기간 정리) 주기(초)
+MAINTENANCE_INTERVAL_SEC = 1.0
+
+def journal_dir_name(name):
+    """세션 이름 -> 저널 하위 디렉터리 이름 (파일 이름에 쓸 수 없는 문자 치환)"""
+    return re.sub(r'[^\w.-]+', '_', name).strip('_') or "session"
+
+def _map_file(path, size):
+    """크기를 미리 잡은 파일을 만들어 mmap으로 열기 (쓰기 시 디스크 블록 할당이 일어나지 않도록 가능하면 fallocate)"""
+    with open(path, 'w+b') as f:
+        if hasattr(os, 'posix_fallocate'):
+            try: os.posix_fallocate(f.fileno(), 0, size)
+            except OSError: f.truncate(size)
+        else:
+            f.truncate(size)
+        mm = mmap.mmap(f.fileno(), size)
+    if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+        try: mm.madvise(mmap.MADV_WILLNEED)
+        except OSError: pass
+    return mm
+
+
+class _Segment:
+    """세그먼트 하나 (기록 중인 것 또는 다음에 쓸 예비): PCM/인덱스 파일의 mmap과 기록 상태"""
+    def __init__(self, directory, seq, capacity, index_capacity):
+        self.seq = seq
+        base = os.path.join(directory, f"segment_{seq:08d}")
+        self.pcm_path, self.idx_path = base + ".pcm", base + ".idx"
+        self.capacity = capacity
+        self.index_capacity = index_capacity
+        self.pcm = _map_file(self.pcm_path, capacity)
+        self.idx = _map_file(self.idx_path, _HEADER.size + index_capacity * _ENTRY.size)
+        self.start_pos = 0
+        self.used = 0
+        self.entries = 0
+        self.first_ts = None
+        self.last_ts = None # 기록된 마지막 샘플 끝의 시각
+        self._entry_offset = 0 # 마지막 인덱스 항목의 오프셋/시각
+        self._entry_ts = None
+
+    def begin(self, start_pos):
+        self.start_pos = start_pos
+        _HEADER.pack_into(self.idx, 0, _MAGIC, RATE, CHANNELS, 0, start_pos, 0, 0)
+
+    @property
+    def full(self):
+        return self.used >= self.capacity
+
+    def write(self, view, end_ts):
+        """view 중 들어가는 만큼 기록하고 기록한 바이트 수 반환. end_ts: view 마지막 샘플의 캡처 시각"""
+        n = min(len(view), self.capacity - self.used)
+        start_ts = end_ts - len(view) / BYTES_PER_SECOND
+        if self._entry_ts is None:
+            need_entry = True
+        else:
+            expected_ts = self._entry_ts + (self.used - self._entry_offset) / BYTES_PER_SECOND
+            need_entry = start_ts - self._entry_ts >= INDEX_INTERVAL_SEC or abs(start_ts - expected_ts) >= INDEX_GAP_SEC
+        if need_entry and self.entries < self.index_capacity:
+            _ENTRY.pack_into(self.idx, _HEADER.size + self.entries * _ENTRY.size, self.used, start_ts)
+            self.entries += 1
+            self._entry_offset, self._entry_ts = self.used, start_ts
+        self.pcm[self.used:self.used + n] = view[:n]
+        self.used += n
+        if self.first_ts is None: self.first_ts = start_ts
+        self.last_ts = start_ts + n / BYTES_PER_SECOND
+        # 헤더의 기록 길이/항목 수 갱신 (오프라인 판독기가 유효 범위를 알 수 있도록)
+        struct.pack_into('<II', self.idx, 20, self.used, self.entries)
+        return n
+
+    def close(self, remove=False):
+        for mm in (self.pcm, self.idx):
+            try:
+                if not remove: mm.flush()
+                mm.close()
+            except (ValueError, OSError): pass
+        if remove:
+            for path in (self.pcm_path, self.idx_path):
+                try: os.remove(path)
+                except OSError: pass
+
+
+class AudioJournal:
+    """
+    세션 오디오를 디스크에 계속 기록하는 순환 저널 (메모리 매핑 세그먼트 + 캡처 시각 인덱스).
+    append()는 캡처 스레드(AudioRingBuffer.put)에서 호출되며 미리 만들어 둔 mmap 세그먼트에 복사와 인덱스 갱신만 하고,
+    다음 세그먼트 파일 생성/사전 할당과 보관 기간이 지난 세그먼트 삭제는 관리 스레드가 합니다.
+    위치(position)는 이 저널을 연 뒤 기록한 누적 바이트 수로, 세그먼트가 바뀌어도 이어집니다.
+    """
+    def __init__(self, directory, segment_sec=AUDIO_JOURNAL_SEGMENT_SEC, retention_sec=AUDIO_JOURNAL_RETENTION_SEC):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = int(segment_sec * BYTES_PER_SECOND) // 2 * 2
+        self.index_capacity = int(segment_sec / INDEX_INTERVAL_SEC) * 2 + 16 # 캡처 끊김 항목 여유
+        self.retention_sec = retention_sec
+        self.position = 0
+        self._segments = [] # 기록된 세그먼트 (오래된 것 -> 현재)
+        self._spare = None # 관리 스레드가 미리 만든 다음 세그먼트
+        self._next_seq = self._scan_existing() + 1
+        self._seq_lock = threading.Lock() # 세그먼트 번호 할당 (관리 스레드와 캡처 스레드가 함께 생성할 수 있음)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        # 통계
+        self.segments_created = 0
+        self.segments_removed = 0
+        self.inline_segments = 0 # 예비 세그먼트가 없어 캡처 스레드에서 직접 만든 횟수
+        self.dropped_bytes = 0
+        self._spare = self._new_segment()
+        self._thread = threading.Thread(target=self._maintain, name="AudioJournalThread", daemon=True)
+        self._thread.start()
+
+    def _scan_existing(self):
+        """이전 실행의 세그먼트 중 보관 기간이 지난 것은 지우고, 이어서 쓸 마지막 번호 반환"""
+        last_seq = 0
+        cutoff = time.time() - self.retention_sec
+        for idx_path in glob.glob(os.path.join(self.directory, "segment_*.idx")):
+            match = re.search(r'segment_(\d+)\.idx$', idx_path)
+            if not match: continue
+            last_seq = max(last_seq, int(match.group(1)))
+            if os.path.getmtime(idx_path) < cutoff:
+                for path in (idx_path, idx_path[:-4] + ".pcm"):
+                    try: os.remove(path)
+                    except OSError: pass
+        return last_seq
+
+    def _new_segment(self):
+        with self._seq_lock:
+            seq = self._next_seq
+            self._next_seq += 1
+        segment = _Segment(self.directory, seq, self.segment_bytes, self.index_capacity)
+        self.segments_created += 1
+        return segment
+
+    def append(self, data, ts=None):
+        """캡처한 PCM 청크 기록. ts: 청크 마지막 샘플의 캡처 시각 (time.time, 없으면 지금)"""
+        end_ts = time.time() if ts is None else ts
+        view = memoryview(data).cast('B')
+        with self._lock:
+            if self._closed: return
+            while len(view):
+                segment = self._segments[-1] if self._segments else None
+                if segment is None or segment.full:
+                    segment = self._rotate()
+                    if segment is None:
+                        self.dropped_bytes += len(view)
+                        return
+                n = segment.write(view, end_ts)
+                self.position += n
+                view = view[n:]
+
+    def _rotate(self):
+        """lock 안에서: 예비 세그먼트로 전환 (없으면 직접 생성, 실패 시 None)"""
+        segment, self._spare = self._spare, None
+        if segment is None:
+            try: segment = self._new_segment()
+            except OSError as e:
+                print(f"오디오 저널 세그먼트 생성 실패: {e}")
+                return None
+            self.inline_segments += 1
+        segment.begin(self.position)
+        self._segments.append(segment)
+        self._wakeup.set() # 관리 스레드가 다음 예비 세그먼트를 준비
+        return segment
+
+    def _maintain(self):
+        while not self._closed:
+            self._wakeup.wait(MAINTENANCE_INTERVAL_SEC)
+            self._wakeup.clear()
+            if self._closed: break
+            if self._spare is None:
+                try: spare = self._new_segment()
+                except OSError as e:
+                    print(f"오디오 저널 예비 세그먼트 생성 실패: {e}")
+                    spare = None
+                with self._lock:
+                    if self._closed or self._spare is not None:
+                        if spare: spare.close(remove=True)
+                    else:
+                        self._spare = spare
+            # 보관 기간이 지난 세그먼트 삭제 (기록 중인 마지막 세그먼트는 제외)
+            cutoff = time.time() - self.retention_sec
+            expired = []
+            with self._lock:
+                while len(self._segments) > 1 and self._segments[0].last_ts is not None and self._segments[0].last_ts < cutoff:
+                    expired.append(self._segments.pop(0))
+            for segment in expired:
+                segment.close(remove=True)
+                self.segments_removed += 1
+
+    @property
+    def oldest_position(self):
+        with self._lock: return self._segments[0].start_pos if self._segments else self.position
+
+    def read(self, start_pos, end_pos=None):
+        """저널 위치 [start_pos, end_pos) 구간의 PCM (보관 기간이 지나 지워진 앞부분은 빠짐)"""
+        with self._lock:
+            end_pos = self.position if end_pos is None else min(end_pos, self.position)
+            pieces = []
+            for segment in self._segments:
+                a = max(start_pos, segment.start_pos)
+                b = min(end_pos, segment.start_pos + segment.used)
+                if a < b: pieces.append(segment.pcm[a - segment.start_pos:b - segment.start_pos])
+        return b"".join(pieces)
+
+    def close(self):
+        """관리 스레드 종료, 예비 세그먼트 삭제, 기록한 세그먼트는 파일로 남김 (보관 기간 정리는 다음 실행 때)"""
+        with self._lock:
+            if self._closed: return
+            self._closed = True
+            segments, self._segments = self._segments, []
+            spare, self._spare = self._spare, None
+        self._wakeup.set()
+        self._thread.join(timeout=2.0)
+        if spare: spare.close(remove=True)
+        for segment in segments: segment.close()
+
+    def stats_summary(self):
+        with self._lock: kept = len(self._segments)
+        return (f"오디오 저널: 기록 {self.position / BYTES_PER_SECOND:.1f}초, 세그먼트 생성 {self.segments_created}개 "
+                f"(캡처 스레드에서 생성 {self.inline_segments}개), 보관 {kept}개, 정리 {self.segments_removed}개, 버림 {self.dropped_bytes}B")
+
+
+class JournalReader:
+    """
+    저널 디렉터리 판독기 (오프라인 재처리용). 기록 중인 저널도 헤더에 기록된 길이까지 읽을 수 있습니다.
+    세그먼트별 인덱스로 캡처 시각 구간을 PCM 바이트 구간으로 바꿉니다.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments = [] # (PCM 경로, 기록 바이트 수, [(오프셋, 캡처 시각)])
+        for idx_path in sorted(glob.glob(os.path.join(directory, "segment_*.idx"))):
+            with open(idx_path, 'rb') as f: raw = f.read()
+            if len(raw) < _HEADER.size: continue
+            magic, rate, channels, _, _, used, entries = _HEADER.unpack_from(raw, 0)
+            if magic != _MAGIC or used == 0: continue
+            if rate != RATE or channels != CHANNELS:
+                print(f"건너뜀 (형식 불일치 {rate}Hz/{channels}ch): {idx_path}")
+                continue
+            index = [_ENTRY.unpack_from(raw, _HEADER.size + i * _ENTRY.size) for i in range(entries)]
+            self.segments.append((idx_path[:-4] + ".pcm", used, index))
+
+    @staticmethod
+    def _offset_at(used, index, ts):
+        """세그먼트 안에서 캡처 시각 ts에 해당하는 바이트 오프셋 (마지막 인덱스 항목 기준으로 외삽)"""
+        i = bisect.bisect_right([t for _, t in index], ts) - 1
+        if i < 0: return index[0][0]
+        offset, entry_ts = index[i]
+        next_offset = index[i + 1][0] if i + 1 < len(index) else used
+        pos = offset + int((ts - entry_ts) * BYTES_PER_SECOND)
+        return min(pos - pos % 2, next_offset)
+
+    def time_range(self):
+        """(첫 샘플 시각, 마지막 샘플 끝 시각), 비어 있으면 None"""
+        if not self.segments: return None
+        first = self.segments[0][2][0][1]
+        _, used, index = self.segments[-1]
+        offset, ts = index[-1]
+        return first, ts + (used - offset) / BYTES_PER_SECOND
+
+    def read(self, start_ts=None, end_ts=None):
+        """캡처 시각 [start_ts, end_ts) 구간의 PCM 청크를 세그먼트 순서대로 yield"""
+        for pcm_path, used, index in self.segments:
+            if not index: continue
+            seg_start = index[0][1]
+            seg_end = index[-1][1] + (used - index[-1][0]) / BYTES_PER_SECOND
+            if (end_ts is not None and seg_start >= end_ts) or (start_ts is not None and seg_end <= start_ts): continue
+            a = self._offset_at(used, index, start_ts) if start_ts is not None else 0
+            b = self._offset_at(used, index, end_ts) if end_ts is not None else used
+            if a >= b: continue
+            with open(pcm_path, 'rb') as f:
+                f.seek(a)
+                yield f.read(b - a)
+
+    def export_wav(self, path, start_ts=None, end_ts=None):
+        """구간을 WAV 파일로 저장하고 길이(초) 반환 (WavAudioSource / 헤드리스 WAV 입력으로 다시 인식 가능)"""
+        total = 0
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(CHANNELS)
+            wav.setsampwidth(2)
+            wav.setframerate(RATE)
+            for chunk in self.read(start_ts, end_ts):
+                wav.writeframes(chunk)
+                total += len(chunk)
+        return total / BYTES_PER_SECOND
+
+
+def _parse_time(value):
+    """유닉스 시각(초) 또는 ISO 형식 날짜/시각 (로컬 시간)"""
+    try: return float(value)
+    except ValueError: return datetime.datetime.fromisoformat(value).timestamp()
+
+def main():
+    parser = argparse.ArgumentParser(description="오디오 저널 구간을 WAV로 내보내기 (오프라인 재처리용)")
+    parser.add_argument("directory", help="세션 저널 디렉터리 (AUDIO_JOURNAL_DIR/세션 이름)")
+    parser.add_argument("output", help="저장할 WAV 경로")
+    parser.add_argument("--start", type=_parse_time, help="시작 시각 (유닉스 초 또는 ISO 형식)")
+    parser.add_argument("--end", type=_parse_time, help="끝 시각 (유닉스 초 또는 ISO 형식)")
+    args = parser.parse_args()
+
+    reader = JournalReader(args.directory)
+    time_range = reader.time_range()
+    if not time_range:
+        print(f"기록된 오디오가 없습니다: {args.directory}")
+        return 1
+    fmt = lambda ts: datetime.datetime.fromtimestamp(ts).isoformat(timespec='seconds')
+    print(f"저널 구간: {fmt(time_range[0])} ~ {fmt(time_range[1])} (세그먼트 {len(reader.segments)}개)")
+    seconds = reader.export_wav(args.output, args.start, args.end)
+    print(f"{args.output}: {seconds:.1f}초 저장")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
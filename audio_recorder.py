@@ -1,15 +1,30 @@
 # audio_recorder.py
 import traceback
 import pyaudio
-import queue
-from config import AUDIO_FORMAT, CHANNELS, RATE, CHUNK
+from config import AUDIO_FORMAT, CHANNELS, RATE, CHUNK, FRAME, AUDIO_BUFFER_SECONDS, AUDIO_CAPTURE_MODE, AUDIO_NATIVE_CAPTURE
 import threading # threading 임포트 추가
+from audio_buffer import AudioRingBuffer
+from audio_resampler import CaptureConverter
 
 class AudioRecorder:
-    def __init__(self):
-        self.audio = pyaudio.PyAudio()
+    def __init__(self, capture_mode=AUDIO_CAPTURE_MODE, audio=None):
+        # audio: 여러 녹음기가 함께 쓸 PyAudio 인스턴스 (헤드리스 다중 세션). 없으면 새로 생성
+        self.audio = audio or pyaudio.PyAudio()
         self.stream = None
-        self.audio_queue = queue.Queue()
+        # callback 모드: PortAudio 콜백이 작은 프레임(FRAME)을 링 버퍼 슬롯에 바로 복사
+        # blocking 모드: 녹음 스레드가 CHUNK 단위로 stream.read
+        self.capture_mode = capture_mode
+        self.frames_per_buffer = FRAME if capture_mode == "callback" else CHUNK
+        # frames_per_buffer/bytes_per_frame은 파이프라인 형식(RATE, CHANNELS) 기준. 장치는 기본 형식으로 열고 변환
+        self.bytes_per_frame = CHANNELS * self.audio.get_sample_size(AUDIO_FORMAT)
+        self.converter = None # 장치 형식 -> RATE 모노 변환 (open_stream에서 장치별로 생성)
+        self.device_frames_per_buffer = self.frames_per_buffer
+        # 전송 대기 오디오: 고정 크기 링 버퍼 (스트림이 멈춰도 메모리/지연이 무한히 늘지 않음)
+        self.audio_buffer = AudioRingBuffer(
+            capacity=max(1, int(AUDIO_BUFFER_SECONDS * RATE / self.frames_per_buffer)),
+            slot_bytes=self.frames_per_buffer * self.bytes_per_frame,
+        )
+        self.input_overflows = 0
         # self._is_recording_func = None # 제거 (record 메서드에서 직접 이벤트 사용)
 
     # ... (get_input_devices, open_stream, close_stream 메서드는 동일) ...
@@ -35,21 +50,46 @@ class AudioRecorder:
         if self.stream:
             self.close_stream()
 
+        rate, channels = self._capture_format(device_index)
         try:
-            self.stream = self.audio.open(
-                format=AUDIO_FORMAT,
-                channels=CHANNELS,
-                rate=RATE,
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=CHUNK,
-            )
-            print("오디오 스트림 열림")
+            try:
+                self._open_device_stream(device_index, rate, channels)
+            except Exception as e:
+                if (rate, channels) == (RATE, CHANNELS): raise
+                # 장치 기본 형식으로 열리지 않으면 RATE 모노로 재시도 (호스트 변환)
+                print(f"장치 기본 형식({rate}Hz {channels}ch)으로 열기 실패, {RATE}Hz {CHANNELS}ch로 재시도: {e}")
+                self._open_device_stream(device_index, RATE, CHANNELS)
+            print(f"오디오 스트림 열림 ({self.capture_mode} 모드, 프레임 {self.frames_per_buffer * 1000 // RATE}ms, {self.converter.describe()})")
         except Exception as e:
              print(f"오디오 스트림 열기 중 오류: {e}")
              self.stream = None # 오류 시 스트림 None으로 설정
              raise # 오류를 다시 발생시켜 호출자에게 알림
 
+    def _capture_format(self, device_index):
+        """캡처할 (샘플레이트, 채널 수). AUDIO_NATIVE_CAPTURE면 장치 기본 샘플레이트와 최대 2채널"""
+        if not AUDIO_NATIVE_CAPTURE: return RATE, CHANNELS
+        try:
+            if device_index is None: info = self.audio.get_default_input_device_info()
+            else: info = self.audio.get_device_info_by_index(device_index)
+            return int(info.get('defaultSampleRate') or RATE), max(1, min(int(info.get('maxInputChannels') or CHANNELS), 2))
+        except Exception as e:
+            print(f"장치 기본 형식 조회 오류, {RATE}Hz {CHANNELS}ch로 캡처: {e}")
+            return RATE, CHANNELS
+
+    def _open_device_stream(self, device_index, rate, channels):
+        # 장치 버퍼도 같은 시간 길이 (20ms 프레임: 48kHz 960, 44.1kHz 882 샘플)
+        self.converter = CaptureConverter(rate, channels)
+        self.device_frames_per_buffer = round(self.frames_per_buffer * rate / RATE)
+        self.stream = self.audio.open(
+            format=AUDIO_FORMAT,
+            channels=channels,
+            rate=rate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=self.device_frames_per_buffer,
+            stream_callback=self._on_audio if self.capture_mode == "callback" else None,
+        )
+
     def close_stream(self):
         """스트림 닫기"""
         if self.stream:
@@ -64,11 +104,19 @@ class AudioRecorder:
             finally:
                  self.stream = None # 상태 확실히 업데이트
 
-        # 큐 비우기 (선택적이지만 재시작 시 도움됨)
-        while not self.audio_queue.empty():
-            try: self.audio_queue.get_nowait()
-            except queue.Empty: break
-            except Exception: break # 예외 발생 시 중단
+        # 버퍼 비우기 (선택적이지만 재시작 시 도움됨)
+        self.audio_buffer.clear()
+
+    def _on_audio(self, in_data, frame_count, time_info, status_flags):
+        """PyAudio 콜백 (PortAudio 스레드): 받은 프레임을 RATE 모노로 변환해 링 버퍼 슬롯에 복사하고 즉시 반환"""
+        if status_flags & pyaudio.paInputOverflow: self.input_overflows += 1
+        if in_data:
+            # 다운믹스/리샘플은 NumPy 벡터 연산 (48kHz 스테레오 20ms 프레임당 약 0.1ms)
+            view = memoryview(self.converter.convert(in_data))
+            slot_bytes = self.audio_buffer.slot_bytes
+            for offset in range(0, len(view), slot_bytes): # 장치가 더 큰 버퍼를 준 경우 슬롯 크기로 나눔
+                self.audio_buffer.put(view[offset:offset + slot_bytes], block=False)
+        return (None, pyaudio.paContinue)
 
     # <<< record 메서드 수정: threading.Event 직접 사용 >>>
     def record(self, stop_event: threading.Event):
@@ -79,6 +127,17 @@ class AudioRecorder:
              print("녹음 시작 불가: 스트림이 열려있지 않거나 활성 상태가 아님")
              return
 
+        if self.capture_mode == "callback":
+            # 콜백이 데이터를 채우므로 이 스레드는 스트림 상태만 감시
+            print("오디오 녹음 시작 (callback 모드)")
+            while not stop_event.wait(0.2):
+                if not self.stream or not self.stream.is_active():
+                    print("녹음 중 스트림 비활성화 감지됨. 루프 종료.")
+                    break
+            if self.input_overflows: print(f"오디오 입력 오버플로우 {self.input_overflows}회")
+            print("오디오 녹음 종료 (callback 모드)")
+            return
+
         print("오디오 녹음 루프 시작 (stop_event 기반)")
         while not stop_event.is_set():
             try:
@@ -89,11 +148,12 @@ class AudioRecorder:
                     break
 
                 # exception_on_overflow=False: 오버플로우 시 예외 대신 데이터 드롭
-                data = self.stream.read(CHUNK, exception_on_overflow=False)
+                data = self.stream.read(self.device_frames_per_buffer, exception_on_overflow=False)
+                if data: data = self.converter.convert(data)
 
-                # stop_event가 설정되지 않았을 때만 큐에 데이터 추가
+                # stop_event가 설정되지 않았을 때만 버퍼에 데이터 추가 (가득 차면 오버플로우 정책 적용)
                 if data and not stop_event.is_set():
-                    self.audio_queue.put(data)
+                    self.audio_buffer.put(data)
 
             except IOError as e:
                 # 스트림 관련 IO 오류 처리
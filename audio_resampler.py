@@ -0,0 +1,82 @@
+# audio_resampler.py
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from config import RATE, RESAMPLER_TAPS_PER_PHASE, RESAMPLER_CUTOFF
+
+def downmix(samples, channels):
+    """인터리브된 다채널 샘플 -> 모노 (채널 평균)"""
+    if channels == 1: return samples.astype(np.float32, copy=False)
+    return samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+def design_lowpass(up, down, taps_per_phase=RESAMPLER_TAPS_PER_PHASE, cutoff=RESAMPLER_CUTOFF):
+    """
+    up/down 배율 변환용 원형(prototype) 저역 통과 FIR (Kaiser 창 sinc, 길이 up * taps_per_phase).
+    차단 주파수는 입력/출력 중 낮은 쪽 나이퀴스트의 cutoff배이고, 보간 이득(up)을 포함합니다.
+    """
+    length = up * taps_per_phase
+    fc = cutoff * 0.5 / max(up, down) # 업샘플된 율 기준 정규화 주파수
+    n = np.arange(length) - (length - 1) / 2
+    h = 2 * fc * np.sinc(2 * fc * n) * np.kaiser(length, 8.6) # beta 8.6: 저지대역 약 -86dB
+    return (h * (up / h.sum())).astype(np.float32)
+
+
+class PolyphaseResampler:
+    """
+    스트리밍 유리수 배율(up/down) 폴리페이즈 리샘플러.
+    출력 샘플마다 필요한 위상의 필터 계수(taps_per_phase개)만 곱하므로 업샘플링한 신호를 만들지 않고,
+    청크 사이의 필터 이력과 위상을 보존해 청크를 어떻게 나눠 넣어도 한 번에 처리한 결과와 같습니다.
+    """
+    def __init__(self, in_rate, out_rate=RATE, taps_per_phase=RESAMPLER_TAPS_PER_PHASE):
+        g = math.gcd(int(in_rate), int(out_rate))
+        self.in_rate, self.out_rate = int(in_rate), int(out_rate)
+        self.up, self.down = self.out_rate // g, self.in_rate // g
+        self.taps = taps_per_phase
+        h = design_lowpass(self.up, self.down, taps_per_phase)
+        # 위상 p의 계수 h[p::up]를 입력 창(오래된 것 -> 최신) 순서에 맞게 뒤집어 둠: (up, taps)
+        self._phase_taps = np.ascontiguousarray(h.reshape(taps_per_phase, self.up).T[:, ::-1])
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32) # 직전 입력의 마지막 taps-1 샘플
+        self._offset = 0 # 다음 출력 샘플의 위치 (업샘플된 단위, 현재 청크 첫 샘플 기준)
+
+    def process(self, samples):
+        """float32 모노 청크 -> 변환된 float32 청크 (출력 길이는 위상에 따라 청크마다 ±1)"""
+        n_in = len(samples)
+        span = n_in * self.up
+        count = max(0, -(-(span - self._offset) // self.down)) # ceil
+        buf = np.concatenate((self._history, samples))
+        if count:
+            positions = self._offset + self.down * np.arange(count)
+            index, phase = np.divmod(positions, self.up)
+            windows = sliding_window_view(buf, self.taps)[index] # buf[i : i + taps] = 입력 i-taps+1 .. i
+            out = np.einsum('nk,nk->n', windows, self._phase_taps[phase])
+        else:
+            out = np.zeros(0, dtype=np.float32)
+        self._offset += count * self.down - span
+        self._history = buf[len(buf) - (self.taps - 1):]
+        return out
+
+
+class CaptureConverter:
+    """
+    장치 기본 형식(int16, 임의 샘플레이트/채널)으로 캡처한 바이트 -> 파이프라인 형식(RATE, 모노 int16) 바이트.
+    다채널은 평균으로 다운믹스한 뒤 PolyphaseResampler로 변환하며, 이미 RATE 모노이면 그대로 통과시킵니다.
+    """
+    def __init__(self, in_rate, in_channels, out_rate=RATE):
+        self.in_rate, self.in_channels = int(in_rate), int(in_channels)
+        self.passthrough = self.in_rate == out_rate and self.in_channels == 1
+        self.resampler = None if self.in_rate == out_rate else PolyphaseResampler(self.in_rate, out_rate)
+
+    def reset(self):
+        if self.resampler: self.resampler.reset()
+
+    def convert(self, data):
+        if self.passthrough: return data
+        samples = downmix(np.frombuffer(data, dtype=np.int16), self.in_channels)
+        if self.resampler: samples = self.resampler.process(samples)
+        return np.clip(np.rint(samples), -32768, 32767).astype(np.int16).tobytes()
+
+    def describe(self):
+        return f"{self.in_rate}Hz {self.in_channels}ch -> {RATE}Hz 1ch"
@@ -0,0 +1,217 @@
+# benchmarks/fake_servers.py
+import datetime
+import json
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import grpc
+from google.cloud import speech
+
+class FakeSpeechServer:
+    """
+    로컬 가짜 gRPC Speech 서버 (google.cloud.speech.v1.Speech/StreamingRecognize).
+    요청 오디오를 계속 읽으면서, 스트림 시작 기준으로 스크립트 타임라인의 응답을
+    t + latency + jitter 시각에 보냅니다. 실제 Speech API처럼 클라이언트가 요청 스트림을 닫은(half-close) 뒤에도
+    남은 응답을 예정 시각에 보내고, 클라이언트가 호출을 취소했을 때만 중단합니다.
+    """
+    def __init__(self, timeline, latency_sec=0.3, jitter_sec=0.1, seed=0):
+        """timeline: [{"t", "transcript" 또는 "results", "is_final", "stability"}, ...] (replay 스크립트와 같은 형식)"""
+        self.timeline = sorted(timeline, key=lambda e: float(e["t"]))
+        self.latency_sec = latency_sec
+        self.jitter_sec = jitter_sec
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.streams = 0
+        self.audio_bytes = 0
+        self.responses_sent = 0
+        self._server = None
+        self.address = None
+
+    def start(self):
+        handler = grpc.method_handlers_generic_handler("google.cloud.speech.v1.Speech", {
+            "StreamingRecognize": grpc.stream_stream_rpc_method_handler(
+                self._streaming_recognize,
+                request_deserializer=speech.StreamingRecognizeRequest.deserialize,
+                response_serializer=speech.StreamingRecognizeResponse.serialize,
+            ),
+        })
+        self._server = grpc.server(ThreadPoolExecutor(max_workers=16))
+        self._server.add_generic_rpc_handlers((handler,))
+        port = self._server.add_insecure_port("127.0.0.1:0")
+        self._server.start()
+        self.address = f"127.0.0.1:{port}"
+        return self
+
+    def stop(self):
+        if self._server: self._server.stop(grace=0.5)
+
+    def _build_response(self, event):
+        t = float(event["t"])
+        is_final = bool(event.get("is_final", False))
+        parts = event.get("results") or [{"transcript": event.get("transcript", ""), "stability": event.get("stability", 0.0)}]
+        return speech.StreamingRecognizeResponse(results=[
+            speech.StreamingRecognitionResult(
+                alternatives=[speech.SpeechRecognitionAlternative(transcript=p.get("transcript", ""))],
+                is_final=is_final and i == 0,
+                stability=float(p.get("stability", 1.0 if is_final else 0.0)),
+                result_end_time=datetime.timedelta(seconds=t),
+            ) for i, p in enumerate(parts)
+        ])
+
+    def _streaming_recognize(self, request_iterator, context):
+        with self._lock: self.streams += 1
+        done = threading.Event() # 요청 스트림 끝 (half-close)
+        ended = threading.Event() # 호출 종료 (클라이언트 취소 등)
+        context.add_callback(ended.set)
+
+        def _drain():
+            try:
+                for request in request_iterator:
+                    if request.audio_content:
+                        with self._lock: self.audio_bytes += len(request.audio_content)
+            except Exception: pass
+            finally: done.set()
+
+        threading.Thread(target=_drain, name="FakeSpeechDrain", daemon=True).start()
+        start = time.monotonic()
+        for event in self.timeline:
+            with self._lock: jitter = self._random.uniform(0, self.jitter_sec)
+            due = start + float(event["t"]) + self.latency_sec + jitter
+            wait = due - time.monotonic()
+            if wait > 0: ended.wait(wait)
+            if ended.is_set() or not context.is_active(): return
+            with self._lock: self.responses_sent += 1
+            yield self._build_response(event)
+        # 타임라인이 먼저 끝나면 클라이언트가 요청 스트림을 닫을 때까지 유지
+        while not done.is_set() and not ended.is_set(): done.wait(0.1)
+
+    def stats(self):
+        with self._lock:
+            return {"streams": self.streams, "audio_bytes": self.audio_bytes, "responses": self.responses_sent}
+
+
+class FakeTranslateServer:
+    """
+    로컬 가짜 Translation v2 HTTP 서버 (/language/translate/v2).
+    요청마다 latency + jitter 만큼 지연한 뒤 "[타겟코드] 원문" 형태로 응답하고 호출 수를 집계합니다.
+    tail_ratio 비율의 요청은 tail_sec를 더 지연시켜 꼬리 지연(느린 백엔드 인스턴스 등)을 흉내 냅니다.
+    """
+    def __init__(self, latency_sec=0.15, jitter_sec=0.1, seed=0, tail_ratio=0.0, tail_sec=2.0):
+        self.latency_sec = latency_sec
+        self.jitter_sec = jitter_sec
+        self.tail_ratio = tail_ratio
+        self.tail_sec = tail_sec
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.segments = 0
+        self.characters = 0
+        self.slow_requests = 0
+        self._server = None
+        self.url = None
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args): pass # 요청 로그 출력 안 함
+
+            def _reply(self, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._reply({"data": {"languages": []}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                data = json.loads(self.rfile.read(length) or b"{}")
+                texts = data.get("q", [])
+                if isinstance(texts, str): texts = [texts]
+                with fake._lock:
+                    fake.requests += 1
+                    fake.segments += len(texts)
+                    fake.characters += sum(len(t) for t in texts)
+                    delay = fake.latency_sec + fake._random.uniform(0, fake.jitter_sec)
+                    if fake._random.random() < fake.tail_ratio:
+                        delay += fake.tail_sec
+                        fake.slow_requests += 1
+                time.sleep(delay)
+                target = data.get("target", "")
+                self._reply({"data": {"translations": [{"translatedText": f"[{target}] {t}"} for t in texts]}})
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="FakeTranslateServer", daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "segments": self.segments, "characters": self.characters, "slow_requests": self.slow_requests}
+
+
+def _serve(conn, timeline, speech_kwargs, translate_kwargs):
+    """FakeServerProcess의 자식 프로세스: 두 서버를 띄우고 부모의 명령("stats"/"stop")을 처리"""
+    speech_server = FakeSpeechServer(timeline, **speech_kwargs).start()
+    translate_server = FakeTranslateServer(**translate_kwargs).start()
+    conn.send((speech_server.address, translate_server.url))
+    try:
+        while conn.recv() == "stats":
+            conn.send({"speech": speech_server.stats(), "translate": translate_server.stats()})
+    except EOFError: pass # 부모 종료
+    finally:
+        speech_server.stop()
+        translate_server.stop()
+
+
+class FakeServerProcess:
+    """
+    가짜 Speech/Translate 서버를 별도 프로세스에서 실행합니다.
+    벤치마크 프로세스의 CPU 시간(process_time)과 최대 메모리(ru_maxrss)에 가짜 서버의 비용이 섞이지 않도록 합니다.
+    """
+    def __init__(self, timeline, speech_kwargs=None, translate_kwargs=None):
+        self.timeline = timeline
+        self.speech_kwargs = speech_kwargs or {}
+        self.translate_kwargs = translate_kwargs or {}
+        self._process = None
+        self._conn = None
+        self.speech_address = None
+        self.translate_url = None
+
+    def start(self, timeout=30.0):
+        context = multiprocessing.get_context("spawn") # 부모의 스레드/gRPC 상태를 물려받지 않도록
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_serve, args=(child_conn, self.timeline, self.speech_kwargs, self.translate_kwargs),
+                                        name="FakeServers", daemon=True)
+        self._process.start()
+        child_conn.close()
+        if not self._conn.poll(timeout): raise RuntimeError("가짜 서버 프로세스 시작 시간 초과")
+        self.speech_address, self.translate_url = self._conn.recv()
+        return self
+
+    def stats(self):
+        """{"speech": FakeSpeechServer.stats(), "translate": FakeTranslateServer.stats()}"""
+        self._conn.send("stats")
+        return self._conn.recv()
+
+    def stop(self):
+        if not self._process: return
+        try: self._conn.send("stop")
+        except (BrokenPipeError, OSError): pass
+        self._process.join(timeout=5)
+        if self._process.is_alive(): self._process.terminate()
+        self._conn.close()
+        self._process = None
@@ -0,0 +1,213 @@
+# benchmarks/run_pipeline_benchmark.py
+"""
+실제 RealtimeTranslatorApp 스레드 파이프라인(녹음 -> _audio_generator -> process_stream -> update_ui)을
+WAV 고정 파일과 로컬 가짜 Speech/Translate 서버로 구동하는 재현 가능한 벤치마크.
+
+사용 예 (저장소 루트에서, Tk 표시 장치 필요 - 리눅스 서버는 xvfb-run 사용):
+    python benchmarks/run_pipeline_benchmark.py --generate-fixture
+    python benchmarks/run_pipeline_benchmark.py --save-baseline
+    python benchmarks/run_pipeline_benchmark.py            # baseline 대비 회귀 검사 (회귀 시 종료 코드 1)
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+import time
+import wave
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import grpc
+import tkinter as tk
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import speech
+from google.cloud import translate_v2 as translate
+from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport, SpeechGrpcAsyncIOTransport
+
+from config import RATE
+from client_pool import ClientPool
+from main import RealtimeTranslatorApp
+from replay_recognizer import WavAudioSource
+from translation_cache import TranslationCache
+from benchmarks.fake_servers import FakeServerProcess
+
+DEFAULT_WAV = os.path.join(BENCH_DIR, "fixtures", "speech.wav")
+DEFAULT_SCRIPT = os.path.join(BENCH_DIR, "fixtures", "speech_script.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+# 회귀 검사 대상 지표 (값이 클수록 나쁨)
+REGRESSION_METRICS = [
+    "latency.first_interim.p95", "latency.final_arrival.p95", "latency.translate.p95",
+    "latency.queue_wait.p95", "latency.render.p95",
+    "api.translate.requests", "api.translate.characters", "resources.cpu_percent",
+]
+
+def generate_fixture(wav_path, script_path, utterances=12, seed_words=None):
+    """합성 고정 파일 생성: 발화(톤 버스트)/무음이 번갈아 나오는 WAV와 그에 맞는 인식 타임라인"""
+    words = seed_words or "the quick brown fox jumps over the lazy dog while the band keeps playing".split()
+    os.makedirs(os.path.dirname(wav_path), exist_ok=True)
+    frames = bytearray()
+    timeline = []
+    t = 0.5
+    frames += bytes(int(RATE * 0.5) * 2)
+    for u in range(utterances):
+        n_words = 6 + u % 5
+        utter_words = [words[(u + i) % len(words)] for i in range(n_words)]
+        word_sec = 0.3
+        for i in range(n_words):
+            freq = 180 + 40 * ((u + i) % 5)
+            for n in range(int(RATE * word_sec)):
+                frames += struct.pack('<h', int(8000 * math.sin(2 * math.pi * freq * n / RATE)))
+            partial = " ".join(utter_words[:i + 1])
+            stable = " ".join(utter_words[:max(0, i - 1)])
+            results = [{"transcript": stable, "stability": 0.9}, {"transcript": partial[len(stable):], "stability": 0.1}] if stable else None
+            event = {"t": round(t + (i + 1) * word_sec, 3)}
+            if results: event["results"] = results
+            else: event.update({"transcript": partial, "stability": 0.1})
+            timeline.append(event)
+        t += n_words * word_sec
+        sentence = " ".join(utter_words).capitalize() + "."
+        timeline.append({"t": round(t + 0.4, 3), "transcript": sentence, "is_final": True})
+        silence = 1.0 + (u % 3) * 0.5
+        frames += bytes(int(RATE * silence) * 2)
+        t += silence
+    with wave.open(wav_path, 'wb') as wav:
+        wav.setnchannels(1); wav.setsampwidth(2); wav.setframerate(RATE)
+        wav.writeframes(bytes(frames))
+    with open(script_path, 'w', encoding='utf-8') as f:
+        json.dump(timeline, f, ensure_ascii=False, indent=1)
+    print(f"고정 파일 생성: {wav_path} ({len(frames) / 2 / RATE:.1f}초), {script_path} (응답 {len(timeline)}개)")
+
+def make_client_pool(servers):
+    """가짜 서버(FakeServerProcess)에 연결하는 ClientPool"""
+    return ClientPool(
+        speech_factory=lambda: speech.SpeechClient(transport=SpeechGrpcTransport(channel=grpc.insecure_channel(servers.speech_address))),
+        translate_factory=lambda: translate.Client(credentials=AnonymousCredentials(), client_options={"api_endpoint": servers.translate_url}),
+        # asyncio 파이프라인용 (이벤트 루프 스레드에서 호출됨)
+        speech_async_factory=lambda: speech.SpeechAsyncClient(transport=SpeechGrpcAsyncIOTransport(channel=grpc.aio.insecure_channel(servers.speech_address))),
+    )
+
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError: # Windows
+        return None
+
+def run(args):
+    with open(args.script, 'r', encoding='utf-8') as f: timeline = json.load(f)
+    # 가짜 서버는 별도 프로세스에서 실행 (CPU/메모리 지표에 섞이지 않도록)
+    servers = FakeServerProcess(
+        timeline,
+        speech_kwargs={"latency_sec": args.speech_latency, "jitter_sec": args.speech_jitter, "seed": args.seed},
+        translate_kwargs={"latency_sec": args.translate_latency, "jitter_sec": args.translate_jitter, "seed": args.seed,
+                          "tail_ratio": args.translate_tail_ratio, "tail_sec": args.translate_tail_sec},
+    ).start()
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        app = RealtimeTranslatorApp(root, client_pool=make_client_pool(servers),
+                                    audio_source=WavAudioSource(args.wav))
+        app.translation_cache = TranslationCache(path=None) # 이전 실행의 캐시가 결과에 섞이지 않도록
+        subtitles = 0
+        # 디스패처가 프레임마다 호출하는 반영 함수를 감싸 실제로 화면에 반영된 결과 수 집계
+        original_render = app.ui_dispatcher.render
+        def counting_render(updates):
+            nonlocal subtitles
+            subtitles += len(updates)
+            original_render(updates)
+        app.ui_dispatcher.render = counting_render
+        cpu_start = time.process_time(); wall_start = time.monotonic()
+        if not app.start_recording(): raise RuntimeError("파이프라인 시작 실패")
+        # WAV 재생과 인식 스트림이 끝나고 번역/표시 대기열이 빌 때까지 Tk 이벤트 루프 구동
+        while any(session.is_busy() for session in app.sessions) or not app.text_queue.empty() or app.ui_dispatcher.pending():
+            root.update()
+            time.sleep(0.005)
+        for _ in range(20): root.update(); time.sleep(0.005)
+        wall = time.monotonic() - wall_start
+        cpu = time.process_time() - cpu_start
+        app.stop_recording()
+        result = {
+            "config": {k: getattr(args, k) for k in ("wav", "script", "speech_latency", "speech_jitter", "translate_latency", "translate_jitter",
+                                                   "translate_tail_ratio", "translate_tail_sec", "seed")},
+            "latency": app.latency.report(),
+            "api": servers.stats(),
+            "resources": {"wall_sec": wall, "cpu_sec": cpu, "cpu_percent": cpu / wall * 100 if wall else None, "peak_rss_mb": _peak_rss_mb()},
+            "subtitles_rendered": subtitles,
+            "ui_frames": app.ui_dispatcher.frames,
+            "upload": {session.name: session.recognizer.upload_stats() for session in app.sessions if session.recognizer},
+            "translate_guard": app.client_pool.translate_guard.report() if app.client_pool.translate_guard else None,
+        }
+    finally:
+        try: root.destroy()
+        except tk.TclError: pass
+        servers.stop()
+    return result
+
+def _lookup(data, dotted):
+    for key in dotted.split('.'):
+        if not isinstance(data, dict) or key not in data: return None
+        data = data[key]
+    return data
+
+def compare(result, baseline, tolerance, abs_slack_ms=20):
+    """baseline 대비 지표 비교. 회귀 목록 반환"""
+    regressions = []
+    for metric in REGRESSION_METRICS:
+        current, base = _lookup(result, metric), _lookup(baseline, metric)
+        if current is None or base is None: continue
+        slack = abs_slack_ms / 1000 if metric.startswith("latency.") else 0
+        limit = base * (1 + tolerance) + slack
+        status = "회귀" if current > limit else "정상"
+        print(f"  {metric:<32} 기준 {base:.4g} -> 현재 {current:.4g} ({status})")
+        if current > limit: regressions.append(metric)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="실시간 번역 파이프라인 벤치마크")
+    parser.add_argument("--wav", default=DEFAULT_WAV)
+    parser.add_argument("--script", default=DEFAULT_SCRIPT)
+    parser.add_argument("--speech-latency", type=float, default=0.3)
+    parser.add_argument("--speech-jitter", type=float, default=0.1)
+    parser.add_argument("--translate-latency", type=float, default=0.15)
+    parser.add_argument("--translate-jitter", type=float, default=0.1)
+    parser.add_argument("--translate-tail-ratio", type=float, default=0.0, help="추가 지연을 줄 번역 요청 비율 (꼬리 지연 재현)")
+    parser.add_argument("--translate-tail-sec", type=float, default=2.0, help="꼬리 요청에 더할 지연(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 baseline으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 증가율 (0.2 = 20%%)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--generate-fixture", action="store_true", help="합성 WAV/스크립트 고정 파일 생성 후 종료")
+    args = parser.parse_args()
+
+    if args.generate_fixture:
+        generate_fixture(args.wav, args.script)
+        return 0
+    if not os.path.exists(args.wav) or not os.path.exists(args.script):
+        print(f"고정 파일이 없습니다: {args.wav}, {args.script}\n--generate-fixture 로 생성하세요.")
+        return 2
+
+    result = run(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(result, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f: json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"baseline 저장: {args.baseline}")
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f: baseline = json.load(f)
+        print(f"=== baseline 비교 (허용 {args.tolerance * 100:.0f}%) ===")
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"회귀 감지: {', '.join(regressions)}")
+            return 1
+        print("회귀 없음")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# benchmarks/run_resampler_benchmark.py
+"""
+캡처 변환(다운믹스 + 폴리페이즈 리샘플링) 벤치마크.
+장치 기본 형식(44.1/48kHz 스테레오)의 합성 신호를 캡처 프레임 단위로 변환하면서
+CPU 비용과 품질(FFT 기반 기준 리샘플러 대비 SNR, 통과 대역 이득, 에일리어싱 억제, 청크 분할 무관성)을 측정합니다.
+비교용으로 선형 보간(np.interp)과, scipy가 설치돼 있으면 scipy.signal.resample_poly도 측정합니다.
+
+사용 예 (저장소 루트에서):
+    python benchmarks/run_resampler_benchmark.py
+    python benchmarks/run_resampler_benchmark.py --rates 44100 48000 96000 --seconds 20 --output resampler.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np
+from config import RATE, CAPTURE_FRAME_MS, RESAMPLER_TAPS_PER_PHASE, RESAMPLER_CUTOFF
+from audio_resampler import PolyphaseResampler, CaptureConverter, downmix
+
+try:
+    from scipy.signal import resample_poly
+except ImportError:
+    resample_poly = None
+
+# 품질 측정 시 양 끝에서 제외할 길이 (필터 과도 구간)
+EDGE_SEC = 0.05
+
+def reference_resample(x, in_rate, out_rate, delay_in_samples=0.0):
+    """
+    기준 리샘플러: 전체 신호 FFT로 출력 나이퀴스트 이하 성분만 남기는 이상적 대역 제한 리샘플링.
+    delay_in_samples(입력 샘플 단위)만큼 지연시켜 비교 대상 필터의 군지연을 맞춥니다.
+    """
+    n_out = len(x) * out_rate // in_rate
+    spectrum = np.fft.rfft(x)
+    freqs = np.fft.rfftfreq(len(x), d=1.0 / in_rate)
+    spectrum = spectrum * np.exp(-2j * np.pi * freqs * delay_in_samples / in_rate)
+    spectrum[freqs >= out_rate / 2] = 0
+    keep = n_out // 2 + 1
+    return np.fft.irfft(spectrum[:keep], n=n_out) * (n_out / len(x))
+
+def make_signal(in_rate, channels, seconds, seed):
+    """통과 대역 신호: 여러 톤 + 6kHz 이하로 대역 제한한 잡음 (채널마다 다른 내용)"""
+    rng = np.random.default_rng(seed)
+    n = int(in_rate * seconds)
+    t = np.arange(n) / in_rate
+    out = np.empty((n, channels))
+    for ch in range(channels):
+        tones = sum(np.sin(2 * np.pi * f * t + rng.uniform(0, 2 * np.pi)) for f in (180 + 40 * ch, 440, 1250, 3100, 5200))
+        noise = np.fft.rfft(rng.standard_normal(n))
+        noise[np.fft.rfftfreq(n, 1.0 / in_rate) > 6000] = 0
+        noise = np.fft.irfft(noise, n=n)
+        out[:, ch] = tones / 5 * 0.4 + noise / noise.std() * 0.1
+    return (out * 32767 * 0.5).astype(np.int16)
+
+def tone_gain_db(resample, in_rate, freq, seconds=1.0):
+    """단일 톤을 변환한 출력 RMS / 입력 RMS (dB). 출력 나이퀴스트 위의 톤은 에일리어싱 억제량"""
+    t = np.arange(int(in_rate * seconds)) / in_rate
+    x = np.sin(2 * np.pi * freq * t).astype(np.float32)
+    y = resample(x)
+    edge = int(RATE * EDGE_SEC)
+    y = y[edge:-edge]
+    return 20 * np.log10(max(np.sqrt(np.mean(y ** 2)), 1e-12) / np.sqrt(0.5))
+
+def snr_db(reference, y):
+    n = min(len(reference), len(y))
+    edge = int(RATE * EDGE_SEC)
+    ref, out = reference[edge:n - edge], y[edge:n - edge]
+    return 10 * np.log10(np.sum(ref ** 2) / max(np.sum((ref - out) ** 2), 1e-20))
+
+def chunked(process, x, chunk):
+    return np.concatenate([process(x[i:i + chunk]) for i in range(0, len(x), chunk)])
+
+def measure(name, in_rate, stereo, mono, resample, streaming, chunk, delay=0.0, bytes_path=None):
+    """resample: 모노 float 전체 신호 변환 함수. streaming: 청크 단위 변환 함수 생성기 (없으면 전체 처리만)"""
+    seconds = len(mono) / in_rate
+    if bytes_path:
+        # 실제 캡처 경로와 같은 int16 바이트 -> int16 바이트 변환의 CPU 시간
+        frames = [stereo[i:i + chunk].tobytes() for i in range(0, len(stereo), chunk)]
+        cpu_start = time.process_time()
+        for frame in frames: bytes_path.convert(frame)
+        cpu = time.process_time() - cpu_start
+    else:
+        cpu_start = time.process_time()
+        resample(mono)
+        cpu = time.process_time() - cpu_start
+    y = resample(mono)
+    reference = reference_resample(mono, in_rate, RATE, delay)
+    result = {
+        "name": name,
+        "cpu_ms_per_audio_sec": cpu * 1000 / seconds,
+        "realtime_factor": seconds / cpu if cpu else None,
+        "snr_db": snr_db(reference, y),
+        "gain_db": {f"{f}Hz": tone_gain_db(resample, in_rate, f) for f in (1000, 3400, 6000, 7000)},
+        "alias_db": {f"{f}Hz": tone_gain_db(resample, in_rate, f) for f in (9000, 11000, 15000)},
+    }
+    if streaming:
+        # 청크로 나눠 처리한 결과가 한 번에 처리한 결과와 같은지 (필터 상태 보존 확인)
+        result["chunked_max_abs_diff"] = float(np.max(np.abs(chunked(streaming(), mono, chunk) - y)))
+    return result
+
+def run(args):
+    results = []
+    for in_rate in args.rates:
+        stereo = make_signal(in_rate, args.channels, args.seconds, args.seed)
+        mono = downmix(stereo.reshape(-1), args.channels)
+        chunk = int(in_rate * args.chunk_ms / 1000)
+        resampler = PolyphaseResampler(in_rate)
+        # 군지연: 원형 필터 중심 ((up * taps - 1) / 2, 업샘플된 단위) -> 입력 샘플 단위
+        delay = (resampler.up * resampler.taps - 1) / 2 / resampler.up
+        entries = [measure("polyphase", in_rate, stereo, mono, lambda x: PolyphaseResampler(in_rate).process(x),
+                           lambda: PolyphaseResampler(in_rate).process, chunk, delay,
+                           bytes_path=CaptureConverter(in_rate, args.channels))]
+        n_out = len(mono) * RATE // in_rate
+        entries.append(measure("linear_interp", in_rate, stereo, mono,
+                               lambda x: np.interp(np.arange(len(x) * RATE // in_rate) * in_rate / RATE, np.arange(len(x)), x),
+                               None, chunk))
+        if resample_poly:
+            g = np.gcd(in_rate, RATE)
+            entries.append(measure("scipy_resample_poly", in_rate, stereo, mono,
+                                   lambda x: resample_poly(x, RATE // g, in_rate // g), None, chunk))
+        results.append({"in_rate": in_rate, "channels": args.channels, "out_samples": n_out, "results": entries})
+    return {
+        "config": {"seconds": args.seconds, "chunk_ms": args.chunk_ms, "taps_per_phase": RESAMPLER_TAPS_PER_PHASE, "cutoff": RESAMPLER_CUTOFF},
+        "rates": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="캡처 다운믹스/리샘플링 벤치마크")
+    parser.add_argument("--rates", type=int, nargs="+", default=[44100, 48000])
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-ms", type=int, default=CAPTURE_FRAME_MS, help="캡처 프레임 길이 (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# client_pool.py
+import threading
+import time
+import traceback
+import grpc
+from google.cloud import speech
+from google.cloud import translate_v2 as translate
+from config import CLIENT_WARMUP_TIMEOUT_SEC, CLIENT_HEALTH_CHECK_TIMEOUT_SEC, TRANSLATE_GUARD_ENABLED
+from translate_guard import TranslateRequestGuard
+
+class ClientPool:
+    """
+    Speech / Translate 클라이언트를 앱 수명 동안 재사용하는 풀.
+    앱 시작 시 백그라운드에서 생성 및 예열(자격 증명 로드, 채널 연결)하고,
+    시작/중지 반복이나 언어 변경 시에도 같은 클라이언트를 넘겨줍니다. 상태 점검 실패 시 재연결합니다.
+    Speech 클라이언트(gRPC 채널)는 여러 세션의 스트림이 함께 쓰므로 세션은 acquire/release로 빌려 쓰고,
+    재연결로 교체된 이전 클라이언트는 마지막으로 쓰던 세션이 반납할 때 닫습니다.
+    번역 API 호출 보호(translate_guard: 기한/재시도/헤지/회로 차단기)도 모든 세션이 함께 씁니다.
+    """
+    def __init__(self, speech_factory=speech.SpeechClient, translate_factory=translate.Client, speech_async_factory=speech.SpeechAsyncClient):
+        # factory가 None이면 해당 클라이언트는 사용하지 않음 (예: replay 인식 백엔드)
+        self.speech_factory = speech_factory
+        # asyncio 파이프라인용 Speech 클라이언트 factory (grpc.aio 채널은 이벤트 루프에 묶이므로 루프 안에서 호출)
+        self.speech_async_factory = speech_async_factory
+        self.translate_factory = translate_factory
+        self._lock = threading.RLock()
+        self._speech_client = None
+        self._speech_leases = {} # id(Speech 클라이언트) -> 빌려 쓰는 세션 수
+        self._retired_speech_clients = {} # id -> 교체됐지만 아직 쓰는 세션이 있어 닫지 않은 클라이언트
+        self._translate_client = None
+        self._ready = threading.Event()
+        self._warmup_thread = None
+        self._health_thread = None
+        self.reconnects = 0
+        self.translate_guard = TranslateRequestGuard() if TRANSLATE_GUARD_ENABLED and translate_factory else None
+
+    def warm_up_async(self, speech=True):
+        """
+        백그라운드 스레드에서 클라이언트 생성 및 예열 시작.
+        speech: False면 동기 Speech 클라이언트는 만들지 않음 (asyncio 파이프라인은 AsyncPipelineRuntime이 SpeechAsyncClient를 예열)
+        """
+        if self._warmup_thread and self._warmup_thread.is_alive(): return
+        self._ready.clear()
+        self._warmup_thread = threading.Thread(target=self._warm_up, args=(speech,), name="ClientWarmupThread", daemon=True)
+        self._warmup_thread.start()
+
+    def _warm_up(self, speech=True):
+        start = time.monotonic()
+        try:
+            with self._lock:
+                if speech and self._speech_client is None and self.speech_factory: self._speech_client = self.speech_factory()
+                if self._translate_client is None and self.translate_factory: self._translate_client = self.translate_factory()
+            speech_ready = self._wait_speech_channel(CLIENT_WARMUP_TIMEOUT_SEC) if speech else None
+            translate_ready = self._ping_translate()
+            speech_state = "준비됨" if speech_ready else ("미확인" if speech else "사용 안 함")
+            print(f"API 클라이언트 예열 완료 ({time.monotonic() - start:.2f}초, Speech 채널: {speech_state}, "
+                  f"Translate: {'준비됨' if translate_ready else '미확인'})")
+        except Exception as e:
+            print(f"API 클라이언트 예열 실패: {e}")
+            traceback.print_exc()
+        finally:
+            self._ready.set()
+
+    def _speech_channel(self, client=None):
+        client = client or self._speech_client
+        transport = getattr(client, 'transport', None) if client else None
+        return getattr(transport, 'grpc_channel', None)
+
+    def _wait_speech_channel(self, timeout, client=None):
+        """Speech gRPC 채널이 연결될 때까지 대기 (연결 시도 유발, 잠금 없이 호출). 연결되면 True"""
+        channel = self._speech_channel(client)
+        if channel is None: return False
+        try:
+            grpc.channel_ready_future(channel).result(timeout=timeout)
+            return True
+        except grpc.FutureTimeoutError:
+            return False
+
+    def _ping_translate(self):
+        """가벼운 요청으로 Translate HTTP 세션(TLS 연결) 예열. 성공하면 True"""
+        client = self._translate_client
+        if client is None: return False
+        try:
+            client.get_languages()
+            return True
+        except Exception as e:
+            print(f"Translate 클라이언트 확인 실패: {e}")
+            return False
+
+    def _wait_ready(self):
+        if self._warmup_thread: self._ready.wait(CLIENT_WARMUP_TIMEOUT_SEC)
+
+    def get_speech_client(self):
+        """Speech 클라이언트 반환 (없으면 생성). 예열 완료를 기다리지 않음 (스트림이 채널 연결을 기다림)"""
+        with self._lock:
+            if self._speech_client is None and self.speech_factory: self._speech_client = self.speech_factory()
+            return self._speech_client
+
+    def acquire_speech_client(self):
+        """세션이 쓸 현재 Speech 클라이언트를 빌림 (스트림을 다 쓰면 release_speech_client로 반납). 예열 완료를 기다리지 않음"""
+        with self._lock:
+            if self._speech_client is None and self.speech_factory: self._speech_client = self.speech_factory()
+            client = self._speech_client
+            if client is not None: self._speech_leases[id(client)] = self._speech_leases.get(id(client), 0) + 1
+            return client
+
+    def release_speech_client(self, client):
+        """빌린 Speech 클라이언트 반납. 재연결로 교체된 클라이언트는 마지막 세션이 반납할 때 닫음"""
+        if client is None: return
+        with self._lock:
+            count = self._speech_leases.get(id(client), 0) - 1
+            if count > 0:
+                self._speech_leases[id(client)] = count
+                return
+            self._speech_leases.pop(id(client), None)
+            retired = self._retired_speech_clients.pop(id(client), None)
+        if retired is not None: self._close_client(retired)
+
+    def create_speech_async_client(self):
+        """asyncio 파이프라인용 SpeechAsyncClient 생성 (이벤트 루프 스레드에서 호출, 재사용은 호출 측에서 관리)"""
+        return self.speech_async_factory() if self.speech_async_factory else None
+
+    def get_translate_client(self):
+        """Translate 클라이언트 반환 (없으면 생성). 예열 완료를 기다리지 않음"""
+        with self._lock:
+            if self._translate_client is None and self.translate_factory: self._translate_client = self.translate_factory()
+            return self._translate_client
+
+    def check_health_async(self):
+        """녹음 시작 시 호출: Speech 채널 상태 점검(ensure_healthy)을 백그라운드 스레드에서 실행 (Tk 메인 스레드를 막지 않음)"""
+        if not self.speech_factory: return
+        if self._health_thread and self._health_thread.is_alive(): return
+        self._health_thread = threading.Thread(target=self.ensure_healthy, name="ClientHealthCheckThread", daemon=True)
+        self._health_thread.start()
+
+    def ensure_healthy(self, timeout=CLIENT_HEALTH_CHECK_TIMEOUT_SEC):
+        """
+        Speech 채널 상태 점검 (예열 대기 + 연결 대기로 오래 걸릴 수 있으므로 check_health_async로 호출).
+        채널이 연결되지 않으면 재연결하며, 연결을 기다리는 동안에는 잠금을 잡지 않습니다.
+        """
+        self._wait_ready()
+        if not self.speech_factory: return True
+        with self._lock: client = self._speech_client
+        if client is not None and self._speech_channel(client) is not None:
+            if self._wait_speech_channel(timeout, client): return True
+            print("Speech 채널 상태 점검 실패, 재연결 시도...")
+        self.reconnect_speech(client) # 점검하는 동안 다른 세션이 이미 교체했으면 그대로 둠
+        with self._lock: client = self._speech_client
+        return self._wait_speech_channel(timeout, client)
+
+    def reconnect_speech(self, failed=None):
+        """
+        Speech 클라이언트를 새로 생성해 교체 (스트림 오류 후 호출).
+        failed: 오류가 난 스트림이 쓰던 클라이언트. 다른 세션이 이미 교체했으면(현재 클라이언트가 아니면) 다시 교체하지 않습니다.
+        이전 클라이언트는 다른 세션의 스트림이 아직 쓰고 있을 수 있으므로 빌려 쓰는 세션이 없을 때만 바로 닫습니다.
+        """
+        if not self.speech_factory: return
+        with self._lock:
+            if failed is not None and failed is not self._speech_client: return # 이미 새 클라이언트로 교체됨
+            try: new = self.speech_factory()
+            except Exception as e:
+                print(f"Speech 클라이언트 재연결 실패: {e}")
+                return
+            old, self._speech_client = self._speech_client, new
+            self.reconnects += 1
+            if old is not None and self._speech_leases.get(id(old)):
+                self._retired_speech_clients[id(old)] = old # 마지막 세션이 반납할 때 닫음
+                old = None
+        self._close_client(old)
+        print(f"Speech 클라이언트 재연결 완료 (누적 {self.reconnects}회)")
+
+    def reconnect_translate(self):
+        """Translate 클라이언트를 새로 생성"""
+        with self._lock:
+            try:
+                self._translate_client = self.translate_factory()
+                self.reconnects += 1
+                print(f"Translate 클라이언트 재연결 완료 (누적 {self.reconnects}회)")
+            except Exception as e:
+                print(f"Translate 클라이언트 재연결 실패: {e}")
+
+    @staticmethod
+    def _close_client(client):
+        transport = getattr(client, 'transport', None) if client else None
+        if transport is None: return
+        try: transport.close()
+        except Exception as e: print(f"Speech 클라이언트 닫기 중 오류: {e}")
+
+    def close(self):
+        """앱 종료 시 채널 정리"""
+        with self._lock:
+            clients = [self._speech_client, *self._retired_speech_clients.values()]
+            self._speech_client = None
+            self._speech_leases.clear()
+            self._retired_speech_clients.clear()
+            self._translate_client = None
+        for client in clients: self._close_client(client)
+        if self.translate_guard:
+            print(self.translate_guard.stats_summary())
+            self.translate_guard.close()
@@ -13,6 +13,26 @@ CHANNELS = 1
 RATE = 16000
 # CHUNK: 마이크에서 읽는 단위. 스트리밍 API로 보낼 때도 이 크기를 사용할 수 있음
 CHUNK = int(RATE / 10) # 100ms 단위 청크 (조정 가능)
+# AUDIO_CAPTURE_MODE: "callback"(PyAudio stream_callback으로 작은 프레임을 미리 할당된 버퍼에 기록) 또는 "blocking"(CHUNK 단위 stream.read)
+AUDIO_CAPTURE_MODE = "callback"
+# CAPTURE_FRAME_MS: callback 모드에서 장치로부터 받는 프레임 길이(ms). 작을수록 캡처 지연이 줄어듦
+CAPTURE_FRAME_MS = 20
+FRAME = int(RATE * CAPTURE_FRAME_MS / 1000)
+# AUDIO_NATIVE_CAPTURE: True면 장치 기본 샘플레이트/채널(최대 2)로 캡처한 뒤 다운믹스 + 리샘플링으로 RATE 모노로 변환
+# (루프백/오디오 인터페이스는 대부분 44.1/48kHz 스테레오). False면 장치를 RATE 모노로 열어 호스트 변환에 맡김
+AUDIO_NATIVE_CAPTURE = True
+# RESAMPLER_TAPS_PER_PHASE: 폴리페이즈 리샘플러의 위상당 필터 탭 수 (클수록 전이 대역이 좁아지고 CPU 증가)
+RESAMPLER_TAPS_PER_PHASE = 96
+# RESAMPLER_CUTOFF: 저역 통과 차단 주파수 (출력 나이퀴스트 대비 비율, 16kHz 출력 시 0.9 = 7.2kHz)
+RESAMPLER_CUTOFF = 0.9
+# SEND_CHUNK_MS: 프레임을 모아 Speech API로 보내는 단위(ms). 캡처 프레임 크기와 독립적으로 설정
+SEND_CHUNK_MS = 50
+SEND_CHUNK = int(RATE * SEND_CHUNK_MS / 1000)
+# AUDIO_UPLOAD_ENCODING: Speech API로 보낼 때의 오디오 인코딩. "LINEAR16"(무압축), "FLAC"(무손실 압축), "OGG_OPUS"(손실 압축, 대역폭 최소)
+# FLAC/OGG_OPUS는 soundfile 패키지 필요 (없으면 LINEAR16으로 전송). RecognitionConfig.encoding은 자동으로 맞춰짐
+AUDIO_UPLOAD_ENCODING = "LINEAR16"
+# OGG_OPUS_PAGE_LATENCY_MS: Ogg 페이지를 내보내는 간격(ms). 전송 단위에 맞춰 인코더에서 오디오가 머무는 시간을 줄임
+OGG_OPUS_PAGE_LATENCY_MS = SEND_CHUNK_MS
 # RECORD_SECONDS는 스트리밍 방식에서는 직접 사용되지 않음
 
 # 언어 설정
@@ -53,7 +73,188 @@ TRANSLATE_CODES = {
 def get_timestamp():
     return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-# 로그 파일 이름 (원본 및 번역 텍스트)
+# 다중 번역 언어 설정
+# EXTRA_TARGET_LANGUAGES: 선택한 번역 언어와 함께 동시에 번역할 추가 언어 (표시 이름, UI의 "추가 번역" 메뉴 기본 선택값)
+EXTRA_TARGET_LANGUAGES = []
+
+# 파이프라인 실행 방식
+# PIPELINE_MODE: "asyncio"(이벤트 루프 스레드 하나에서 캡처 알림 -> 인식 -> 번역을 태스크로 처리, 폴링 없음, 중지 즉시 반영)
+#                또는 "threads"(세션마다 녹음/처리 스레드와 UI 갱신 스레드가 큐를 폴링하는 기존 방식)
+PIPELINE_MODE = "asyncio"
+
+# 다중 입력 설정 (장치마다 별도 녹음/인식 파이프라인, 클라이언트 풀과 출력은 공유)
+# MAX_INPUT_PIPELINES: 동시에 사용할 수 있는 최대 입력 장치 수
+MAX_INPUT_PIPELINES = 4
+# TRANSLATION_SHARED_WORKERS: 모든 입력/번역 언어가 함께 쓰는 번역 요청 스레드 수
+TRANSLATION_SHARED_WORKERS = 8
+
+# 로그 파일 이름 (원본 및 번역 텍스트). 번역 파일은 번역 언어 코드가 붙어 언어별로 생성됨
 TIMESTAMP = get_timestamp()
 ORIGINAL_FILE = f"results/original_text_{TIMESTAMP}.txt"
-TRANSLATED_FILE = f"results/translated_text_{TIMESTAMP}.txt"
\ No newline at end of file
+TRANSLATED_FILE = f"results/translated_text_{TIMESTAMP}.txt"
+
+# 번역 워커 풀 설정
+# TRANSLATION_WORKERS: 동시에 진행할 번역 API 요청 수
+TRANSLATION_WORKERS = 4
+# TRANSLATION_MAX_PENDING: 처리 대기 중인 번역 작업 상한. 초과 시 중간 결과(interim)는 버림 (최종 결과는 항상 처리)
+TRANSLATION_MAX_PENDING = 8
+# INTERIM_DEBOUNCE_SEC: 중간 결과 번역 최소 간격(초). 창 안에서 들어온 중간 결과는 가장 최신 것만 번역
+INTERIM_DEBOUNCE_SEC = 0.3
+
+# 번역 캐시 설정
+# TRANSLATION_CACHE_MAX_ENTRIES: 캐시 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 제거)
+TRANSLATION_CACHE_MAX_ENTRIES = 5000
+# TRANSLATION_CACHE_TTL_SEC: 캐시 항목 유효 시간(초). None이면 만료 없음
+TRANSLATION_CACHE_TTL_SEC = 7 * 24 * 3600
+# TRANSLATION_CACHE_FILE: 캐시 영구 저장 파일. None이면 디스크에 저장하지 않음
+TRANSLATION_CACHE_FILE = "results/translation_cache.json"
+
+# 묶음(batch) 번역 설정
+# TRANSLATION_BATCH_MAX_SIZE: 한 번의 번역 API 요청에 담을 최대 문장 수
+TRANSLATION_BATCH_MAX_SIZE = 16
+# TRANSLATION_BATCH_MAX_DELAY_SEC: 첫 문장이 들어온 뒤 묶음을 보내기까지 최대 대기 시간(초)
+TRANSLATION_BATCH_MAX_DELAY_SEC = 0.03
+
+# 번역 API 요청 보호 설정 (꼬리 지연/장애 대응: 호출 기한, 지터 백오프 재시도, 헤지 요청, 회로 차단기)
+# TRANSLATE_GUARD_ENABLED: False면 번역 API를 그대로 호출 (느린 요청 하나가 끝날 때까지 해당 자막이 멈춤)
+TRANSLATE_GUARD_ENABLED = True
+# TRANSLATE_DEADLINE_SEC: 번역 호출 하나(재시도와 헤지 포함)의 기한(초). 넘으면 더 기다리지 않고 대체 텍스트를 표시
+TRANSLATE_DEADLINE_SEC = 2.0
+# TRANSLATE_MAX_ATTEMPTS: 오류 시 최대 시도 횟수 (첫 시도 포함, 잘못된 요청(4xx, 429 제외)은 재시도하지 않음)
+TRANSLATE_MAX_ATTEMPTS = 3
+# TRANSLATE_BACKOFF_BASE_SEC / TRANSLATE_BACKOFF_MAX_SEC: n번째 재시도 전 대기 = 0 ~ min(MAX, BASE x 2^(n-1)) 사이 균등 난수 (full jitter)
+TRANSLATE_BACKOFF_BASE_SEC = 0.1
+TRANSLATE_BACKOFF_MAX_SEC = 0.8
+# TRANSLATE_HEDGE_ENABLED: True면 첫 요청이 최근 지연의 p(TRANSLATE_HEDGE_PERCENTILE)보다 오래 걸릴 때 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+TRANSLATE_HEDGE_ENABLED = True
+TRANSLATE_HEDGE_PERCENTILE = 95
+# TRANSLATE_HEDGE_MIN_DELAY_SEC: 헤지 요청을 보내기까지 최소 대기(초)
+TRANSLATE_HEDGE_MIN_DELAY_SEC = 0.05
+# TRANSLATE_HEDGE_WINDOW: 헤지 지연 계산에 쓰는 최근 성공 시도 수 (TRANSLATE_HEDGE_MIN_SAMPLES개 미만이면 헤지 안 함)
+TRANSLATE_HEDGE_WINDOW = 200
+TRANSLATE_HEDGE_MIN_SAMPLES = 20
+# TRANSLATE_HEDGE_MAX_RATIO: 헤지 요청 수 상한 (전체 호출 대비 비율, API 사용량 증가 제한)
+TRANSLATE_HEDGE_MAX_RATIO = 0.1
+# TRANSLATE_MAX_IN_FLIGHT: 동시에 진행 중인 번역 API 시도 상한 (기한이 지나 버려진 시도 포함). 넘으면 새 호출은 바로 대체 텍스트
+TRANSLATE_MAX_IN_FLIGHT = 2 * TRANSLATION_SHARED_WORKERS
+# TRANSLATE_BREAKER_FAILURES: 연속 실패한 호출이 이 횟수에 이르면 회로 차단기를 열어 TRANSLATE_BREAKER_COOLDOWN_SEC 동안 API를 호출하지 않음
+# (이후 시험 호출 하나가 성공하면 다시 닫힘)
+TRANSLATE_BREAKER_FAILURES = 5
+TRANSLATE_BREAKER_COOLDOWN_SEC = 10.0
+# TRANSLATE_FALLBACK: 번역 실패(기한 초과/차단기 열림/오류) 시 번역 자리에 표시할 내용: "original"(원문 그대로) 또는 "error"("[번역 오류]")
+TRANSLATE_FALLBACK = "original"
+
+# 중간 결과 증분 번역 설정
+# INCREMENTAL_TRANSLATION: True면 중간 결과의 안정된(stable) 완결 문장은 이전 번역을 재사용하고 불안정한 꼬리만 다시 번역
+INCREMENTAL_TRANSLATION = True
+# STABILITY_THRESHOLD: 이 값 이상의 stability를 가진 인식 결과를 안정된 접두부로 간주
+STABILITY_THRESHOLD = 0.8
+
+# 스트리밍 세션 롤오버 설정 (Google 스트리밍 인식은 한 세션당 약 5분 제한)
+# STREAM_ROLLOVER_SEC: 이 시간이 지나면 새 streaming_recognize 세션으로 미리 전환
+STREAM_ROLLOVER_SEC = 280
+# STREAM_ROLLOVER_OVERLAP_SEC: 새 세션에 다시 보낼, 마지막 최종 결과 이전 구간 길이(초)
+STREAM_ROLLOVER_OVERLAP_SEC = 0.5
+# STREAM_ROLLOVER_MAX_REPLAY_SEC: 새 세션에 재전송할 보관 오디오 최대 길이(초)
+STREAM_ROLLOVER_MAX_REPLAY_SEC = 10
+
+# 오디오 링 버퍼 설정
+# AUDIO_BUFFER_SECONDS: 전송 대기 오디오 최대 보관 길이(초). 메모리와 최악의 오디오 지연 상한
+AUDIO_BUFFER_SECONDS = 5
+# AUDIO_OVERFLOW_POLICY: 버퍼가 가득 찼을 때 동작 - "drop_oldest"(가장 오래된 청크 버림), "drop_newest"(새 청크 버림), "block"(공간이 날 때까지 대기)
+AUDIO_OVERFLOW_POLICY = "drop_oldest"
+# AUDIO_BLOCK_TIMEOUT_SEC: "block" 정책에서 최대 대기 시간(초). 초과 시 새 청크를 버림
+AUDIO_BLOCK_TIMEOUT_SEC = 0.5
+
+# 오디오 저널 설정: 세션 오디오를 디스크(메모리 매핑 세그먼트 파일)에 계속 기록해 인식 장애 복구/오프라인 재처리에 사용
+# AUDIO_JOURNAL_ENABLED: False면 기록하지 않음 (인식 스트림 오류 시 바로 세션 오류)
+AUDIO_JOURNAL_ENABLED = True
+# AUDIO_JOURNAL_DIR: 저널 디렉터리 (세션(입력) 이름별 하위 디렉터리에 기록)
+AUDIO_JOURNAL_DIR = "results/audio_journal"
+# AUDIO_JOURNAL_SEGMENT_SEC: 세그먼트 파일 하나의 길이(초). 16kHz 모노 기준 1초에 32KB
+AUDIO_JOURNAL_SEGMENT_SEC = 60
+# AUDIO_JOURNAL_RETENTION_SEC: 보관 기간(초). 이보다 오래된 세그먼트는 삭제 (디스크 사용량 상한 약 32KB x (보관 기간 + 세그먼트 2개 길이))
+AUDIO_JOURNAL_RETENTION_SEC = 600
+# AUDIO_JOURNAL_RECOVERY_OVERLAP_SEC: 인식 스트림 오류 시 마지막 최종 결과가 나온 시점보다 이만큼(초) 앞부터 저널 오디오를 새 스트림에 재전송
+AUDIO_JOURNAL_RECOVERY_OVERLAP_SEC = 2.0
+# AUDIO_JOURNAL_MAX_REPLAY_SEC: 복구 시 재전송할 최대 길이(초)
+AUDIO_JOURNAL_MAX_REPLAY_SEC = 30
+# AUDIO_JOURNAL_MAX_RECOVERIES: 최종 결과 없이 연속으로 복구를 시도할 최대 횟수 (넘으면 세션 오류로 중지)
+AUDIO_JOURNAL_MAX_RECOVERIES = 3
+
+# 음성 활동 감지(VAD) 설정: 무음 구간은 Speech API로 보내지 않음
+VAD_ENABLED = True
+# VAD_FRAME_MS: 특징(에너지/영교차율)을 계산하는 분석 프레임 길이(ms)
+VAD_FRAME_MS = 10
+# VAD_ENERGY_THRESHOLD_DB: 음성으로 판단할 최소 프레임 에너지 (dBFS)
+VAD_ENERGY_THRESHOLD_DB = -45.0
+# VAD_NOISE_MARGIN_DB: 추정 배경 소음보다 이만큼 커야 음성으로 판단
+VAD_NOISE_MARGIN_DB = 10.0
+# VAD_NOISE_FLOOR_RISE_DB_PER_SEC: 배경 소음 추정치가 올라가는 최대 속도(dB/초). 내려갈 때는 바로 따라감
+# (말하는 중에도 음절 사이의 조용한 프레임이 추정치를 끌어내리므로 음성은 소음으로 학습되지 않음)
+VAD_NOISE_FLOOR_RISE_DB_PER_SEC = 2.0
+# VAD_ZCR_THRESHOLD: 에너지가 약간 낮아도 영교차율이 이 이상이면(무성 자음 등) 음성으로 판단
+VAD_ZCR_THRESHOLD = 0.25
+# VAD_HANGOVER_SEC: 음성이 끝난 뒤에도 계속 전송하는 시간(초). 말끝 잘림 방지
+VAD_HANGOVER_SEC = 0.6
+# VAD_PREROLL_SEC: 음성 시작 시 함께 보내는 직전 오디오 길이(초). 말머리 잘림 방지
+VAD_PREROLL_SEC = 0.3
+# VAD_KEEPALIVE_SEC: 무음이 이어질 때 스트림 유지를 위해 무음 프레임을 보내는 간격(초). None이면 보내지 않음
+VAD_KEEPALIVE_SEC = 3.0
+
+# API 클라이언트 풀 설정
+# CLIENT_WARMUP_TIMEOUT_SEC: 앱 시작 시 백그라운드 예열(채널 연결/TLS 핸드셰이크) 최대 대기 시간(초)
+CLIENT_WARMUP_TIMEOUT_SEC = 10.0
+# CLIENT_HEALTH_CHECK_TIMEOUT_SEC: 녹음 시작 전 상태 점검 시 연결 확인 최대 대기 시간(초). 실패 시 재연결
+CLIENT_HEALTH_CHECK_TIMEOUT_SEC = 2.0
+
+# 자막 파일 기록 설정 (백그라운드 writer)
+# TRANSCRIPT_FLUSH_INTERVAL_SEC: 버퍼에 모인 줄을 파일에 flush 하는 주기(초)
+TRANSCRIPT_FLUSH_INTERVAL_SEC = 1.0
+# TRANSCRIPT_FSYNC_INTERVAL_SEC: 디스크에 fsync 하는 주기(초). None이면 fsync 하지 않음
+TRANSCRIPT_FSYNC_INTERVAL_SEC = 10.0
+# TRANSCRIPT_JSONL_FILE: 타임스탬프가 포함된 구조화 기록(JSONL) 파일. None이면 기록하지 않음
+TRANSCRIPT_JSONL_FILE = f"results/transcript_{TIMESTAMP}.jsonl"
+
+# 음성 인식 백엔드 설정
+# RECOGNIZER_BACKEND: "google"(Google Cloud Speech-to-Text) 또는 "replay"(WAV 파일 + 스크립트 타임라인 재생, 네트워크/인증 불필요)
+RECOGNIZER_BACKEND = "google"
+# REPLAY_WAV_FILE: replay 백엔드에서 오디오 입력 대신 실시간 속도로 재생할 WAV 파일 (16kHz, mono, 16bit)
+REPLAY_WAV_FILE = "replay/sample.wav"
+# REPLAY_SCRIPT_FILE: replay 백엔드가 내보낼 인식 결과 타임라인 (JSON, README 참고)
+REPLAY_SCRIPT_FILE = "replay/sample_script.json"
+# REPLAY_LATENCY_SEC: 스크립트 시각에 더해지는 모의 인식 지연(초)
+REPLAY_LATENCY_SEC = 0.3
+
+# 화면 갱신 설정
+# UI_FRAME_RATE_HZ: 자막 화면 최대 갱신 횟수(초당, 15~30 권장). 한 프레임 안에 들어온 결과는 입력별 최신 중간 결과와 모든 최종 결과만 한 번에 반영
+UI_FRAME_RATE_HZ = 20
+# SUBTITLE_RESIZE_REFRESH_HZ: 자막 창 크기 조절 중 글꼴/줄바꿈을 다시 계산하는 최대 횟수(초당, 화면 주사율 수준)
+SUBTITLE_RESIZE_REFRESH_HZ = 60
+# TRANSCRIPT_MAX_LINES: 원본/번역 텍스트 영역에 남겨 둘 최대 줄 수 (전체 기록은 결과 파일에 저장)
+TRANSCRIPT_MAX_LINES = 500
+# TRANSCRIPT_TRIM_BATCH_LINES: 최대 줄 수를 넘었을 때 여유분으로 한 번에 더 지우는 줄 수
+TRANSCRIPT_TRIM_BATCH_LINES = 50
+
+# 지연 시간 측정 설정
+# LATENCY_STATUS_INTERVAL_MS: 상태 표시줄의 지연 요약 갱신 주기(ms)
+LATENCY_STATUS_INTERVAL_MS = 1000
+# LATENCY_REPORT_FILE: 종료 시 지연 보고서를 저장할 파일. None이면 출력만 함
+LATENCY_REPORT_FILE = f"results/latency_report_{TIMESTAMP}.json"
+
+# 헤드리스 서버 설정 (headless_server.py)
+# HEADLESS_SSE_HOST / HEADLESS_SSE_PORT: 자막 이벤트 SSE 엔드포인트 주소. 포트가 None이면 SSE 서버를 열지 않음
+HEADLESS_SSE_HOST = "127.0.0.1"
+HEADLESS_SSE_PORT = 8765
+# HEADLESS_SSE_CLIENT_QUEUE: SSE 구독자별 대기 이벤트 상한. 느린 구독자는 가장 오래된 이벤트부터 버림
+HEADLESS_SSE_CLIENT_QUEUE = 256
+# HEADLESS_SSE_HEARTBEAT_SEC: 이벤트가 없을 때 연결 유지용 주석 줄을 보내는 간격(초)
+HEADLESS_SSE_HEARTBEAT_SEC = 15
+# HEADLESS_STATUS_INTERVAL_SEC: 세션 상태/수용량 보고 주기(초)
+HEADLESS_STATUS_INTERVAL_SEC = 5
+# 세션 유지 가능 판단 기준: 오디오 버퍼 점유율, 최종 결과 도착 지연 p95(초), 프로세스 CPU 사용률(코어 1개 기준 %)
+HEADLESS_MAX_BUFFER_FILL = 0.5
+HEADLESS_MAX_FINAL_P95_SEC = 2.0
+HEADLESS_CPU_BUDGET_PERCENT = 80
+# HEADLESS_PROBE_STEP_SEC: 수용량 측정(--probe)에서 세션을 하나 추가한 뒤 관찰하는 시간(초)
+HEADLESS_PROBE_STEP_SEC = 20
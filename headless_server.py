@@ -0,0 +1,275 @@
+# headless_server.py
+"""
+Tk 없이 여러 인식/번역 세션을 한 프로세스에서 실행하는 헤드리스 모드.
+자막은 표준 출력(JSONL)과 로컬 SSE 엔드포인트로 이벤트 스트림을 내보내고, 진행 로그는 표준 오류로 출력합니다.
+
+사용 예:
+    python headless_server.py --session en-US:ko --session ja-JP:ko@2
+    python headless_server.py --session en-US:ko,ja,zh   # 인식 스트림 하나를 여러 언어로 번역
+    python headless_server.py --session en-US:ko@replay/sample.wav --no-sse
+    python headless_server.py --probe replay/sample.wav --session en-US:ko   # 유지 가능한 세션 수 측정
+세션 지정 형식: 입력언어:번역언어[,번역언어...][@입력]  (언어는 config의 표시 이름 또는 코드, 입력은 장치 인덱스/이름 또는 .wav 파일)
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import pyaudio
+from config import (LANGUAGES, TRANSLATE_CODES, RECOGNIZER_BACKEND, TIMESTAMP, HEADLESS_SSE_PORT, HEADLESS_STATUS_INTERVAL_SEC,
+                    HEADLESS_MAX_BUFFER_FILL, HEADLESS_MAX_FINAL_P95_SEC, HEADLESS_CPU_BUDGET_PERCENT, HEADLESS_PROBE_STEP_SEC,
+                    TRANSLATION_SHARED_WORKERS, PIPELINE_MODE)
+from audio_recorder import AudioRecorder
+from replay_recognizer import WavAudioSource
+from translation_cache import TranslationCache
+from async_pipeline import AsyncPipelineRuntime, create_session
+from transcript_writer import TranscriptWriter, path_for_language
+from client_pool import ClientPool
+from subtitle_events import SubtitleEventHub, JsonlStreamSink, SseSubtitleServer
+
+def resolve_language(value, codes):
+    """표시 이름('한국어') 또는 코드('ko-KR', 'ko')를 config의 표시 이름으로 변환"""
+    if value in codes: return value
+    for name, code in list(codes.items()) + list(LANGUAGES.items()):
+        if code.lower() == value.lower(): return name
+    raise ValueError(f"알 수 없는 언어: {value}")
+
+def parse_session_spec(spec):
+    """'입력언어:번역언어[,번역언어...][@입력]' -> (입력 언어, 번역 언어 목록, 입력). 입력: None(기본 장치), 장치 인덱스(int), 장치 이름, .wav 경로"""
+    languages, _, audio_input = spec.partition('@')
+    source, sep, targets = languages.partition(':')
+    if not sep or not targets: raise ValueError(f"세션 형식 오류 (입력언어:번역언어[,번역언어...][@입력]): {spec}")
+    if audio_input.isdigit(): audio_input = int(audio_input)
+    return (resolve_language(source, LANGUAGES), [resolve_language(t.strip(), TRANSLATE_CODES) for t in targets.split(',')],
+            audio_input or None)
+
+
+class HeadlessServer:
+    """
+    여러 TranslationSession을 관리하는 헤드리스 호스트.
+    Speech/Translate 클라이언트 풀, 번역 캐시, 번역 요청 스레드 풀, PyAudio 인스턴스, 이벤트 허브를 모든 세션이 공유하고,
+    주기적으로 세션 상태를 점검해 현재 부하에서 유지 가능한 세션 수를 보고합니다.
+    """
+    def __init__(self, hub, client_pool=None, translation_cache=None):
+        self.hub = hub
+        if client_pool: self.client_pool = client_pool
+        else: self.client_pool = ClientPool(speech_factory=None, speech_async_factory=None) if RECOGNIZER_BACKEND == "replay" else ClientPool()
+        self.translation_cache = translation_cache or TranslationCache()
+        self.translation_cache.load()
+        self.audio = pyaudio.PyAudio()
+        self.translate_executor = ThreadPoolExecutor(max_workers=TRANSLATION_SHARED_WORKERS, thread_name_prefix="TranslateShared")
+        # asyncio 모드: 모든 세션이 이벤트 루프 스레드 하나를 공유 (세션 수만큼 녹음/처리 스레드가 늘지 않음)
+        self.pipeline_runtime = AsyncPipelineRuntime(self.client_pool, self.translate_executor) if PIPELINE_MODE == "asyncio" else None
+        # asyncio 모드는 루프의 SpeechAsyncClient만 쓰므로 그 클라이언트를 예열 (동기 Speech 클라이언트는 만들지 않음)
+        self.client_pool.warm_up_async(speech=self.pipeline_runtime is None)
+        if self.pipeline_runtime: self.pipeline_runtime.warm_up_async()
+        self._lock = threading.Lock()
+        self.sessions = {} # 이름 -> (TranslationSession, {번역 언어: TranscriptWriter})
+        self._next_id = 1
+        self._last_check = None # (monotonic, process_time, {세션 이름: 오버런 수})
+        self.last_capacity = None
+
+    def _find_device(self, audio_input):
+        if audio_input is None or isinstance(audio_input, int): return audio_input
+        for name, index in AudioRecorder(audio=self.audio).get_input_devices().items():
+            if audio_input.lower() in name.lower(): return index
+        raise ValueError(f"오디오 입력 장치를 찾을 수 없습니다: {audio_input}")
+
+    def add_session(self, source_lang, target_langs, audio_input=None, loop_wav=False):
+        """새 세션 생성 및 시작 (target_langs: 번역 언어 하나 또는 목록). 시작에 실패하면 예외 발생"""
+        with self._lock:
+            name = f"s{self._next_id}"
+            self._next_id += 1
+        wav_input = isinstance(audio_input, str) and audio_input.lower().endswith(".wav")
+        audio_source = WavAudioSource(audio_input, loop=loop_wav) if wav_input else None
+        device_index = None if wav_input else self._find_device(audio_input)
+        if isinstance(target_langs, str): target_langs = [target_langs]
+        writers = {target: TranscriptWriter(original_path=None, translated_path=None,
+                                            jsonl_path=path_for_language(f"results/headless_{name}_{TIMESTAMP}.jsonl", TRANSLATE_CODES.get(target, target)))
+                   for target in target_langs}
+        session = create_session(
+            source_lang, target_langs, self.client_pool,
+            on_result=lambda original, translated, is_final, target: self._on_result(name, writers[target], original, translated, is_final, target),
+            on_error=lambda kind, message: self.hub.publish({"type": "session_error", "session": name, "kind": kind, "message": message}),
+            translation_cache=self.translation_cache, audio_recorder=AudioRecorder(audio=self.audio),
+            audio_source=audio_source, device_index=device_index, name=name, translate_executor=self.translate_executor,
+            runtime=self.pipeline_runtime
+        )
+        if self.pipeline_runtime: self.pipeline_runtime.check_health_async()
+        else: self.client_pool.check_health_async()
+        session.start()
+        for writer in writers.values(): writer.start()
+        with self._lock: self.sessions[name] = (session, writers)
+        self.hub.publish({"type": "session_start", "session": name, "source": source_lang, "targets": session.target_langs,
+                          "input": audio_input if audio_input is not None else "기본 장치"})
+        return session
+
+    def _on_result(self, name, writer, original, translated, is_final, target_lang):
+        self.hub.publish({"type": "subtitle", "session": name, "target": target_lang, "target_code": TRANSLATE_CODES.get(target_lang),
+                          "original": original, "translated": translated, "is_final": is_final})
+        if is_final: writer.write(original, translated)
+
+    def remove_session(self, name, reason="stopped"):
+        with self._lock: entry = self.sessions.pop(name, None)
+        if not entry: return
+        session, writers = entry
+        session.stop()
+        session.join()
+        for writer in writers.values(): writer.close()
+        self.hub.publish({"type": "session_end", "session": name, "reason": reason, "stats": session.stats()})
+
+    def reap_finished(self):
+        """입력이 끝났거나 오류로 멈춘 세션 정리 (WAV 끝, 스트림 오류 등)"""
+        with self._lock: finished = [name for name, (session, _) in self.sessions.items() if not session.is_busy()]
+        for name in finished: self.remove_session(name, reason="finished")
+        return finished
+
+    def assess_capacity(self):
+        """
+        마지막 점검 이후 구간의 CPU 사용률과 세션별 상태로 유지 가능 여부 판단.
+        세션은 오디오 버퍼 오버런이 없고, 버퍼 점유율과 최종 결과 지연 p95가 기준 이하일 때 '유지 중'으로 봅니다.
+        estimated_capacity는 세션당 CPU 사용률로 CPU 예산 안에 들어갈 세션 수를 외삽한 값입니다.
+        """
+        now, cpu_now = time.monotonic(), time.process_time()
+        with self._lock: sessions = [session for session, _ in self.sessions.values()]
+        last_wall, last_cpu, last_overruns = self._last_check or (now, cpu_now, {})
+        wall = now - last_wall
+        cpu_percent = (cpu_now - last_cpu) / wall * 100 if wall > 0 else None
+        session_reports = []
+        for session in sessions:
+            stats = session.stats()
+            new_overruns = stats["buffer_overruns"] - last_overruns.get(session.name, 0)
+            final_p95 = stats["latency"]["final_arrival"]["p95"]
+            stats["healthy"] = bool(new_overruns <= 0 and stats["buffer_fill"] <= HEADLESS_MAX_BUFFER_FILL
+                                    and (final_p95 is None or final_p95 <= HEADLESS_MAX_FINAL_P95_SEC))
+            session_reports.append(stats)
+        self._last_check = (now, cpu_now, {s["name"]: s["buffer_overruns"] for s in session_reports})
+        sustained = sum(1 for s in session_reports if s["healthy"])
+        cpu_per_session = cpu_percent / len(sessions) if cpu_percent and sessions else None
+        self.last_capacity = {
+            "sessions": len(sessions),
+            "sustained_sessions": sustained,
+            "cpu_percent": cpu_percent,
+            "cpu_budget_percent": HEADLESS_CPU_BUDGET_PERCENT,
+            "estimated_capacity": int(HEADLESS_CPU_BUDGET_PERCENT / cpu_per_session) if cpu_per_session else None,
+            "saturated": sustained < len(sessions) or (cpu_percent or 0) > HEADLESS_CPU_BUDGET_PERCENT,
+        }
+        return self.last_capacity, session_reports
+
+    def status(self):
+        """SSE /status 응답: 마지막 수용량 판단 결과와 세션별 현재 상태"""
+        with self._lock: sessions = [session.stats() for session, _ in self.sessions.values()]
+        return {"capacity": self.last_capacity, "sessions": sessions, "cache": self.translation_cache.stats_summary()}
+
+    def run(self, stop_event, interval=HEADLESS_STATUS_INTERVAL_SEC, exit_when_idle=True):
+        """stop_event가 설정되거나 (exit_when_idle이면) 모든 세션이 끝날 때까지 주기적으로 상태 보고"""
+        self.assess_capacity()
+        while not stop_event.wait(interval):
+            self.reap_finished()
+            capacity, session_reports = self.assess_capacity()
+            self.hub.publish({"type": "status", "capacity": capacity,
+                              "sessions": [{k: s[k] for k in ("name", "healthy", "buffer_fill", "translation_pending", "results")} for s in session_reports]})
+            cpu = f"{capacity['cpu_percent']:.0f}%" if capacity['cpu_percent'] is not None else "-"
+            print(f"[상태] 세션 {capacity['sessions']}개 중 {capacity['sustained_sessions']}개 유지 중, CPU {cpu}, "
+                  f"추정 수용량 {capacity['estimated_capacity'] if capacity['estimated_capacity'] is not None else '-'}개")
+            if exit_when_idle and not self.sessions: break
+
+    def probe(self, source_lang, target_langs, wav_path, max_sessions, step_sec=HEADLESS_PROBE_STEP_SEC):
+        """
+        WAV 입력(반복 재생) 세션을 step_sec마다 하나씩 늘리며 관찰해, 모든 세션이 유지되는 최대 세션 수를 측정.
+        한 단계라도 기준을 넘으면(오버런, 지연, CPU 예산 초과) 중단하고 직전 단계의 세션 수를 보고합니다.
+        """
+        sustained = 0
+        steps = []
+        for count in range(1, max_sessions + 1):
+            self.add_session(source_lang, target_langs, wav_path, loop_wav=True)
+            self.assess_capacity() # 구간 기준점 재설정
+            time.sleep(step_sec)
+            capacity, _ = self.assess_capacity()
+            steps.append(capacity)
+            print(f"[수용량 측정] 세션 {count}개: 유지 {capacity['sustained_sessions']}개, CPU {capacity['cpu_percent'] or 0:.0f}%")
+            if capacity["saturated"]: break
+            sustained = count
+        result = {"type": "capacity", "max_sustained_sessions": sustained, "steps": steps}
+        self.hub.publish(result)
+        return result
+
+    def close(self):
+        for name in list(self.sessions): self.remove_session(name, reason="shutdown")
+        if self.pipeline_runtime: self.pipeline_runtime.close()
+        self.translate_executor.shutdown(wait=False, cancel_futures=True)
+        self.translation_cache.save()
+        self.client_pool.close()
+        try: self.audio.terminate()
+        except Exception as e: print(f"PyAudio 종료 중 오류 발생: {e}")
+
+
+def open_event_stream():
+    """
+    JSONL 이벤트 전용 출력 핸들 (원래 표준 출력). 표준 출력 fd를 복제해 이벤트는 이 핸들로만 쓰고,
+    fd 1은 표준 오류를 가리키게 하여 print 로그나 네이티브 라이브러리(gRPC 등)의 출력이 이벤트 사이에 섞이지 않게 합니다.
+    """
+    sys.stdout.flush()
+    event_fd = os.dup(sys.stdout.fileno())
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return os.fdopen(event_fd, 'w', encoding='utf-8', buffering=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="헤드리스 실시간 번역 자막 서버")
+    parser.add_argument("--session", action="append", default=[], help="입력언어:번역언어[@장치 인덱스/이름 또는 .wav] (여러 번 지정 가능)")
+    parser.add_argument("--sse-port", type=int, default=HEADLESS_SSE_PORT, help="SSE 포트 (0이면 임의 포트)")
+    parser.add_argument("--no-sse", action="store_true", help="SSE 엔드포인트를 열지 않음")
+    parser.add_argument("--no-stdout", action="store_true", help="표준 출력으로 JSONL 이벤트를 내보내지 않음")
+    parser.add_argument("--status-interval", type=float, default=HEADLESS_STATUS_INTERVAL_SEC)
+    parser.add_argument("--duration", type=float, help="지정한 시간(초) 후 종료")
+    parser.add_argument("--probe", metavar="WAV", help="WAV 반복 재생 세션을 늘려 가며 유지 가능한 세션 수 측정 (첫 --session의 언어 사용)")
+    parser.add_argument("--probe-max", type=int, default=32)
+    parser.add_argument("--probe-step", type=float, default=HEADLESS_PROBE_STEP_SEC)
+    args = parser.parse_args()
+
+    try: specs = [parse_session_spec(spec) for spec in args.session or ["en-US:ko"]]
+    except ValueError as e: print(e, file=sys.stderr); return 2
+    # 표준 출력은 이벤트(JSONL) 전용: 로그는 표준 오류로 나감
+    event_stream = None if args.no_stdout else open_event_stream()
+
+    if not os.path.exists("results"): os.makedirs("results", exist_ok=True)
+    hub = SubtitleEventHub()
+    if event_stream: hub.add_sink(JsonlStreamSink(event_stream))
+    server = sse = None
+    stop_event = threading.Event()
+    try:
+        server = HeadlessServer(hub)
+        if not args.no_sse and args.sse_port is not None:
+            sse = SseSubtitleServer(port=args.sse_port, status_provider=server.status).start()
+            hub.add_sink(sse)
+        if args.duration:
+            timer = threading.Timer(args.duration, stop_event.set)
+            timer.daemon = True
+            timer.start()
+        if args.probe:
+            source, targets, _ = specs[0]
+            server.probe(source, targets, args.probe, args.probe_max, args.probe_step)
+            return 0
+        for source, targets, audio_input in specs:
+            try: server.add_session(source, targets, audio_input)
+            except Exception as e: print(f"세션 시작 실패 ({source} -> {', '.join(targets)}, 입력 {audio_input}): {e}"); traceback.print_exc()
+        if not server.sessions: print("실행 중인 세션이 없습니다."); return 1
+        server.run(stop_event, args.status_interval)
+        return 0
+    except KeyboardInterrupt:
+        print("중단 요청 (Ctrl+C)")
+        return 0
+    finally:
+        stop_event.set()
+        if server: server.close()
+        if sse: sse.close()
+        final = server.last_capacity if server else None
+        if final: print(f"최종 수용량 보고: {json.dumps(final, ensure_ascii=False)}")
+        if event_stream: event_stream.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
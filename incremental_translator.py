@@ -0,0 +1,80 @@
+# incremental_translator.py
+import re
+from config import STABILITY_THRESHOLD, INCREMENTAL_TRANSLATION, TRANSLATE_CODES
+
+# 문장 끝 (자동 구두점 기준). 뒤따르는 공백까지 포함해 문장 단위로 자름
+SENTENCE_END_RE = re.compile(r'[.!?。！？]+\s*')
+# 문장 사이에 공백을 넣지 않는 번역 언어
+NO_SPACE_LANGUAGES = {"ja", "zh", "zh-TW", "th"}
+
+def extract_interim(response, threshold=STABILITY_THRESHOLD):
+    """
+    중간 결과 응답에서 (전체 transcript, 안정된 접두부 길이) 반환.
+    Google은 중간 결과를 안정도가 높은 앞부분과 낮은 꼬리 여러 result로 나눠 보내므로 모두 이어 붙입니다.
+    """
+    transcript = ""
+    stable_length = 0
+    still_stable = True
+    for result in response.results:
+        if not result.alternatives: continue
+        transcript += result.alternatives[0].transcript
+        if still_stable and result.stability >= threshold: stable_length = len(transcript)
+        else: still_stable = False
+    stripped = transcript.lstrip()
+    stable_length = max(0, stable_length - (len(transcript) - len(stripped)))
+    stripped = stripped.rstrip()
+    return stripped, min(stable_length, len(stripped))
+
+def split_stable_sentences(text, stable_length):
+    """안정된 접두부 안에서 끝난 완결 문장 목록과 나머지 꼬리 반환"""
+    sentences = []
+    start = 0
+    for match in SENTENCE_END_RE.finditer(text, 0, stable_length):
+        sentences.append(text[start:match.end()].strip())
+        start = match.end()
+    return [s for s in sentences if s], text[start:].strip()
+
+class StablePrefixTracker:
+    """
+    발화별 안정 접두부를 추적하여 중간 결과를 번역 단위(segment) 목록으로 나눕니다.
+    이미 번역한 안정 문장은 번역 캐시에서 재사용되므로 실제로는 꼬리만 API로 전송됩니다.
+    번역 캐시가 없으면(cached=False) 나눠도 매번 모든 segment를 다시 번역하므로 나누지 않고 절감도 세지 않습니다.
+    """
+    def __init__(self, target_language, enabled=INCREMENTAL_TRANSLATION, cached=True):
+        self.cached = cached
+        self.enabled = enabled and cached
+        self.separator = "" if TRANSLATE_CODES.get(target_language) in NO_SPACE_LANGUAGES else " "
+        self._sent_segments = set() # 현재 발화에서 이미 번역 요청한 segment
+        # 통계: 실제로 번역 요청한 중간 결과의 전체 텍스트를 매번 보냈을 때 대비 새로 보낸 글자 수
+        self.full_chars = 0
+        self.sent_chars = 0
+
+    def segment(self, transcript, stable_length, is_final):
+        """번역할 segment 목록 반환. 최종 결과는 문장 전체를 한 번에 번역 (품질 우선)"""
+        if is_final or not self.enabled or stable_length <= 0: return [transcript]
+        sentences, tail = split_stable_sentences(transcript, stable_length)
+        return sentences + ([tail] if tail else [])
+
+    def note_dispatched(self, transcript, segments, is_final):
+        """
+        번역 요청으로 실제 제출된 결과 기록 (병합/debounce/대기 상한으로 버려진 중간 결과는 호출하지 않음).
+        발화 안에서 이미 요청한 segment는 번역 캐시에서 재사용되므로 새로 보낸 글자 수에 넣지 않습니다.
+        """
+        if is_final:
+            self._sent_segments.clear()
+            return
+        self.full_chars += len(transcript)
+        if not self.cached:
+            self.sent_chars += len(transcript)
+            return
+        for segment in segments or [transcript]:
+            if segment in self._sent_segments: continue
+            self._sent_segments.add(segment)
+            self.sent_chars += len(segment)
+
+    def join(self, translations):
+        return self.separator.join(t for t in translations if t)
+
+    def stats_summary(self):
+        saved = (1 - self.sent_chars / self.full_chars) * 100 if self.full_chars else 0.0
+        return f"중간 결과 전체 {self.full_chars}자 중 {self.sent_chars}자 번역 요청 (절감 {saved:.1f}%)"
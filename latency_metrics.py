@@ -0,0 +1,128 @@
+# latency_metrics.py
+import json
+import math
+import os
+import threading
+import time
+from config import LATENCY_REPORT_FILE
+
+# 구간 이름 -> 보고서/상태 표시용 이름
+STAGES = {
+    "first_interim": "캡처→첫 중간결과",
+    "final_arrival": "발화 끝→최종결과",
+    "translate": "번역 요청→완료",
+    "translate_api": "번역 API 왕복",
+    "queue_wait": "UI 큐 대기",
+    "render": "렌더 대기",
+}
+
+class LatencyHistogram:
+    """로그 간격(약 10%) 버킷 히스토그램. 메모리 고정, 백분위는 버킷 상한으로 근사"""
+    MIN_SEC = 0.001
+    GROWTH = 1.1
+    NUM_BUCKETS = 130 # 1ms ~ 약 4분
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (self.NUM_BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        seconds = max(0.0, seconds)
+        if seconds <= self.MIN_SEC: index = 0
+        else: index = min(self.NUM_BUCKETS, int(math.ceil(math.log(seconds / self.MIN_SEC, self.GROWTH))))
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max: self.max = seconds
+
+    def percentile(self, p):
+        """p(0~100) 백분위 값(초). 기록이 없으면 None"""
+        with self._lock:
+            if self.count == 0: return None
+            rank = max(1, math.ceil(self.count * p / 100))
+            seen = 0
+            for index, n in enumerate(self._counts):
+                seen += n
+                if seen >= rank: return min(self.max, self.MIN_SEC * self.GROWTH ** index)
+        return self.max
+
+    def snapshot(self):
+        mean = self.total / self.count if self.count else None
+        return {"count": self.count, "mean": mean, "p50": self.percentile(50), "p95": self.percentile(95),
+                "p99": self.percentile(99), "max": self.max if self.count else None}
+
+
+class LatencyTracker:
+    """
+    파이프라인 구간별 지연 시간 수집기 (time.monotonic 기준).
+    오디오 청크의 캡처 시각과 인식 결과 도착 시각을 연결해 발화 단위 지연도 계산합니다.
+    """
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name in STAGES}
+        self._utterance_start = None # 현재 발화의 첫 음성 청크 캡처 시각
+        self._first_interim_seen = False
+        self._last_voiced_capture = None
+
+    def record(self, stage, seconds):
+        self.histograms[stage].record(seconds)
+
+    def record_since(self, stage, start_ts):
+        if start_ts is not None: self.record(stage, time.monotonic() - start_ts)
+
+    def note_audio_sent(self, capture_ts, is_speech=True):
+        """Speech 스트림으로 보낸 청크의 캡처 시각 기록 (오디오 제너레이터에서 호출)"""
+        if capture_ts is None or not is_speech: return
+        self._last_voiced_capture = capture_ts
+        if self._utterance_start is None: self._utterance_start = capture_ts
+
+    def note_result(self, is_final):
+        """인식 결과 도착 기록 (응답 처리 루프에서 호출)"""
+        if not is_final:
+            if not self._first_interim_seen and self._utterance_start is not None:
+                self.record_since("first_interim", self._utterance_start)
+                self._first_interim_seen = True
+            return
+        self.record_since("final_arrival", self._last_voiced_capture)
+        self._utterance_start = None
+        self._first_interim_seen = False
+
+    def reset_utterance(self):
+        self._utterance_start = None
+        self._first_interim_seen = False
+        self._last_voiced_capture = None
+
+    @staticmethod
+    def _ms(value):
+        return "-" if value is None else f"{value * 1000:.0f}"
+
+    def status_summary(self):
+        """상태 표시줄용 한 줄 요약 (p50/p95, ms)"""
+        parts = []
+        for stage, label in (("first_interim", "첫자막"), ("final_arrival", "최종"), ("translate", "번역")):
+            h = self.histograms[stage]
+            if h.count: parts.append(f"{label} {self._ms(h.percentile(50))}/{self._ms(h.percentile(95))}ms")
+        return " · ".join(parts)
+
+    def report(self):
+        return {stage: self.histograms[stage].snapshot() for stage in STAGES}
+
+    def dump(self, path=LATENCY_REPORT_FILE):
+        """지연 보고서 출력 및 (설정 시) JSON 파일 저장"""
+        report = self.report()
+        print("=== 지연 시간 보고서 (ms: p50 / p95 / p99 / max, 건수) ===")
+        for stage, label in STAGES.items():
+            s = report[stage]
+            print(f"  {label:<16} {self._ms(s['p50'])} / {self._ms(s['p95'])} / {self._ms(s['p99'])} / {self._ms(s['max'])} ({s['count']}건)")
+        if not path: return
+        try:
+            directory = os.path.dirname(path)
+            if directory: os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"지연 보고서 저장: {path}")
+        except Exception as e:
+            print(f"지연 보고서 저장 실패 ({path}): {e}")
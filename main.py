@@ -6,15 +6,25 @@ import tkinter.messagebox
 import traceback
 import time
 import os
-from google.api_core.exceptions import OutOfRange
-from config import ORIGINAL_FILE, TRANSLATED_FILE
+from concurrent.futures import ThreadPoolExecutor
+from config import (RECOGNIZER_BACKEND, LATENCY_STATUS_INTERVAL_MS, TRANSLATE_CODES,
+                    TRANSLATED_FILE, TRANSCRIPT_JSONL_FILE, TRANSLATION_SHARED_WORKERS, PIPELINE_MODE)
 from audio_recorder import AudioRecorder
-from speech_recognizer import SpeechRecognizer
-from translator_service import TranslatorService
+from replay_recognizer import WavAudioSource
+from translation_cache import TranslationCache
+from async_pipeline import AsyncPipelineRuntime, create_session
+from client_pool import ClientPool
+from transcript_writer import TranscriptWriter, path_for_language
+from latency_metrics import LatencyTracker
 from ui import RealtimeTranslatorUI
+from ui_dispatcher import UiUpdateDispatcher
 
 class RealtimeTranslatorApp:
-    def __init__(self, root):
+    def __init__(self, root, client_pool=None, audio_source=None):
+        """
+        client_pool: 사용할 ClientPool (없으면 기본 클라이언트로 생성, 벤치마크에서 가짜 서버용 풀 주입)
+        audio_source: 오디오 장치 대신 사용할 입력 (WavAudioSource 등). replay 백엔드는 기본으로 REPLAY_WAV_FILE 사용
+        """
         self.root = root
         self.stop_event = threading.Event()
         # <<< 초기 상태를 '중지' (set) 상태로 명확히 설정 >>>
@@ -25,8 +35,27 @@ class RealtimeTranslatorApp:
             try: os.makedirs("results"); print("'results' 폴더 생성됨.")
             except OSError as e: print(f"'results' 폴더 생성 실패: {e}")
         self.audio_recorder = AudioRecorder()
-        self.recognizer = None
-        self.translator = None
+        # 구간별 지연 시간 히스토그램 (앱 전체 누적, 종료 시 보고서 저장)
+        self.latency = LatencyTracker()
+        # 인식 -> 번역 파이프라인 (입력 장치마다 하나, 시작할 때마다 선택한 언어/장치로 새로 생성, Tk와 무관)
+        self.sessions = []
+        self.show_input_labels = False # 입력이 여러 개일 때만 자막 앞에 입력 이름 표시
+        self.primary_target = None # 원본 파일 기록 기준 번역 언어
+        # 모든 입력/번역 언어가 함께 쓰는 번역 요청 스레드 풀 (입력 수에 비례해 스레드가 늘지 않도록)
+        self.translate_executor = ThreadPoolExecutor(max_workers=TRANSLATION_SHARED_WORKERS, thread_name_prefix="TranslateShared")
+        # API 클라이언트는 앱 시작 시 백그라운드에서 생성/예열하여 시작·중지 반복 시 재사용
+        # replay 백엔드는 Speech 클라이언트가 필요 없음
+        if client_pool: self.client_pool = client_pool
+        else: self.client_pool = ClientPool(speech_factory=None, speech_async_factory=None) if RECOGNIZER_BACKEND == "replay" else ClientPool()
+        # asyncio 모드: 모든 입력의 파이프라인이 이벤트 루프 스레드 하나를 공유 (세션별 녹음/처리 스레드, UI 갱신 스레드 없음)
+        self.pipeline_runtime = AsyncPipelineRuntime(self.client_pool, self.translate_executor) if PIPELINE_MODE == "asyncio" else None
+        # asyncio 모드는 루프의 SpeechAsyncClient만 쓰므로 그 클라이언트를 예열 (동기 Speech 클라이언트는 만들지 않음)
+        self.client_pool.warm_up_async(speech=self.pipeline_runtime is None)
+        if self.pipeline_runtime: self.pipeline_runtime.warm_up_async()
+        self.audio_source = audio_source or (WavAudioSource() if RECOGNIZER_BACKEND == "replay" else None)
+        # 번역 캐시는 세션(시작/중지)과 관계없이 앱 전체에서 공유
+        self.translation_cache = TranslationCache()
+        self.translation_cache.load()
 
         # ... (UI 초기화 try-except 블록은 동일) ...
         try:
@@ -54,8 +83,11 @@ class RealtimeTranslatorApp:
 
         # ... (큐, 스레드 변수 초기화, protocol 설정은 동일) ...
         self.text_queue = queue.Queue()
-        self.record_thread = None
-        self.process_thread = None
+        # 자막 화면 갱신은 프레임 단위로 모아서 반영 (중간 결과가 몰려도 초당 UI_FRAME_RATE_HZ회 이하)
+        self.ui_dispatcher = UiUpdateDispatcher(root, self.ui.apply_updates, latency=self.latency)
+        # 최종 결과 파일 기록은 전용 writer 스레드에서 처리: 원본은 한 파일, 번역은 언어별 파일
+        self.transcript_writer = TranscriptWriter(translated_path=None, jsonl_path=None)
+        self.translation_writers = {} # 번역 언어 -> TranscriptWriter
         self.update_thread = None
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
@@ -67,7 +99,9 @@ class RealtimeTranslatorApp:
             print("녹음/처리 중지 시도...")
             self.stop_recording()
 
-        threads = [self.record_thread, self.process_thread, self.update_thread]
+        for session in self.sessions: session.join()
+        if getattr(self, 'pipeline_runtime', None): self.pipeline_runtime.close()
+        threads = [self.update_thread]
         active_threads = [t for t in threads if t and t.is_alive()]
         if active_threads:
              print(f"활성 스레드 {len(active_threads)}개 종료 대기...")
@@ -80,6 +114,25 @@ class RealtimeTranslatorApp:
                  except Exception as e: print(f"  {t.name} 스레드 join 중 오류: {e}")
         else: print("활성 스레드 없음.")
 
+        if hasattr(self, 'ui_dispatcher'):
+             self.ui_dispatcher.close()
+
+        if hasattr(self, 'transcript_writer'):
+             self.transcript_writer.close()
+             for writer in self.translation_writers.values(): writer.close()
+
+        if hasattr(self, 'latency'):
+             self.latency.dump()
+
+        if hasattr(self, 'translation_cache'):
+             self.translation_cache.save()
+
+        if hasattr(self, 'translate_executor'):
+             self.translate_executor.shutdown(wait=False, cancel_futures=True)
+
+        if hasattr(self, 'client_pool'):
+             self.client_pool.close()
+
         if hasattr(self, 'audio_recorder'):
              print("AudioRecorder 스트림 닫기 확인...")
              self.audio_recorder.close_stream()
@@ -109,7 +162,8 @@ class RealtimeTranslatorApp:
                  # 녹음 중이 아닐 때만 레이블 업데이트가 필요하면 이전 조건 사용
                  # if self.stop_event.is_set(): # 중지 상태일 때만
                  self.ui.original_label.config(text=f"원본 ({self.ui.selected_source_language.get()})")
-                 self.ui.translated_label.config(text=f"번역 ({self.ui.selected_target_language.get()})")
+                 if self.stop_event.is_set(): self.ui.set_display_languages(self.ui.get_target_languages())
+                 self.ui.translated_label.config(text=f"번역 ({self.ui.display_language})")
             except tk.TclError as e:
                  # 창 닫을 때 발생 가능
                  if "application has been destroyed" not in str(e):
@@ -129,64 +183,90 @@ class RealtimeTranslatorApp:
 
         # '중지' 상태일 때 아래 로직 실행
         # --- 유효성 검사 및 초기화 ---
-        selected_device_name = self.ui.selected_device.get()
-        source_lang = self.ui.selected_source_language.get()
+        inputs = self.ui.get_inputs() # [(표시 이름, 장치 이름, 입력 언어)], 첫 항목이 기본 입력
         target_lang = self.ui.selected_target_language.get()
-        if not selected_device_name or "오류" in selected_device_name or "없음" in selected_device_name:
-            tk.messagebox.showerror("설정 오류", "유효한 오디오 입력 장치를 선택하세요.")
-            return False
-        if not source_lang or not target_lang:
+        target_langs = self.ui.get_target_languages() # 선택한 번역 언어 + 추가 번역 언어
+        replay_mode = self.audio_source is not None # 기본 입력은 장치 대신 WAV 파일 재생
+        if not target_lang or any(not source_lang for _, _, source_lang in inputs):
             tk.messagebox.showerror("설정 오류", "입력 언어와 번역 언어를 모두 선택하세요.")
             return False
-        try:
-            devices = self.audio_recorder.get_input_devices()
-            device_index = devices.get(selected_device_name)
+        devices = {}
+        if not (replay_mode and len(inputs) == 1): # replay 모드의 기본 입력은 장치 확인 건너뜀
+            try: devices = self.audio_recorder.get_input_devices()
+            except Exception as e:
+                 tk.messagebox.showerror("장치 오류", f"오디오 장치 목록 확인 중 오류: {e}")
+                 traceback.print_exc()
+                 return False
+        device_indices = []
+        for i, (label, device_name, _) in enumerate(inputs):
+            if i == 0 and replay_mode: device_indices.append(None); continue
+            if not device_name or "오류" in device_name or "없음" in device_name:
+                tk.messagebox.showerror("설정 오류", f"'{label}': 유효한 오디오 입력 장치를 선택하세요.")
+                return False
+            device_index = devices.get(device_name)
             if device_index is None:
-                 tk.messagebox.showerror("장치 오류", f"선택된 오디오 장치 '{selected_device_name}'를 찾을 수 없습니다.\n장치 목록을 새로고침합니다.")
+                 tk.messagebox.showerror("장치 오류", f"선택된 오디오 장치 '{device_name}'를 찾을 수 없습니다.\n장치 목록을 새로고침합니다.")
                  try:
                       new_device_list = list(self.audio_recorder.get_input_devices().keys())
                       if not new_device_list: new_device_list = ["사용 가능한 장치 없음"]
+                      self.ui.device_list = new_device_list
                       self.ui.device_combobox['values'] = new_device_list
-                      self.ui.selected_device.set(new_device_list[0])
-                      self.ui.device_combobox.config(state="readonly" if "없음" not in new_device_list[0] else "disabled")
+                      if i == 0:
+                          self.ui.selected_device.set(new_device_list[0])
+                          self.ui.device_combobox.config(state="readonly" if "없음" not in new_device_list[0] else "disabled")
                  except Exception as refresh_e: tk.messagebox.showerror("오류", f"장치 목록 새로고침 실패: {refresh_e}")
                  return False
-        except Exception as e:
-             tk.messagebox.showerror("장치 오류", f"오디오 장치 목록 확인 중 오류: {e}")
-             traceback.print_exc()
-             return False
+            if device_index in device_indices:
+                tk.messagebox.showerror("설정 오류", f"'{label}': 같은 장치를 두 입력에 사용할 수 없습니다.")
+                return False
+            device_indices.append(device_index)
+
+        # 이전 세션 스레드 정리 후 입력마다 새 세션 생성
+        # 입력이 늘어도 PyAudio 인스턴스, 클라이언트 풀(gRPC 채널 하나에 스트림 다중화), 번역 캐시,
+        # 번역 요청 스레드 풀, UI 갱신 스레드, 결과 파일 writer는 하나만 사용
+        for session in self.sessions: session.join(timeout=1.0)
+        self.sessions = []
+        for i, ((label, _, source_lang), device_index) in enumerate(zip(inputs, device_indices)):
+            self.sessions.append(create_session(
+                source_lang, target_langs, self.client_pool,
+                on_result=lambda *result, label=label, key=i: self._publish_translation(label, key, *result),
+                on_error=self._on_session_error,
+                translation_cache=self.translation_cache,
+                audio_recorder=self.audio_recorder if i == 0 else AudioRecorder(audio=self.audio_recorder.audio),
+                audio_source=self.audio_source if i == 0 else None, device_index=device_index,
+                # 발화 단위 지연 측정은 입력별 상태가 필요하므로 추가 입력은 전용 수집기 사용
+                latency=self.latency if i == 0 else None, name=label, translate_executor=self.translate_executor,
+                runtime=self.pipeline_runtime
+            ))
+        self.show_input_labels = len(self.sessions) > 1
+        self.primary_target = target_langs[0]
         try:
-            print(f"Recognizer ({source_lang}) 및 Translator ({source_lang} -> {target_lang}) 초기화 시도...")
-            self.recognizer = SpeechRecognizer(source_lang)
-            self.translator = TranslatorService(source_lang, target_lang)
-            print("초기화 완료.")
-        except Exception as e:
-            print(f"Recognizer/Translator 초기화 오류: {e}"); traceback.print_exc()
-            tk.messagebox.showerror("초기화 오류", f"음성 인식기 또는 번역기 초기화 실패:\n{e}")
-            return False
-        # --- 초기화 끝 ---
+            while not self.text_queue.empty(): self.text_queue.get_nowait()
+        except queue.Empty: pass # 큐 비우기 중 예외는 무시
 
         # <<< 시작 상태로 변경: stop_event 클리어 >>>
         self.stop_event.clear()
 
-        print("녹음 시작...")
+        print(f"녹음 시작... (입력 {len(self.sessions)}개)")
+        # Speech 채널 상태 점검은 백그라운드에서 (실패하면 클라이언트를 교체하고, 끊긴 스트림은 세션이 새 클라이언트로 복구)
+        if self.pipeline_runtime: self.pipeline_runtime.check_health_async()
+        else: self.client_pool.check_health_async()
+        started = []
         try:
-            # 큐 비우기
-            while not self.audio_recorder.audio_queue.empty(): self.audio_recorder.audio_queue.get_nowait()
-            while not self.text_queue.empty(): self.text_queue.get_nowait()
-            print("이전 큐 내용 비움 완료.")
-
-            self.audio_recorder.open_stream(device_index)
-            print(f"오디오 스트림 열기 성공 (장치: {selected_device_name}, 인덱스: {device_index})")
-        except queue.Empty: pass # 큐 비우기 중 예외는 무시
+            for session, device_index in zip(self.sessions, device_indices):
+                session.start()
+                started.append(session)
+                if session.audio_source: print(f"[{session.name}] Replay 모드: 오디오 장치 대신 WAV 파일 재생")
+                else: print(f"[{session.name}] 오디오 스트림 열기 성공 (인덱스: {device_index})")
         except Exception as e:
-            print(f"오디오 스트림 열기 실패: {e}"); traceback.print_exc()
-            tk.messagebox.showerror("오디오 오류", f"오디오 스트림을 열 수 없습니다:\n{e}")
+            print(f"세션 시작 실패: {e}"); traceback.print_exc()
+            for session in started: session.stop()
+            tk.messagebox.showerror("시작 오류", f"음성 인식기/번역기 초기화 또는 오디오 스트림 열기 실패:\n{e}")
             self.stop_event.set() # 실패 시 다시 '중지' 상태로
             return False
 
         # 스레드 시작 (이전 스레드 join 확인)
-        threads_to_join = [self.record_thread, self.process_thread, self.update_thread]
+        threads_to_join = [self.update_thread]
         for t in threads_to_join:
              if t and t.is_alive():
                   print(f"이전 {t.name} 스레드 join 시도...")
@@ -201,14 +281,15 @@ class RealtimeTranslatorApp:
         # 이제 새 스레드를 시작할 것이므로 stop_event 클리어 (이미 위에서 했지만 확인차)
         self.stop_event.clear()
 
-        self.record_thread = threading.Thread(target=self.record_audio, name="AudioRecordThread", daemon=True)
-        self.process_thread = threading.Thread(target=self.process_stream, name="ProcessStreamThread", daemon=True)
-        self.update_thread = threading.Thread(target=self.update_ui, name="UpdateUIThread", daemon=True)
+        # asyncio 모드는 결과를 루프에서 Tk로 바로 예약하므로 큐를 폴링하는 UI 갱신 스레드가 필요 없음
+        self.update_thread = None if self.pipeline_runtime else threading.Thread(target=self.update_ui, name="UpdateUIThread", daemon=True)
 
-        self.record_thread.start()
-        self.process_thread.start()
-        self.update_thread.start()
+        self.ui.set_display_languages(target_langs)
+        self.transcript_writer.start()
+        for target in target_langs: self._translation_writer(target).start()
+        if self.update_thread: self.update_thread.start()
         print("모든 스레드 시작됨.")
+        self.root.after(LATENCY_STATUS_INTERVAL_MS, self._update_latency_status)
         return True
 
     # <<< stop_recording 조건 수정 >>>
@@ -224,158 +305,70 @@ class RealtimeTranslatorApp:
         # <<< 중지 상태로 변경: stop_event 설정 >>>
         self.stop_event.set()
 
-        # ... (AudioRecorder.stop(), 큐에 None 추가 등 동일) ...
-        print("AudioRecorder.stop() 호출 (스트림 닫기)...")
-        self.audio_recorder.stop()
-        print("AudioRecorder.stop() 완료.")
-        print("큐에 종료 신호(None) 추가 시도...")
-        try:
-            self.audio_recorder.audio_queue.put(None, block=False)
-            self.text_queue.put((None, None, None), block=False)
-        except queue.Full: print("경고: 큐가 가득 차 종료 신호를 넣지 못했습니다.")
+        # 세션 중지: 스트림 닫기, 대기 중 번역 취소 (통계 출력 포함)
+        for session in self.sessions: session.stop()
+        if self.update_thread:
+            print("큐에 종료 신호(None) 추가 시도...")
+            try: self.text_queue.put((None, None, None, None, None), block=False)
+            except queue.Full: print("경고: 큐가 가득 차 종료 신호를 넣지 못했습니다.")
+        print(f"번역 캐시 통계: {self.translation_cache.stats_summary()}")
+        print(self.ui_dispatcher.stats_summary())
+        self.latency.dump(path=None) # 파일 저장은 종료 시
 
         print("중지 신호 전송 및 리소스 정리 시도 완료.")
 
 
-    # ... (record_audio, _audio_generator, process_stream, update_ui는 이전 수정과 동일하게 유지) ...
-    # 해당 스레드들은 루프 조건에서 stop_event.is_set()을 올바르게 사용하고 있음
-    def record_audio(self):
-        """오디오 녹음 스레드"""
-        print("record_audio 스레드 시작")
-        # stop_event를 record 메서드에 전달
-        try:
-            # AudioRecorder.record가 stop_event를 인자로 받도록 수정됨을 가정
-            self.audio_recorder.record(self.stop_event)
-        except Exception as e:
-            if not self.stop_event.is_set(): # 종료 중이 아닐 때만 오류 처리
-                print(f"record_audio 스레드 오류: {e}")
-                traceback.print_exc()
-                self.root.after(0, lambda: self.ui.status_label.config(text="녹음 오류", fg="red"))
-                self.stop_event.set() # 오류 시 종료 상태로
-                # UI 버튼 상태도 변경 필요
-                self.root.after(0, self.ui.toggle_recording) # 토글 호출하여 버튼 상태 맞추기
-        finally:
-             # stop_event 상태와 관계없이 루프 종료 시 로그 남김
-            print(f"record_audio 스레드 종료 (stop_event: {self.stop_event.is_set()})")
-
-    def _audio_generator(self):
-        """오디오 큐에서 데이터를 읽어 스트리밍 API로 보낼 제너레이터"""
-        print("_audio_generator 시작")
-        while not self.stop_event.is_set():
-            try:
-                chunk = self.audio_recorder.audio_queue.get(block=True, timeout=0.1)
-                if chunk is None:
-                    print("_audio_generator: None 수신, 종료.")
-                    break
-                yield chunk
-                self.audio_recorder.audio_queue.task_done()
-            except queue.Empty:
-                if self.stop_event.is_set():
-                     print("_audio_generator: 중지 이벤트 확인 및 큐 비어있음, 종료.")
-                     break
-                continue
-            except Exception as e:
-                 print(f"_audio_generator 오류: {e}")
-                 traceback.print_exc()
-                 break
-        print("_audio_generator 종료 - None 반환")
-        yield None # 스트림 종료 알림
-
-    def process_stream(self):
-        """오디오 스트림 처리: 인식 -> 번역 -> 큐 저장"""
-        print("process_stream 스레드 시작")
-        if not self.recognizer or not self.translator:
-             print("오류: Recognizer 또는 Translator가 초기화되지 않음.")
-             if self.ui and self.root and self.root.winfo_exists():
-                  self.root.after(0, lambda: self.ui.status_label.config(text="초기화 오류", fg="red"))
-             return
-
-        stream_active = True
-        responses = None # 초기화
+    def _on_session_error(self, kind, message):
+        """세션 작업 스레드에서 발생한 중단 오류를 Tk 메인 스레드에서 표시하고 버튼 상태 맞추기"""
+        if not (self.ui and self.root and self.root.winfo_exists()): return
+        if kind == "out_of_range":
+            self.root.after(0, lambda: tk.messagebox.showwarning("연결 종료", "실시간 인식/번역 세션이 종료되었습니다.\n(Google API 타임아웃 등)\n\n다시 시작해주세요."))
+        else:
+            status = "녹음 오류" if kind == "record" else "처리 오류"
+            self.root.after(0, lambda: self.ui.status_label.config(text=status, fg="red"))
+        self.root.after(0, self.ui.toggle_recording) # 토글 -> stop_recording으로 세션 정리 및 버튼 상태 맞추기
+
+    def _translation_writer(self, target_lang):
+        """번역 언어별 결과 파일 writer (언어 코드가 붙은 파일에 기록, 처음 사용할 때 생성)"""
+        writer = self.translation_writers.get(target_lang)
+        if writer is None:
+            code = TRANSLATE_CODES.get(target_lang, target_lang)
+            writer = TranscriptWriter(original_path=None, translated_path=path_for_language(TRANSLATED_FILE, code),
+                                      jsonl_path=path_for_language(TRANSCRIPT_JSONL_FILE, code))
+            self.translation_writers[target_lang] = writer
+        return writer
+
+    def _publish_translation(self, label, key, transcript, translated_text, is_final, target_lang):
+        """
+        세션이 언어별로 순서대로 호출하는 결과 게시 콜백 (모든 입력이 공유):
+        표시 언어만 UI 큐 저장, 최종 결과는 언어별 파일 기록. 입력이 여러 개면 입력 이름을 붙임
+        """
+        if self.stop_event.is_set(): return
+        if self.show_input_labels: transcript, translated_text = f"[{label}] {transcript}", f"[{label}] {translated_text}"
+        if target_lang == self.ui.display_language:
+            # asyncio 모드: 이벤트 루프에서 UI 디스패처로 바로 전달 (Tk 어댑터). threads 모드: UI 갱신 스레드 큐
+            if self.pipeline_runtime: self.ui_dispatcher.post(transcript, translated_text, is_final, key)
+            else: self.text_queue.put((transcript, translated_text, is_final, key, time.monotonic()))
+        if is_final:
+            # 원본은 기본 번역 언어의 결과가 나올 때 한 번만 기록
+            if target_lang == self.primary_target: self.transcript_writer.write(transcript, translated_text)
+            self._translation_writer(target_lang).write(transcript, translated_text)
+
+    def _update_latency_status(self):
+        """녹음 중 상태 표시줄에 지연 요약(p50/p95) 주기적으로 표시"""
+        if self.stop_event.is_set() or not self.root.winfo_exists(): return
         try:
-            audio_gen = self._audio_generator()
-            print("StreamingRecognize 요청 시작...")
-            responses = self.recognizer.start_streaming_recognize(audio_gen)
-
-            if responses is None:
-                 print("스트리밍 인식 시작 실패, process_stream 종료")
-                 stream_active = False
-                 if self.ui and self.root and self.root.winfo_exists():
-                      self.root.after(0, lambda: self.ui.status_label.config(text="인식 오류", fg="red"))
-                 return
-
-            print("Streaming API 응답 처리 루프 시작...")
-            for response in responses:
-                if self.stop_event.is_set():
-                    print("process_stream: 중지 이벤트 확인, 응답 처리 중단.")
-                    stream_active = False
-                    break
-
-                if not response.results: continue
-                result = response.results[0]
-                if not result.alternatives: continue
-                transcript = result.alternatives[0].transcript.strip()
-                is_final = result.is_final
-
-                if transcript:
-                    try:
-                        translated_text = self.translator.translate_text(transcript)
-                        if translated_text is None: translated_text = "[번역 실패]"
-                        if self.stop_event.is_set(): break
-                        self.text_queue.put((transcript, translated_text, is_final))
-
-                        if is_final:
-                             if self.stop_event.is_set(): break
-                             try:
-                                with open(ORIGINAL_FILE, 'a', encoding='utf-8') as f_org, \
-                                     open(TRANSLATED_FILE, 'a', encoding='utf-8') as f_tr:
-                                    f_org.write(transcript + '\n')
-                                    f_tr.write(translated_text + '\n')
-                             except Exception as e: print(f"    [오류] 최종 결과 파일 쓰기 오류: {e}")
-                    except Exception as e:
-                         if not self.stop_event.is_set():
-                              print(f"  [오류] 번역 중 오류 발생 (텍스트: '{transcript}'): {e}")
-                              traceback.print_exc()
-                              self.text_queue.put((transcript, "[번역 오류]", is_final))
-                         else: break
-
-            if not self.stop_event.is_set():
-                print("Streaming API 응답 처리 루프 정상 종료.")
-
-        except OutOfRange as e:
-             print(f"process_stream: Google API 스트리밍 세션 종료됨 (OutOfRange): {e}")
-             stream_active = False
-             if not self.stop_event.is_set():
-                 if self.ui and self.root and self.root.winfo_exists():
-                     self.root.after(0, lambda: tk.messagebox.showwarning("연결 종료", "실시간 인식/번역 세션이 종료되었습니다.\n(Google API 타임아웃 등)\n\n다시 시작해주세요."))
-                     self.stop_event.set()
-                     self.root.after(0, self.ui.toggle_recording)
-        except Exception as e:
-            if not self.stop_event.is_set():
-                print(f"process_stream 스레드에서 예외 발생: {e}")
-                traceback.print_exc()
-                stream_active = False
-                if self.ui and self.root and self.root.winfo_exists():
-                      self.root.after(0, lambda: self.ui.status_label.config(text="처리 오류", fg="red"))
-                self.stop_event.set()
-                self.root.after(0, self.ui.toggle_recording)
-        finally:
-            # API 스트림을 명시적으로 닫는 로직 추가 (필요한 경우)
-            # Google Cloud Speech API의 경우 response iterator를 다 소모하거나
-            # generator가 None을 yield하면 자동으로 닫히는 경향이 있음.
-            # 명시적 close가 필요하다면 API 문서 확인 필요.
-            # if responses and hasattr(responses, 'close'):
-            #    try: responses.close(); print("API 응답 스트림 닫기 시도")
-            #    except: pass
-            print(f"process_stream 스레드 종료 (stream_active: {stream_active}, stop_event: {self.stop_event.is_set()})")
-
+            summary = self.latency.status_summary()
+            self.ui.status_label.config(text=f"번역 중... {summary}" if summary else "번역 중...", fg="blue")
+        except tk.TclError: return
+        self.root.after(LATENCY_STATUS_INTERVAL_MS, self._update_latency_status)
 
     def update_ui(self):
         """큐에서 결과를 가져와 UI 업데이트"""
         print("update_ui 스레드 시작")
         while True:
             try:
-                original, translated, is_final = self.text_queue.get(block=True, timeout=0.1)
+                original, translated, is_final, key, queued_at = self.text_queue.get(block=True, timeout=0.1)
 
                 if original is None:
                      print("update_ui: None 수신, 종료.")
@@ -388,8 +381,9 @@ class RealtimeTranslatorApp:
                      self.text_queue.task_done()
                      break
 
+                self.latency.record_since("queue_wait", queued_at)
                 if self.ui and self.root and self.root.winfo_exists():
-                    self.root.after(0, self.ui.update_labels, original, translated, is_final)
+                    self.ui_dispatcher.post(original, translated, is_final, key)
                 else:
                      print("UI 업데이트 스킵: UI 또는 root 윈도우 없음. 스레드 종료.")
                      break
@@ -0,0 +1,37 @@
+# recognizer_backend.py
+
+class RecognizerBackend:
+    """
+    음성 인식 백엔드 인터페이스.
+    stream_responses()는 Google StreamingRecognizeResponse와 같은 모양
+    (response.results[i].alternatives[0].transcript / is_final / stability / result_end_time)의 응답을 yield 합니다.
+    """
+    language_code = None
+
+    def stream_responses(self, audio_generator, stop_event):
+        """오디오 청크 제너레이터를 소비하며 인식 응답을 yield 하는 제너레이터"""
+        raise NotImplementedError
+
+    async def stream_responses_async(self, audio_chunks):
+        """
+        asyncio 파이프라인용: 오디오 청크 async iterator를 소비하며 인식 응답을 yield 하는 async 제너레이터.
+        오디오가 끝나면 종료하고, 중지는 소비하는 태스크의 취소로 이루어집니다.
+        """
+        raise NotImplementedError
+        yield
+
+    def continue_from(self, previous):
+        """장애 복구로 새로 만든 인식기가 이전 인식기의 상태(마지막 최종 결과 등)를 이어받음"""
+        pass
+
+    def upload_stats(self):
+        """Speech API 전송량/인코딩 비용 (전송하지 않는 백엔드는 None)"""
+        return None
+
+    def stats_summary(self):
+        """중지 시 출력할 통계 문자열 (없으면 None)"""
+        return None
+
+    def close(self):
+        """백엔드 자원 정리 (필요한 경우)"""
+        pass
@@ -0,0 +1,123 @@
+# replay_recognizer.py
+import asyncio
+import datetime
+import json
+import threading
+import time
+import wave
+from config import RATE, CHANNELS, LANGUAGES, REPLAY_WAV_FILE, REPLAY_SCRIPT_FILE, REPLAY_LATENCY_SEC
+from recognizer_backend import RecognizerBackend
+
+# --- Google 응답과 같은 속성을 가진 가벼운 응답 객체 ---
+class ReplayAlternative:
+    def __init__(self, transcript):
+        self.transcript = transcript
+
+class ReplayResult:
+    def __init__(self, transcript, is_final, stability, end_sec):
+        self.alternatives = [ReplayAlternative(transcript)]
+        self.is_final = is_final
+        self.stability = stability
+        self.result_end_time = datetime.timedelta(seconds=end_sec)
+
+class ReplayResponse:
+    def __init__(self, results):
+        self.results = results
+
+def load_script(path):
+    """
+    타임라인 스크립트 로드. 각 항목은 오디오 시작 기준 시각 "t"(초)와
+    "transcript"/"is_final"/"stability" 또는 여러 결과를 담은 "results" 목록을 가집니다.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        events = json.load(f)
+    timeline = []
+    for event in events:
+        t = float(event["t"])
+        is_final = bool(event.get("is_final", False))
+        parts = event.get("results") or [{"transcript": event.get("transcript", ""), "stability": event.get("stability", 0.0)}]
+        results = [ReplayResult(p.get("transcript", ""), is_final and i == 0, float(p.get("stability", 1.0 if is_final else 0.0)), t)
+                   for i, p in enumerate(parts)]
+        timeline.append((t, ReplayResponse(results)))
+    timeline.sort(key=lambda item: item[0])
+    return timeline
+
+
+class ReplayRecognizer(RecognizerBackend):
+    """
+    네트워크/인증 없이 파이프라인을 돌리기 위한 대역 인식기.
+    들어오는 오디오는 실제 스트림처럼 계속 소비하고, 스크립트 타임라인의 응답을
+    스트림 시작 시각 + t + latency 에 맞춰 내보냅니다. 실제 Speech API가 요청 스트림을 닫은(half-close) 뒤에도
+    남은 최종 결과를 보내는 것처럼, 오디오가 먼저 끝나도 남은 응답은 예정 시각에 모두 내보냅니다 (중지 시에만 중단).
+    """
+    def __init__(self, language, script_path=REPLAY_SCRIPT_FILE, latency_sec=REPLAY_LATENCY_SEC):
+        self.language_code = LANGUAGES.get(language, "en-US")
+        self.script_path = script_path
+        self.latency_sec = latency_sec
+        self.timeline = load_script(script_path)
+        self.bytes_received = 0
+
+    def _drain_audio(self, audio_generator, stop_event):
+        """gRPC 요청 스트림처럼 오디오를 계속 읽어 들임"""
+        for chunk in audio_generator:
+            if chunk is None or stop_event.is_set(): break
+            self.bytes_received += len(chunk)
+
+    def stream_responses(self, audio_generator, stop_event):
+        print(f"Replay 인식 시작 (언어: {self.language_code}, 스크립트: {self.script_path}, 응답 {len(self.timeline)}개)")
+        threading.Thread(target=self._drain_audio, args=(audio_generator, stop_event),
+                         name="ReplayAudioDrainThread", daemon=True).start()
+        start = time.monotonic()
+        for t, response in self.timeline:
+            wait = start + t + self.latency_sec - time.monotonic()
+            if wait > 0: stop_event.wait(wait)
+            if stop_event.is_set(): break
+            yield response
+        print(f"Replay 인식 종료 (수신 오디오 {self.bytes_received / (RATE * CHANNELS * 2):.1f}초)")
+
+    async def stream_responses_async(self, audio_chunks):
+        """stream_responses의 asyncio 버전: 오디오 소비는 태스크로, 응답 시각 대기는 asyncio.sleep으로 처리"""
+        print(f"Replay 인식 시작 (언어: {self.language_code}, 스크립트: {self.script_path}, 응답 {len(self.timeline)}개)")
+        drain = asyncio.create_task(self._drain_audio_async(audio_chunks))
+        try:
+            start = time.monotonic()
+            for t, response in self.timeline:
+                # 오디오가 먼저 끝나도 남은 응답은 예정 시각에 내보냄 (중지는 태스크 취소로)
+                wait = start + t + self.latency_sec - time.monotonic()
+                if wait > 0: await asyncio.sleep(wait)
+                yield response
+        finally:
+            drain.cancel()
+        print(f"Replay 인식 종료 (수신 오디오 {self.bytes_received / (RATE * CHANNELS * 2):.1f}초)")
+
+    async def _drain_audio_async(self, audio_chunks):
+        async for chunk in audio_chunks: self.bytes_received += len(chunk)
+
+
+class WavAudioSource:
+    """WAV 파일을 장치 대신 실시간 속도로 링 버퍼에 넣어 주는 오디오 입력 대역"""
+    def __init__(self, path=REPLAY_WAV_FILE, loop=False):
+        self.path = path
+        self.loop = loop # True면 파일 끝에서 처음부터 다시 재생 (장시간 부하 측정용)
+
+    def play(self, audio_buffer, stop_event, frames_per_buffer, realtime=True):
+        with wave.open(self.path, 'rb') as wav:
+            if wav.getframerate() != RATE or wav.getnchannels() != CHANNELS or wav.getsampwidth() != 2:
+                raise ValueError(f"WAV 형식 불일치 ({self.path}): {wav.getframerate()}Hz/{wav.getnchannels()}ch/{wav.getsampwidth() * 8}bit, "
+                                 f"필요: {RATE}Hz/{CHANNELS}ch/16bit")
+            print(f"WAV 재생 시작: {self.path} ({wav.getnframes() / RATE:.1f}초)")
+            frame_sec = frames_per_buffer / RATE
+            next_due = time.monotonic()
+            while not stop_event.is_set():
+                data = wav.readframes(frames_per_buffer)
+                if not data:
+                    if not self.loop: break
+                    wav.rewind()
+                    continue
+                if realtime:
+                    next_due += frame_sec
+                    wait = next_due - time.monotonic()
+                    if wait > 0: stop_event.wait(wait)
+                audio_buffer.put(data)
+        print("WAV 재생 종료")
+        audio_buffer.close() # 파일 끝: 스트림 종료 알림
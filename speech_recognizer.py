@@ -1,13 +1,40 @@
 # speech_recognizer.py
+import re
+import time
+from collections import deque
 from google.cloud import speech
-from config import RATE, LANGUAGES
+from google.api_core.exceptions import OutOfRange
+from config import RATE, CHANNELS, LANGUAGES, STREAM_ROLLOVER_SEC, STREAM_ROLLOVER_OVERLAP_SEC, STREAM_ROLLOVER_MAX_REPLAY_SEC
+from recognizer_backend import RecognizerBackend
+from audio_encoder import UploadEncoder
 
-class SpeechRecognizer:
-    def __init__(self, language):
-        self.client = speech.SpeechClient()
+BYTES_PER_SECOND = RATE * CHANNELS * 2 # LINEAR16 (보관/재전송은 인코딩 전 PCM 기준)
+# 이음매 중복 제거 시 비교할 최대 단어 수
+SEAM_MAX_OVERLAP_WORDS = 8
+
+def _normalize_word(word):
+    return re.sub(r'[^\w]', '', word).lower()
+
+def trim_seam_overlap(previous_text, text, max_words=SEAM_MAX_OVERLAP_WORDS):
+    """text 앞부분이 previous_text 끝부분과 겹치면 겹친 단어를 제거해 반환"""
+    prev_words = [_normalize_word(w) for w in previous_text.split()]
+    words = text.split()
+    norm_words = [_normalize_word(w) for w in words]
+    for k in range(min(max_words, len(prev_words), len(words)), 0, -1):
+        if prev_words[-k:] == norm_words[:k]:
+            return " ".join(words[k:])
+    return text
+
+class SpeechRecognizer(RecognizerBackend):
+    """Google Cloud Speech-to-Text 스트리밍 인식 백엔드"""
+    def __init__(self, language, client=None):
+        # client: 재사용할 SpeechClient (ClientPool). 없으면 새로 생성
+        self.client = client or speech.SpeechClient()
         self.language_code = LANGUAGES.get(language, "en-US") # 기본값 설정
+        # 업로드 인코딩 단계 (AUDIO_UPLOAD_ENCODING). RecognitionConfig.encoding도 여기에 맞춤
+        self.upload_encoder = UploadEncoder()
         self.config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            encoding=speech.RecognitionConfig.AudioEncoding[self.upload_encoder.encoding],
             sample_rate_hertz=RATE,
             language_code=self.language_code,
             enable_automatic_punctuation=True,
@@ -22,6 +49,13 @@ class SpeechRecognizer:
         )
         self.requests = None
         self.responses = None
+        # 세션 롤오버 상태
+        self.session_count = 0
+        self._retained = deque() # 현재 세션에서 보낸 오디오 (시작 오프셋, 끝 오프셋, chunk)
+        self._session_sent_sec = 0.0
+        self._last_final_end_sec = 0.0
+        self._last_final_text = ""
+        self._source_done = False
 
     def start_streaming_recognize(self, audio_generator):
         """
@@ -47,6 +81,126 @@ class SpeechRecognizer:
             self.responses = None # 오류 발생 시 None으로 설정
             return None
 
+    def stream_responses(self, audio_generator, stop_event):
+        """
+        세션 롤오버를 포함한 무중단 스트리밍 인식. 응답을 yield 하는 제너레이터.
+        STREAM_ROLLOVER_SEC가 지나면 새 streaming_recognize 세션을 열고,
+        마지막 최종 결과 이후(+겹침 구간)의 보관 오디오를 먼저 재전송한 뒤 이음매의 중복 결과를 제거합니다.
+        """
+        audio_iter = iter(audio_generator)
+        replay = []
+        already_final_sec = 0.0 # 재전송 오디오 중 이전 세션에서 이미 최종 처리된 길이
+        self._source_done = False
+        while not stop_event.is_set() and not self._source_done:
+            seam_active, deadline = self._begin_session(replay, already_final_sec)
+            self.requests = self._session_requests(audio_iter, replay, deadline, stop_event)
+            self.responses = self.client.streaming_recognize(config=self.streaming_config, requests=self.requests)
+            try:
+                for response in self.responses:
+                    if seam_active and response.results:
+                        response, seam_active = self._dedupe_seam(response, already_final_sec)
+                        if response is None: continue
+                    self._track_final(response)
+                    yield response
+            except OutOfRange as e:
+                # 선제 전환 전에 제한에 걸린 경우에도 세션을 이어서 연다
+                print(f"스트리밍 세션 #{self.session_count} 제한 도달 (OutOfRange), 새 세션으로 전환: {e}")
+            replay, already_final_sec = self._replay_for_next_session()
+
+    def _begin_session(self, replay, already_final_sec):
+        """새 스트리밍 세션의 롤오버 상태 초기화. (이음매 중복 제거 필요 여부, 롤오버 시각) 반환"""
+        self.session_count += 1
+        self._retained.clear()
+        self._session_sent_sec = 0.0
+        self._last_final_end_sec = already_final_sec # 재전송 구간 중 이미 최종 처리된 부분
+        print(f"스트리밍 인식 세션 #{self.session_count} 시작 (언어: {self.language_code}, 재전송 {sum(len(c) for c in replay) / BYTES_PER_SECOND:.2f}초)")
+        return self.session_count > 1, time.monotonic() + STREAM_ROLLOVER_SEC
+
+    def _replay_for_next_session(self):
+        """다음 세션에 재전송할 오디오(마지막 최종 결과 직전 겹침 구간부터 현재까지)와 그중 이미 최종 처리된 길이"""
+        replay = [chunk for _, _, chunk in self._retained]
+        first_start = self._retained[0][0] if self._retained else self._session_sent_sec
+        return replay, max(0.0, self._last_final_end_sec - first_start)
+
+    def _session_requests(self, audio_iter, replay, deadline, stop_event):
+        """세션 하나의 요청 스트림: PCM 오디오를 업로드 인코딩으로 변환 (세션마다 새 스트림 헤더로 시작)"""
+        self.upload_encoder.start()
+        for chunk in self._session_audio(audio_iter, replay, deadline, stop_event):
+            content = self.upload_encoder.encode(chunk)
+            if content: yield speech.StreamingRecognizeRequest(audio_content=content)
+        content = self.upload_encoder.finish()
+        if content: yield speech.StreamingRecognizeRequest(audio_content=content)
+
+    def _session_audio(self, audio_iter, replay, deadline, stop_event):
+        """세션 하나에 보낼 오디오: 재전송분 -> 공유 오디오 제너레이터 (deadline까지)"""
+        for chunk in replay:
+            self._retain(chunk)
+            yield chunk
+        for chunk in audio_iter:
+            if chunk is None or stop_event.is_set():
+                self._source_done = True
+                return
+            self._retain(chunk)
+            yield chunk
+            if time.monotonic() >= deadline:
+                print(f"스트리밍 세션 #{self.session_count}: 롤오버 시간 도달, 요청 스트림 종료")
+                return
+        self._source_done = True
+
+    def continue_from(self, previous):
+        """복구 스트림: 마지막 최종 결과와 세션 번호를 이어받아 첫 세션부터 재전송 구간의 중복 단어를 제거, 업로드 통계도 이어서 집계"""
+        self.session_count = previous.session_count
+        self._last_final_text = previous._last_final_text
+        self.upload_encoder = previous.upload_encoder
+
+    def upload_stats(self):
+        return self.upload_encoder.report()
+
+    def stats_summary(self):
+        return self.upload_encoder.stats_summary()
+
+    def close(self):
+        self.upload_encoder.close()
+
+    def _retain(self, chunk):
+        start = self._session_sent_sec
+        self._session_sent_sec += len(chunk) / BYTES_PER_SECOND
+        self._retained.append((start, self._session_sent_sec, chunk))
+        while self._retained and self._session_sent_sec - self._retained[0][0] > STREAM_ROLLOVER_MAX_REPLAY_SEC:
+            self._retained.popleft()
+
+    def _track_final(self, response):
+        """최종 결과의 끝 시각 기록 및 그 이전(겹침 구간 제외) 보관 오디오 폐기"""
+        result = response.results[0] if response.results else None
+        if not result or not result.is_final: return
+        if result.alternatives: self._last_final_text = result.alternatives[0].transcript
+        end_time = result.result_end_time
+        self._last_final_end_sec = end_time.total_seconds() if hasattr(end_time, 'total_seconds') else float(end_time or 0)
+        keep_from = self._last_final_end_sec - STREAM_ROLLOVER_OVERLAP_SEC
+        while self._retained and self._retained[0][1] <= keep_from:
+            self._retained.popleft()
+
+    def _dedupe_seam(self, response, already_final_sec):
+        """
+        롤오버 직후 응답의 중복 제거. (response 또는 None, seam_active) 반환.
+        이미 최종 처리된 재전송 구간 안에서 끝나는 최종 결과는 버리고,
+        이전 최종 결과 끝과 겹치는 앞 단어는 잘라냅니다. 이음매 이후 첫 최종 결과가 나오면 종료.
+        """
+        result = response.results[0]
+        if result.is_final:
+            end_time = result.result_end_time
+            end_sec = end_time.total_seconds() if hasattr(end_time, 'total_seconds') else float(end_time or 0)
+            if end_sec <= already_final_sec:
+                print("롤오버 이음매: 재전송 구간의 중복 최종 결과 제거")
+                return None, True
+        for r in response.results:
+            if not r.alternatives: continue
+            r.alternatives[0].transcript = trim_seam_overlap(self._last_final_text, r.alternatives[0].transcript)
+            break # 이전 결과와 겹칠 수 있는 것은 맨 앞 result뿐
+        if not any(r.alternatives and r.alternatives[0].transcript.strip() for r in response.results):
+            return None, not result.is_final
+        return response, not result.is_final
+
     # def recognize(self, audio_bytes):
     #     """음성 데이터를 받아 텍스트로 변환하여 리스트로 반환"""
     #     audio = speech.RecognitionAudio(content=audio_bytes)
@@ -63,3 +217,57 @@ class SpeechRecognizer:
     #         if transcript.strip():
     #             transcripts.append(transcript)
     #     return transcripts
+
+
+class AsyncSpeechRecognizer(SpeechRecognizer):
+    """
+    asyncio 파이프라인용 Speech 스트리밍 인식 (speech.SpeechAsyncClient).
+    세션 롤오버/재전송/이음매 중복 제거는 SpeechRecognizer와 같고, 요청과 응답을 모두 이벤트 루프에서 처리합니다.
+    중지는 stop_event 대신 이 제너레이터를 소비하는 태스크의 취소로 이루어집니다.
+    """
+    def __init__(self, language, client):
+        # client: 이벤트 루프 안에서 만든 SpeechAsyncClient (AsyncPipelineRuntime.acquire_speech_client)
+        super().__init__(language, client=client)
+
+    async def stream_responses_async(self, audio_chunks):
+        audio_iter = aiter(audio_chunks)
+        replay = []
+        already_final_sec = 0.0
+        self._source_done = False
+        while not self._source_done:
+            seam_active, deadline = self._begin_session(replay, already_final_sec)
+            # 비동기 클라이언트에는 config를 붙여 주는 helper가 없으므로 첫 요청으로 직접 보냄
+            self.responses = await self.client.streaming_recognize(requests=self._session_requests_async(audio_iter, replay, deadline))
+            try:
+                async for response in self.responses:
+                    if seam_active and response.results:
+                        response, seam_active = self._dedupe_seam(response, already_final_sec)
+                        if response is None: continue
+                    self._track_final(response)
+                    yield response
+            except OutOfRange as e:
+                print(f"스트리밍 세션 #{self.session_count} 제한 도달 (OutOfRange), 새 세션으로 전환: {e}")
+            replay, already_final_sec = self._replay_for_next_session()
+
+    async def _session_requests_async(self, audio_iter, replay, deadline):
+        """세션 하나의 요청 스트림: 설정 -> 업로드 인코딩한 오디오 (재전송분 -> 공유 오디오)"""
+        yield speech.StreamingRecognizeRequest(streaming_config=self.streaming_config)
+        self.upload_encoder.start()
+        async for chunk in self._session_audio_async(audio_iter, replay, deadline):
+            content = self.upload_encoder.encode(chunk)
+            if content: yield speech.StreamingRecognizeRequest(audio_content=content)
+        content = self.upload_encoder.finish()
+        if content: yield speech.StreamingRecognizeRequest(audio_content=content)
+
+    async def _session_audio_async(self, audio_iter, replay, deadline):
+        """세션 하나에 보낼 PCM 오디오: 재전송분 -> 공유 오디오 (deadline까지)"""
+        for chunk in replay:
+            self._retain(chunk)
+            yield chunk
+        async for chunk in audio_iter:
+            self._retain(chunk)
+            yield chunk
+            if time.monotonic() >= deadline:
+                print(f"스트리밍 세션 #{self.session_count}: 롤오버 시간 도달, 요청 스트림 종료")
+                return
+        self._source_done = True
@@ -0,0 +1,144 @@
+# subtitle_events.py
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from config import HEADLESS_SSE_HOST, HEADLESS_SSE_PORT, HEADLESS_SSE_CLIENT_QUEUE, HEADLESS_SSE_HEARTBEAT_SEC
+
+class SubtitleEventHub:
+    """
+    자막/상태 이벤트(dict)를 여러 출력(sink)으로 나눠 보내는 허브.
+    여러 세션이 하나의 허브를 공유하며, sink는 event 하나를 받는 호출 가능 객체입니다.
+    한 sink의 오류는 다른 sink나 세션 스레드로 번지지 않습니다.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sinks = []
+        self._seq = 0
+
+    def add_sink(self, sink):
+        with self._lock: self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        with self._lock:
+            if sink in self._sinks: self._sinks.remove(sink)
+
+    def publish(self, event):
+        """이벤트에 일련번호/시각을 붙여 모든 sink로 전달"""
+        with self._lock:
+            self._seq += 1
+            event = dict(event, seq=self._seq, time=time.time())
+            sinks = list(self._sinks)
+        for sink in sinks:
+            try: sink(event)
+            except Exception as e:
+                print(f"자막 이벤트 출력 오류 ({type(sink).__name__}): {e}")
+                traceback.print_exc()
+
+
+class JsonlStreamSink:
+    """이벤트를 한 줄에 하나씩 JSON으로 쓰는 sink (기본: 표준 출력)"""
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+class SseSubtitleServer:
+    """
+    로컬 Server-Sent Events 엔드포인트.
+      GET /events            모든 세션의 이벤트 스트림 (?session=이름 으로 특정 세션만 구독)
+      GET /status            status_provider()가 돌려주는 현재 상태(JSON)
+    구독자마다 제한된 큐를 두어 느린 구독자가 세션 스레드를 막지 않게 하고, 넘치면 가장 오래된 이벤트를 버립니다.
+    """
+    def __init__(self, host=HEADLESS_SSE_HOST, port=HEADLESS_SSE_PORT, status_provider=None,
+                 client_queue_size=HEADLESS_SSE_CLIENT_QUEUE, heartbeat_sec=HEADLESS_SSE_HEARTBEAT_SEC):
+        self.host = host
+        self.port = port
+        self.status_provider = status_provider
+        self.client_queue_size = client_queue_size
+        self.heartbeat_sec = heartbeat_sec
+        self._lock = threading.Lock()
+        self._clients = set() # (queue, session 필터)
+        self._server = None
+        self._closed = threading.Event()
+        self.dropped_events = 0
+
+    def start(self):
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args): pass # 요청 로그 출력 안 함
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/events": server._serve_events(self, parse_qs(url.query).get("session", [None])[0])
+                elif url.path == "/status": server._serve_status(self)
+                else: self.send_error(404)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="SseServerThread", daemon=True).start()
+        print(f"자막 SSE 엔드포인트: http://{self.host}:{self.port}/events (상태: /status)")
+        return self
+
+    def close(self):
+        self._closed.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __call__(self, event):
+        """허브 sink: 구독 중인 모든 클라이언트 큐에 이벤트 추가"""
+        with self._lock: clients = list(self._clients)
+        for client_queue, session_filter in clients:
+            if session_filter and event.get("session") not in (None, session_filter): continue
+            while True:
+                try:
+                    client_queue.put_nowait(event)
+                    break
+                except queue.Full:
+                    try: client_queue.get_nowait(); self.dropped_events += 1
+                    except queue.Empty: pass
+
+    def client_count(self):
+        with self._lock: return len(self._clients)
+
+    def _serve_events(self, handler, session_filter):
+        client = (queue.Queue(maxsize=self.client_queue_size), session_filter)
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Access-Control-Allow-Origin", "*")
+        handler.end_headers()
+        with self._lock: self._clients.add(client)
+        try:
+            while not self._closed.is_set():
+                try:
+                    event = client[0].get(timeout=self.heartbeat_sec)
+                    payload = f"event: {event.get('type', 'message')}\nid: {event.get('seq', '')}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                except queue.Empty:
+                    payload = ": keepalive\n\n"
+                handler.wfile.write(payload.encode('utf-8'))
+                handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError): pass # 구독자 연결 종료
+        finally:
+            with self._lock: self._clients.discard(client)
+
+    def _serve_status(self, handler):
+        body = json.dumps(self.status_provider() if self.status_provider else {}, ensure_ascii=False).encode('utf-8')
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
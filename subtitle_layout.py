@@ -0,0 +1,122 @@
+# subtitle_layout.py
+import unicodedata
+from collections import OrderedDict
+
+# 줄 첫머리에 올 수 없는 문장 부호 (앞 글자에 붙여서 함께 줄바꿈)
+NO_LINE_START = set("、。，．：；！？）」』】〉》〕｝・ー々ぁぃぅぇぉっゃゅょァィゥェォッャュョ,.!?:;)]}%")
+# 줄바꿈 결과 캐시 크기 ((텍스트, 글꼴 크기, 폭) 단위)
+WRAP_CACHE_SIZE = 64
+
+def is_wide(ch):
+    """동아시아 전각 문자 여부 (한글, 한자, 가나, 전각 기호)"""
+    return unicodedata.east_asian_width(ch) in ('W', 'F')
+
+def is_hangul(ch):
+    code = ord(ch)
+    return 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F
+
+def split_break_units(text):
+    """
+    줄바꿈 가능한 단위로 분할. 공백으로 끝나는 단어 단위가 기본이고,
+    한자/가나 등 단어 사이에 공백이 없는 전각 문자는 한 글자씩 나눕니다 (한글은 단어 단위 유지).
+    """
+    units = []
+    current = ""
+    for ch in text:
+        if ch in NO_LINE_START and (current or units):
+            # 닫는 부호는 앞 단위에 붙임
+            if current: current += ch
+            else: units[-1] += ch
+            continue
+        if is_wide(ch) and not is_hangul(ch):
+            if current: units.append(current)
+            units.append(ch)
+            current = ""
+            continue
+        current += ch
+        if ch == " ":
+            units.append(current)
+            current = ""
+    if current: units.append(current)
+    return units
+
+
+class FontMetrics:
+    """글꼴 크기 하나의 측정값 캐시: 줄 높이, 글자별 폭 (전각 문자는 대표 글자 폭 하나를 공유)"""
+    def __init__(self, font):
+        self.font = font
+        self.linespace = font.metrics('linespace')
+        self.wide_width = font.measure("中")
+        self._widths = {}
+
+    def char_width(self, ch):
+        width = self._widths.get(ch)
+        if width is None:
+            width = self.wide_width if is_wide(ch) else self.font.measure(ch)
+            self._widths[ch] = width
+        return width
+
+    def text_width(self, text):
+        return sum(self.char_width(ch) for ch in text)
+
+
+class SubtitleLayout:
+    """
+    자막 창용 텍스트 배치 엔진.
+    글꼴 크기별로 글꼴 객체와 글자/줄 측정값을 캐시하고, 줄바꿈과 창에 들어가는 마지막 N줄 선택을 직접 계산합니다.
+    Tk 레이블에는 이미 줄바꿈된 보일 부분만 넘기므로 update_idletasks/winfo_reqheight 같은 동기 재배치가 필요 없습니다.
+    """
+    def __init__(self, font_factory):
+        """font_factory: 글꼴 크기 -> measure()/metrics()를 가진 글꼴 객체 (tkFont.Font)"""
+        self.font_factory = font_factory
+        self._metrics = {} # 글꼴 크기 -> FontMetrics
+        self._wrap_cache = OrderedDict()
+
+    def metrics(self, size):
+        metrics = self._metrics.get(size)
+        if metrics is None:
+            metrics = self._metrics[size] = FontMetrics(self.font_factory(size))
+        return metrics
+
+    def font(self, size):
+        return self.metrics(size).font
+
+    def wrap(self, text, size, width):
+        """text를 폭(px) 안에 들어가는 줄 목록으로 분할"""
+        key = (text, size, width)
+        lines = self._wrap_cache.get(key)
+        if lines is not None:
+            self._wrap_cache.move_to_end(key)
+            return lines
+        metrics = self.metrics(size)
+        lines = []
+        for paragraph in text.split('\n'):
+            line, line_width = "", 0
+            for unit in split_break_units(paragraph):
+                unit_width = metrics.text_width(unit)
+                core_width = unit_width - metrics.text_width(unit[len(unit.rstrip(' ')):]) # 줄 끝 공백은 폭에서 제외
+                if line and line_width + core_width > width:
+                    lines.append(line.rstrip(' '))
+                    line, line_width = "", 0
+                if core_width > width:
+                    # 한 단위가 폭보다 길면 글자 단위로 자름
+                    for ch in unit:
+                        char_width = metrics.char_width(ch)
+                        if line and line_width + char_width > width:
+                            lines.append(line.rstrip(' '))
+                            line, line_width = "", 0
+                        line += ch
+                        line_width += char_width
+                    continue
+                line += unit
+                line_width += unit_width
+            lines.append(line.rstrip(' '))
+        self._wrap_cache[key] = lines
+        if len(self._wrap_cache) > WRAP_CACHE_SIZE: self._wrap_cache.popitem(last=False)
+        return lines
+
+    def tail(self, text, size, width, height):
+        """창 영역(폭, 높이 px)에 들어가는 마지막 줄들과 앞부분이 잘렸는지 여부 반환"""
+        lines = self.wrap(text, size, width)
+        max_lines = max(1, height // max(1, self.metrics(size).linespace))
+        return lines[-max_lines:], len(lines) > max_lines
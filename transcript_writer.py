@@ -0,0 +1,118 @@
+# transcript_writer.py
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from config import (ORIGINAL_FILE, TRANSLATED_FILE, TRANSCRIPT_JSONL_FILE,
+                    TRANSCRIPT_FLUSH_INTERVAL_SEC, TRANSCRIPT_FSYNC_INTERVAL_SEC)
+
+def path_for_language(path, language_code):
+    """번역 언어별 파일 경로: results/translated_text_날짜.txt -> results/translated_text_날짜_ko.txt"""
+    if not path: return None
+    root, ext = os.path.splitext(path)
+    return f"{root}_{language_code}{ext}"
+
+class TranscriptWriter:
+    """
+    최종 결과를 파일에 기록하는 전용 스레드.
+    파일을 열어 둔 채로 큐에 쌓인 줄을 모아서 쓰고, 설정된 주기로 flush / fsync 합니다.
+    인식/번역 스레드는 write()로 큐에 넣기만 하므로 파일 I/O에 막히지 않습니다.
+    """
+    def __init__(self, original_path=ORIGINAL_FILE, translated_path=TRANSLATED_FILE, jsonl_path=TRANSCRIPT_JSONL_FILE,
+                 flush_interval=TRANSCRIPT_FLUSH_INTERVAL_SEC, fsync_interval=TRANSCRIPT_FSYNC_INTERVAL_SEC):
+        self.original_path = original_path
+        self.translated_path = translated_path
+        self.jsonl_path = jsonl_path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._queue = queue.Queue()
+        self._files = []
+        self._thread = None
+        self.lines_written = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive(): return
+        self._thread = threading.Thread(target=self._run, name="TranscriptWriterThread", daemon=True)
+        self._thread.start()
+
+    def write(self, original, translated):
+        """최종 결과 한 줄 기록 요청 (논블로킹)"""
+        self._queue.put((time.time(), original, translated))
+
+    def close(self, timeout=2.0):
+        """남은 줄을 모두 기록하고 파일 닫기"""
+        if not self._thread: return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive(): print("경고: TranscriptWriter 스레드가 시간 내에 종료되지 않음.")
+        self._thread = None
+
+    def _open(self, path):
+        if not path: return None
+        directory = os.path.dirname(path)
+        if directory: os.makedirs(directory, exist_ok=True)
+        f = open(path, 'a', encoding='utf-8')
+        self._files.append(f)
+        return f
+
+    def _run(self):
+        try:
+            f_org = self._open(self.original_path)
+            f_tr = self._open(self.translated_path)
+            f_jsonl = self._open(self.jsonl_path)
+        except Exception as e:
+            print(f"    [오류] 결과 파일 열기 오류: {e}")
+            traceback.print_exc()
+            self._close_files()
+            return
+
+        last_flush = last_fsync = time.monotonic()
+        dirty = False # 기록했지만 아직 flush하지 않은 줄이 있음
+        unsynced = False # flush했지만 아직 fsync하지 않은 줄이 있음
+        stopping = False
+        while not stopping:
+            # 다음 flush / fsync 시점까지 대기하며 그 사이에 들어온 줄을 한꺼번에 기록
+            deadlines = []
+            if dirty: deadlines.append(last_flush + self.flush_interval)
+            if unsynced: deadlines.append(last_fsync + self.fsync_interval)
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+                while True: batch.append(self._queue.get_nowait())
+            except queue.Empty: pass
+            if None in batch:
+                stopping = True
+                batch = [item for item in batch if item is not None]
+            try:
+                if batch:
+                    if f_org: f_org.write(''.join(original + '\n' for _, original, _ in batch))
+                    if f_tr: f_tr.write(''.join(translated + '\n' for _, _, translated in batch))
+                    if f_jsonl:
+                        f_jsonl.write(''.join(json.dumps({"time": ts, "original": original, "translated": translated}, ensure_ascii=False) + '\n'
+                                              for ts, original, translated in batch))
+                    self.lines_written += len(batch)
+                    dirty = True
+                now = time.monotonic()
+                if dirty and (stopping or now - last_flush >= self.flush_interval):
+                    for f in self._files: f.flush()
+                    last_flush = now
+                    dirty = False
+                    unsynced = self.fsync_interval is not None
+                if unsynced and (stopping or now - last_fsync >= self.fsync_interval):
+                    for f in self._files: os.fsync(f.fileno())
+                    last_fsync = now
+                    unsynced = False
+            except Exception as e:
+                print(f"    [오류] 최종 결과 파일 쓰기 오류: {e}")
+                traceback.print_exc()
+        self._close_files()
+        print(f"TranscriptWriter 종료 (기록 {self.lines_written}줄)")
+
+    def _close_files(self):
+        for f in self._files:
+            try: f.close()
+            except Exception as e: print(f"결과 파일 닫기 오류: {e}")
+        self._files = []
@@ -0,0 +1,243 @@
+# translate_guard.py
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from google.api_core.exceptions import ClientError, TooManyRequests
+from config import (TRANSLATE_DEADLINE_SEC, TRANSLATE_MAX_ATTEMPTS, TRANSLATE_BACKOFF_BASE_SEC, TRANSLATE_BACKOFF_MAX_SEC,
+                    TRANSLATE_HEDGE_ENABLED, TRANSLATE_HEDGE_PERCENTILE, TRANSLATE_HEDGE_MIN_DELAY_SEC, TRANSLATE_HEDGE_WINDOW,
+                    TRANSLATE_HEDGE_MIN_SAMPLES, TRANSLATE_HEDGE_MAX_RATIO, TRANSLATE_MAX_IN_FLIGHT,
+                    TRANSLATE_BREAKER_FAILURES, TRANSLATE_BREAKER_COOLDOWN_SEC)
+
+class TranslateRejectedError(RuntimeError):
+    """회로 차단기가 열려 있거나 진행 중인 시도가 상한이라 번역 API를 호출하지 않음"""
+
+
+def is_retryable(error):
+    """재시도할 오류인지 (429를 제외한 4xx는 요청 자체의 문제라 다시 보내도 같은 결과)"""
+    return not isinstance(error, ClientError) or isinstance(error, TooManyRequests)
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold회에 이르면 열림(open): cooldown_sec 동안 호출을 바로 거절합니다.
+    그 뒤 반열림(half_open)에서 시험 호출 하나만 통과시켜 성공하면 닫히고(closed), 실패하면 다시 열립니다.
+    """
+    def __init__(self, failure_threshold=TRANSLATE_BREAKER_FAILURES, cooldown_sec=TRANSLATE_BREAKER_COOLDOWN_SEC, name="번역 API"):
+        self.failure_threshold = failure_threshold
+        self.cooldown_sec = cooldown_sec
+        self.name = name
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        # 통계
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self):
+        """호출해도 되면 True (반열림이면 시험 호출 하나만 허용)"""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown_sec:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "closed": return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state == "closed": return
+            self.state = "closed"
+        print(f"{self.name} 회로 차단기 닫힘 (시험 호출 성공)")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "open": return
+            if self.state == "closed" and self._failures < self.failure_threshold: return
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self.opened += 1
+            failures = self._failures
+        print(f"{self.name} 회로 차단기 열림 (연속 실패 {failures}회): {self.cooldown_sec:g}초 동안 호출하지 않고 대체 텍스트 표시")
+
+    def release(self):
+        """허용받은 호출이 API에 닿지 못하고 끝남 (성공/실패로 세지 않고, 반열림이면 다음 호출이 시험 호출이 되도록)"""
+        with self._lock:
+            if self.state == "half_open": self._probing = False
+
+
+class TranslateRequestGuard:
+    """
+    번역 API 호출 보호 (모든 세션/번역 언어가 공유).
+    - 기한: 호출 하나(재시도와 헤지 포함)가 deadline_sec를 넘으면 더 기다리지 않고 TimeoutError
+      (이미 보낸 시도는 요청 스레드에서 끝날 때까지 진행되며 진행 중 시도 수에 포함됨)
+    - 재시도: 재시도할 수 있는 오류면 full jitter 지수 백오프 후 다시 시도 (남은 기한 안에서만)
+    - 헤지: 시도가 최근 성공 지연의 p(hedge_percentile)보다 오래 걸리면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+      (헤지 수는 전체 호출의 hedge_max_ratio 이하)
+    - 과부하/장애: 진행 중 시도가 max_in_flight개이거나 회로 차단기가 열려 있으면 바로 TranslateRejectedError
+    """
+    def __init__(self, deadline_sec=TRANSLATE_DEADLINE_SEC, max_attempts=TRANSLATE_MAX_ATTEMPTS,
+                 backoff_base_sec=TRANSLATE_BACKOFF_BASE_SEC, backoff_max_sec=TRANSLATE_BACKOFF_MAX_SEC,
+                 hedge_enabled=TRANSLATE_HEDGE_ENABLED, hedge_percentile=TRANSLATE_HEDGE_PERCENTILE,
+                 hedge_min_delay_sec=TRANSLATE_HEDGE_MIN_DELAY_SEC, hedge_max_ratio=TRANSLATE_HEDGE_MAX_RATIO,
+                 max_in_flight=TRANSLATE_MAX_IN_FLIGHT, breaker=None):
+        self.deadline_sec = deadline_sec
+        self.max_attempts = max_attempts
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay_sec = hedge_min_delay_sec
+        self.hedge_max_ratio = hedge_max_ratio
+        self.max_in_flight = max_in_flight
+        self.breaker = breaker or CircuitBreaker()
+        # 시도 수가 max_in_flight 이하로 제한되므로 풀에서 대기하는 작업은 없음
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="TranslateAttempt")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=TRANSLATE_HEDGE_WINDOW) # 최근 성공 시도 지연(초)
+        self._random = random.Random()
+        # 통계
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.deadline_exceeded = 0
+        self.rejected = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self):
+        """헤지 요청을 보내기까지 기다릴 시간(초). 표본이 모자라면 None (헤지 안 함)"""
+        with self._lock: samples = sorted(self._latencies)
+        if len(samples) < TRANSLATE_HEDGE_MIN_SAMPLES: return None
+        rank = max(1, math.ceil(len(samples) * self.hedge_percentile / 100))
+        return max(self.hedge_min_delay_sec, samples[rank - 1])
+
+    def call(self, func, *args, **kwargs):
+        """
+        func(*args, **kwargs)를 보호해서 호출하고 결과 반환.
+        기한 초과면 TimeoutError, 차단기 열림/과부하면 TranslateRejectedError, 재시도로도 실패하면 마지막 오류를 던집니다.
+        """
+        with self._lock: self.calls += 1
+        if not self.breaker.allow():
+            with self._lock: self.rejected += 1
+            raise TranslateRejectedError(f"{self.breaker.name} 회로 차단기 열림")
+        deadline = time.monotonic() + self.deadline_sec
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = self._attempt(func, args, kwargs, deadline)
+            except TimeoutError:
+                self._finish(False, deadline_exceeded=True)
+                raise
+            except TranslateRejectedError:
+                # 진행 중 시도 상한 거절은 로컬 과부하: 앞선 시도가 API에서 실패한 재시도 중일 때만 차단기 실패로 기록
+                self._finish(False, rejected=True, reached_api=attempt > 1)
+                raise
+            except Exception as e:
+                # full jitter: 동시에 실패한 호출들이 같은 시각에 몰려 재시도하지 않도록
+                backoff = self._random.uniform(0, min(self.backoff_max_sec, self.backoff_base_sec * 2 ** (attempt - 1)))
+                if attempt >= self.max_attempts or not is_retryable(e) or time.monotonic() + backoff >= deadline:
+                    self._finish(False)
+                    raise
+                with self._lock: self.retries += 1
+                time.sleep(backoff)
+                continue
+            self._finish(True)
+            return result
+
+    def _finish(self, success, deadline_exceeded=False, rejected=False, reached_api=True):
+        with self._lock:
+            if success: self.succeeded += 1
+            else: self.failed += 1
+            if deadline_exceeded: self.deadline_exceeded += 1
+            if rejected: self.rejected += 1
+        if success: self.breaker.record_success()
+        elif reached_api: self.breaker.record_failure()
+        else: self.breaker.release()
+
+    def _attempt(self, func, args, kwargs, deadline):
+        """시도 하나 (필요하면 헤지 포함). 먼저 성공한 결과 반환, 모두 실패하면 마지막 오류"""
+        started = time.monotonic()
+        pending = {self._submit(func, args, kwargs)}
+        hedge = None
+        hedge_at = None
+        if self.hedge_enabled:
+            delay = self.hedge_delay()
+            if delay is not None: hedge_at = started + delay
+        error = None
+        while pending:
+            now = time.monotonic()
+            if now >= deadline: raise TimeoutError(f"번역 요청 기한 {self.deadline_sec:.1f}초 초과")
+            timeout = deadline - now
+            if hedge_at is not None: timeout = min(timeout, max(0.0, hedge_at - now))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock: self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+            if hedge_at is not None and pending and time.monotonic() >= hedge_at:
+                hedge_at = None # 시도마다 헤지는 한 번만
+                if self._hedge_allowed():
+                    try: hedge = self._submit(func, args, kwargs)
+                    except TranslateRejectedError: continue # 과부하면 헤지 없이 첫 요청을 계속 기다림
+                    with self._lock: self.hedges += 1
+                    pending.add(hedge)
+        raise error
+
+    def _hedge_allowed(self):
+        with self._lock: return self.hedges < self.hedge_max_ratio * self.calls
+
+    def _submit(self, func, args, kwargs):
+        """요청 스레드에서 시도 시작 (진행 중 시도가 상한이면 TranslateRejectedError)"""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                raise TranslateRejectedError(f"진행 중인 번역 요청이 상한({self.max_in_flight}개)에 도달")
+            self._in_flight += 1
+        started = time.monotonic()
+        try: future = self._executor.submit(func, *args, **kwargs)
+        except RuntimeError as e: # 종료 이후
+            with self._lock: self._in_flight -= 1
+            raise TranslateRejectedError(str(e))
+        future.add_done_callback(lambda f: self._on_attempt_done(f, started))
+        return future
+
+    def _on_attempt_done(self, future, started):
+        # 기한이 지나 버려진 시도도 성공하면 지연 표본에 포함 (느린 꼬리가 헤지 지연 계산에서 빠지지 않도록)
+        with self._lock:
+            self._in_flight -= 1
+            if not future.cancelled() and future.exception() is None: self._latencies.append(time.monotonic() - started)
+
+    def report(self):
+        with self._lock:
+            report = {
+                "calls": self.calls, "succeeded": self.succeeded, "failed": self.failed,
+                "deadline_exceeded": self.deadline_exceeded, "rejected": self.rejected, "retries": self.retries,
+                "hedges": self.hedges, "hedge_wins": self.hedge_wins, "in_flight": self._in_flight,
+            }
+        report["hedge_delay"] = self.hedge_delay()
+        report["breaker"] = {"state": self.breaker.state, "opened": self.breaker.opened}
+        return report
+
+    def stats_summary(self):
+        r = self.report()
+        hedge_delay = f"{r['hedge_delay'] * 1000:.0f}ms" if r["hedge_delay"] is not None else "표본 부족"
+        return (f"번역 요청 보호: 호출 {r['calls']}회 (성공 {r['succeeded']}회, 실패 {r['failed']}회, 기한 초과 {r['deadline_exceeded']}회, "
+                f"거절 {r['rejected']}회), 재시도 {r['retries']}회, 헤지 {r['hedges']}회 (헤지 응답 사용 {r['hedge_wins']}회, "
+                f"헤지 지연 {hedge_delay}), 회로 차단기 {r['breaker']['state']} (열림 {r['breaker']['opened']}회)")
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,98 @@
+# translation_cache.py
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from config import TRANSLATION_CACHE_MAX_ENTRIES, TRANSLATION_CACHE_TTL_SEC, TRANSLATION_CACHE_FILE
+
+def normalize_text(text):
+    """캐시 키용 텍스트 정규화 (앞뒤 공백 제거, 연속 공백 하나로)"""
+    return " ".join(text.split())
+
+class TranslationCache:
+    """
+    (소스 코드, 타겟 코드, 정규화된 텍스트) -> 번역 결과 LRU 캐시.
+    항목 수/유효 시간 기반으로 제거하며, 선택적으로 JSON 파일에 저장/로드합니다.
+    """
+    def __init__(self, max_entries=TRANSLATION_CACHE_MAX_ENTRIES, ttl_sec=TRANSLATION_CACHE_TTL_SEC, path=TRANSLATION_CACHE_FILE):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> (translated, 저장 시각(wall clock))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(source_code, target_code, text):
+        return (source_code, target_code, normalize_text(text))
+
+    def get(self, source_code, target_code, text):
+        key = self.make_key(source_code, target_code, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, source_code, target_code, text, translated):
+        key = self.make_key(source_code, target_code, text)
+        with self._lock:
+            self._entries[key] = (translated, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _is_expired(self, entry):
+        return self.ttl_sec is not None and time.time() - entry[1] > self.ttl_sec
+
+    def __len__(self):
+        with self._lock: return len(self._entries)
+
+    def stats_summary(self):
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0.0
+        return f"캐시 항목 {len(self)}개, 적중 {self.hits}건 / 미적중 {self.misses}건 ({hit_rate:.1f}%), 제거 {self.evictions}건"
+
+    def load(self):
+        """저장된 캐시 파일 로드 (만료된 항목은 건너뜀)"""
+        if not self.path or not os.path.exists(self.path): return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            with self._lock:
+                for source_code, target_code, text, translated, saved_at in records:
+                    entry = (translated, saved_at)
+                    if self._is_expired(entry): continue
+                    self._entries[(source_code, target_code, text)] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            print(f"번역 캐시 로드: {len(self)}개 항목 ({self.path})")
+        except Exception as e:
+            print(f"번역 캐시 로드 실패 ({self.path}): {e}")
+
+    def save(self):
+        """캐시를 파일에 저장 (임시 파일에 쓴 뒤 교체)"""
+        if not self.path: return
+        try:
+            with self._lock:
+                records = [[k[0], k[1], k[2], v[0], v[1]] for k, v in self._entries.items() if not self._is_expired(v)]
+            directory = os.path.dirname(self.path)
+            if directory: os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            print(f"번역 캐시 저장: {len(records)}개 항목 ({self.path})")
+        except Exception as e:
+            print(f"번역 캐시 저장 실패 ({self.path}): {e}")
@@ -0,0 +1,154 @@
+# translation_scheduler.py
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import INTERIM_DEBOUNCE_SEC, TRANSLATION_WORKERS, TRANSLATION_BATCH_MAX_SIZE, TRANSLATION_BATCH_MAX_DELAY_SEC
+
+class InterimCoalescer:
+    """
+    TranslatorService 앞단의 중간 결과 병합 스케줄러 (latest-wins + debounce).
+    - 최종 결과(final): 대기 중인 중간 결과를 버리고 즉시 번역 요청
+    - 중간 결과(interim): debounce 창 안에서는 가장 최신 것 하나만 유지했다가 창이 끝나면 번역 요청
+    발화의 첫 중간 결과는 지연 없이 바로 전달되므로 자막 표시가 늦어지지 않습니다.
+    """
+    def __init__(self, translation_pool, debounce_sec=INTERIM_DEBOUNCE_SEC):
+        self.translation_pool = translation_pool
+        self.debounce_sec = debounce_sec
+        self._cond = threading.Condition()
+        self._pending_interim = None
+        self._last_interim_text = None
+        self._last_dispatch = 0.0
+        self._closed = False
+        # 통계
+        self.received_interims = 0
+        self.superseded_interims = 0
+        self.dispatched_interims = 0
+        self.dispatched_finals = 0
+        self._thread = threading.Thread(target=self._run, name="InterimCoalescerThread", daemon=True)
+        self._thread.start()
+
+    def submit(self, transcript, is_final, segments=None):
+        """인식 결과 전달 (논블로킹). segments는 증분 번역용 번역 단위 목록 (선택)"""
+        with self._cond:
+            if self._closed: return
+            if is_final:
+                if self._pending_interim is not None:
+                    self.superseded_interims += 1
+                    self._pending_interim = None
+                # 풀 제출도 lock 안에서 수행해 중간/최종 결과의 제출 순서를 보장
+                self.translation_pool.submit(transcript, True, segments)
+                self.dispatched_finals += 1
+                self._last_interim_text = None
+                self._last_dispatch = 0.0 # 다음 발화의 첫 중간 결과는 즉시 전달
+                return
+            self.received_interims += 1
+            if self._pending_interim is not None: self.superseded_interims += 1
+            if transcript == self._last_interim_text:
+                # 안정도만 달라지고 텍스트는 같은 중간 결과는 다시 번역하지 않음
+                self._pending_interim = None
+                return
+            self._pending_interim = (transcript, segments)
+            self._cond.notify()
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                if self._pending_interim is None:
+                    self._cond.wait()
+                    continue
+                wait = self._last_dispatch + self.debounce_sec - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                (text, segments), self._pending_interim = self._pending_interim, None
+                self._last_interim_text = text
+                self._last_dispatch = time.monotonic()
+                self.translation_pool.submit(text, False, segments)
+                self.dispatched_interims += 1
+
+    def close(self):
+        """스케줄러 종료 (대기 중인 중간 결과는 버림)"""
+        with self._cond:
+            self._closed = True
+            self._pending_interim = None
+            self._cond.notify_all()
+
+    def stats_summary(self):
+        return (f"중간 결과 수신 {self.received_interims}건, 번역 요청 {self.dispatched_interims}건 "
+                f"(병합/생략 {self.superseded_interims}건, 취소 {self.translation_pool.cancelled_interims}건), "
+                f"최종 결과 {self.dispatched_finals}건")
+
+
+class BatchTranslationCollector:
+    """
+    번역 요청을 모아 TranslatorService.translate_batch 한 번으로 보내는 micro-batching 수집기.
+    묶음은 max_batch_size개가 모이거나 첫 요청 후 max_delay_sec가 지나면 전송되며,
+    각 호출자는 submit()이 반환한 Future로 자신의 결과를 받습니다.
+    """
+    def __init__(self, translator, max_batch_size=TRANSLATION_BATCH_MAX_SIZE, max_delay_sec=TRANSLATION_BATCH_MAX_DELAY_SEC, max_concurrent=TRANSLATION_WORKERS, executor=None):
+        """executor: 여러 수집기가 함께 쓸 요청 스레드 풀 (없으면 max_concurrent 크기로 전용 풀 생성, 공유 풀은 close()에서 종료하지 않음)"""
+        self.translator = translator
+        self.max_batch_size = max_batch_size
+        self.max_delay_sec = max_delay_sec
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="TranslateBatch")
+        self._cond = threading.Condition()
+        self._pending = [] # (text, future, 접수 시각)
+        self._closed = False
+        # 통계
+        self.batches_sent = 0
+        self.texts_sent = 0
+        self._thread = threading.Thread(target=self._run, name="BatchCollectorThread", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """번역 요청 접수 (논블로킹). 결과를 담을 Future 반환"""
+        future = Future()
+        with self._cond:
+            if self._closed: raise RuntimeError("BatchTranslationCollector가 종료되었습니다.")
+            self._pending.append((text, future, time.monotonic()))
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                wait = self._pending[0][2] + self.max_delay_sec - time.monotonic()
+                if len(self._pending) < self.max_batch_size and wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                try: self.executor.submit(self._send, batch)
+                except RuntimeError: break # executor 종료됨
+
+    def _send(self, batch):
+        # 대기 중 취소된(대체된 중간 결과 등) 요청은 제외
+        live = [(text, future) for text, future, _ in batch if future.set_running_or_notify_cancel()]
+        if not live: return
+        try:
+            results = self.translator.translate_batch([text for text, _ in live])
+            for (_, future), translated in zip(live, results): future.set_result(translated)
+            self.batches_sent += 1
+            self.texts_sent += len(live)
+        except Exception as e:
+            print(f"묶음 번역 처리 오류: {e}")
+            traceback.print_exc()
+            for _, future in live: future.set_exception(e)
+
+    def close(self):
+        """수집기 종료. 아직 전송되지 않은 요청은 취소"""
+        with self._cond:
+            self._closed = True
+            pending, self._pending = self._pending, []
+            self._cond.notify_all()
+        for _, future, _ in pending: future.cancel()
+        if self._owns_executor: self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats_summary(self):
+        avg = (self.texts_sent / self.batches_sent) if self.batches_sent else 0.0
+        return f"번역 요청 {self.batches_sent}회, 문장 {self.texts_sent}건 (요청당 평균 {avg:.1f}건)"
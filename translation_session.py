@@ -0,0 +1,387 @@
+# translation_session.py
+import os
+import queue
+import threading
+import time
+import traceback
+from google.api_core.exceptions import OutOfRange
+from config import (VAD_ENABLED, SEND_CHUNK, RECOGNIZER_BACKEND, AUDIO_JOURNAL_ENABLED, AUDIO_JOURNAL_DIR,
+                    AUDIO_JOURNAL_RECOVERY_OVERLAP_SEC, AUDIO_JOURNAL_MAX_REPLAY_SEC, AUDIO_JOURNAL_MAX_RECOVERIES)
+from audio_recorder import AudioRecorder
+from speech_recognizer import SpeechRecognizer
+from replay_recognizer import ReplayRecognizer
+from translator_service import TranslatorService
+from translation_worker import TranslationWorkerPool
+from translation_scheduler import InterimCoalescer, BatchTranslationCollector
+from incremental_translator import StablePrefixTracker, extract_interim
+from vad import VoiceActivityGate
+from latency_metrics import LatencyTracker
+from audio_journal import AudioJournal, BYTES_PER_SECOND, journal_dir_name
+
+def parse_recognition(response):
+    """인식 응답에서 (transcript, 안정 접두부 길이, is_final) 추출. 결과가 없으면 None"""
+    if not response.results: return None
+    result = response.results[0]
+    if not result.alternatives: return None
+    if result.is_final:
+        transcript = result.alternatives[0].transcript.strip()
+        return transcript, len(transcript), True
+    # 중간 결과는 안정도가 다른 여러 result로 나뉘어 올 수 있으므로 합쳐서 사용
+    transcript, stable_length = extract_interim(response)
+    return transcript, stable_length, False
+
+
+class TranslationLane:
+    """
+    번역 언어 하나에 대한 번역 단계 (번역기, 증분 분할, 중간 결과 병합 스케줄러, 워커 풀).
+    인식 결과 하나가 언어 수만큼의 lane으로 퍼져 나가며, lane마다 독립적으로 동시에 번역됩니다.
+    """
+    def __init__(self, source_lang, target_lang, translate_client, translation_cache, latency, publish, executor=None, guard=None):
+        self.target_lang = target_lang
+        self.translator = TranslatorService(source_lang, target_lang, cache=translation_cache,
+                                            client=translate_client, latency=latency, guard=guard)
+        self.prefix_tracker = StablePrefixTracker(target_lang, cached=translation_cache is not None)
+        self.translation_pool = TranslationWorkerPool(
+            self.translator.translate_text,
+            lambda transcript, translated, is_final: publish(transcript, translated, is_final, target_lang),
+            batcher=BatchTranslationCollector(self.translator, executor=executor),
+            join_segments=self.prefix_tracker.join,
+            latency=latency,
+            on_dispatch=self.prefix_tracker.note_dispatched
+        )
+        self.translation_scheduler = InterimCoalescer(self.translation_pool)
+
+    def submit(self, transcript, stable_length, is_final):
+        # 안정된 완결 문장은 이전 번역 재사용, 불안정한 꼬리만 새로 번역 (증분 번역)
+        segments = self.prefix_tracker.segment(transcript, stable_length, is_final)
+        # 번역은 스케줄러(중간 결과 병합) -> 워커 풀에서 비동기로 처리
+        self.translation_scheduler.submit(transcript, is_final, segments)
+
+    def pending_count(self):
+        return self.translation_pool.pending_count()
+
+    @property
+    def dropped_interims(self):
+        return self.translation_pool.dropped_interims
+
+    def print_stats(self):
+        print(f"[{self.target_lang}] 번역 스케줄러 통계: {self.translation_scheduler.stats_summary()}")
+        print(f"[{self.target_lang}] 증분 번역 통계: {self.prefix_tracker.stats_summary()}")
+        if self.translation_pool.batcher: print(f"[{self.target_lang}] 묶음 번역 통계: {self.translation_pool.batcher.stats_summary()}")
+        if self.translator.fallbacks: print(f"[{self.target_lang}] 번역 실패로 대체 텍스트 표시 {self.translator.fallbacks}건")
+
+    def shutdown(self):
+        self.translation_scheduler.close()
+        self.translation_pool.shutdown(wait=False)
+
+
+def _close_generator(generator, timeout=1.0):
+    """다른 스레드(gRPC 요청 스레드)에서 실행 중일 수 있는 제너레이터 닫기 (실행 중이면 끝날 때까지 재시도)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            generator.close()
+            return
+        except ValueError: # generator already executing
+            if time.monotonic() >= deadline: return
+            time.sleep(0.01)
+
+
+class TranslationSession:
+    """
+    UI와 무관한 인식 -> 번역 파이프라인 한 세션 (오디오 입력 1개, 입력 언어 1개, 번역 언어 1개 이상).
+    인식 스트림 하나의 결과를 번역 언어별 TranslationLane으로 나눠 보내므로 언어를 늘려도 인식 비용은 그대로입니다.
+    녹음 스레드와 인식 처리 스레드를 돌리고, 번역 결과는 언어별로 발생 순서대로 on_result(original, translated, is_final, target_lang)로,
+    세션을 중단시키는 오류는 on_error(kind, message)로 알립니다 (kind: "record", "out_of_range", "process").
+    콜백은 작업 스레드에서 호출되므로 UI 갱신은 호출 측에서 메인 스레드로 넘겨야 합니다.
+    """
+    def __init__(self, source_lang, target_langs, client_pool, on_result, on_error=None, translation_cache=None,
+                 audio_recorder=None, audio_source=None, device_index=None, latency=None, name="세션", translate_executor=None):
+        """
+        target_langs: 번역 언어 (표시 이름 하나 또는 목록)
+        client_pool: 여러 세션이 공유하는 ClientPool
+        audio_recorder: 오디오 버퍼를 가진 AudioRecorder (없으면 새로 생성)
+        audio_source: 장치 대신 사용할 입력 (WavAudioSource 등). 없으면 device_index 장치로 스트림을 엶
+        latency: 지연 시간 수집기 (없으면 세션 전용으로 생성)
+        translate_executor: 여러 세션/번역 언어가 공유할 번역 요청 스레드 풀 (없으면 번역 언어마다 전용 풀)
+        """
+        self.name = name
+        self.source_lang = source_lang
+        self.target_langs = [target_langs] if isinstance(target_langs, str) else list(dict.fromkeys(target_langs))
+        if not self.target_langs: raise ValueError("번역 언어가 하나 이상 필요합니다.")
+        self.client_pool = client_pool
+        self.on_result = on_result
+        self.on_error = on_error
+        self.translation_cache = translation_cache
+        self.audio_recorder = audio_recorder or AudioRecorder()
+        self.audio_source = audio_source
+        self.device_index = device_index
+        self.latency = latency or LatencyTracker()
+        self.translate_executor = translate_executor
+        # 무음 구간은 Speech API로 보내지 않는 VAD 게이트
+        self.vad_gate = VoiceActivityGate() if VAD_ENABLED else None
+        self.stop_event = threading.Event()
+        self.stop_event.set()
+        self.recognizer = None
+        self._speech_client = None # 이 세션이 빌려 쓰는 공유 Speech 클라이언트 (ClientPool)
+        self.journal = None # 오디오 저널 (인식 스트림 오류 시 재전송, 오프라인 재처리)
+        self._final_journal_pos = 0 # 마지막 최종 결과가 나왔을 때까지 보낸 오디오의 저널 위치
+        self._recoveries = 0 # 최종 결과 없이 연속으로 복구한 횟수
+        self.stream_recoveries = 0
+        self.lanes = [] # 번역 언어별 TranslationLane
+        self.record_thread = None
+        self.process_thread = None
+        self.started_at = None
+        self.results_published = 0
+        self._active = False # start() 이후 stop() 전까지 (오류로 stop_event가 먼저 설정돼도 정리는 stop()에서)
+
+    def start(self):
+        """인식기/번역기 생성, 오디오 입력 열기, 스레드 시작. 실패 시 예외 발생 (세션은 '중지' 상태 유지)"""
+        if self._active: raise RuntimeError(f"{self.name}: 이미 실행 중입니다.")
+        print(f"[{self.name}] Recognizer ({self.source_lang}) 및 Translator ({self.source_lang} -> {', '.join(self.target_langs)}) 초기화...")
+        translate_client = self.client_pool.get_translate_client()
+        self.lanes = [TranslationLane(self.source_lang, target_lang, translate_client, self.translation_cache, self.latency, self._publish,
+                                      executor=self.translate_executor, guard=self.client_pool.translate_guard)
+                      for target_lang in self.target_langs]
+
+        self.audio_recorder.audio_buffer.reset()
+        if self.vad_gate: self.vad_gate.reset()
+        self.latency.reset_utterance()
+        self._open_journal()
+        try:
+            # Speech 클라이언트를 빌리는 인식기는 마지막에 생성 (실패하면 아래에서 반납)
+            self.recognizer = self._create_recognizer()
+            if self.audio_source: print(f"[{self.name}] 오디오 장치 대신 {type(self.audio_source).__name__} 사용")
+            else: self.audio_recorder.open_stream(self.device_index)
+        except Exception:
+            self._close_journal()
+            self._shutdown_translation()
+            self._release_speech_client()
+            raise
+
+        self.stop_event.clear()
+        self._active = True
+        self.started_at = time.monotonic()
+        self.record_thread = threading.Thread(target=self.record_audio, name=f"AudioRecordThread-{self.name}", daemon=True)
+        self.process_thread = threading.Thread(target=self.process_stream, name=f"ProcessStreamThread-{self.name}", daemon=True)
+        self.record_thread.start()
+        self.process_thread.start()
+
+    def stop(self):
+        """스트림 닫기, 대기 중 번역 취소, 통계 출력"""
+        if not self._active: return
+        self._active = False
+        print(f"[{self.name}] 중지 요청...")
+        self.stop_event.set()
+        self.audio_recorder.stop()
+        print(self.audio_recorder.audio_buffer.stats_summary())
+        if self.vad_gate: print(self.vad_gate.stats_summary())
+        upload_summary = self.recognizer.stats_summary() if self.recognizer else None
+        if upload_summary: print(f"[{self.name}] {upload_summary}")
+        self.audio_recorder.audio_buffer.close()
+        self._close_journal()
+        for lane in self.lanes: lane.print_stats()
+        self._shutdown_translation()
+
+    def join(self, timeout=2.0):
+        """녹음/처리 스레드 종료 대기"""
+        for t in (self.record_thread, self.process_thread):
+            if t and t.is_alive():
+                t.join(timeout=timeout)
+                if t.is_alive(): print(f"  경고: {t.name} 스레드가 시간 내에 종료되지 않음.")
+
+    def is_running(self):
+        return not self.stop_event.is_set()
+
+    def is_busy(self):
+        """인식 스트림이 진행 중이거나 번역 대기 작업이 남아 있으면 True"""
+        return bool((self.process_thread and self.process_thread.is_alive()) or
+                    any(lane.pending_count() for lane in self.lanes))
+
+    def stats(self):
+        """세션 상태 스냅샷 (헤드리스 상태 보고/수용량 판단용)"""
+        buffer = self.audio_recorder.audio_buffer
+        return {
+            "name": self.name, "source": self.source_lang, "targets": self.target_langs,
+            "running": self.is_running(),
+            "uptime_sec": time.monotonic() - self.started_at if self.started_at else 0.0,
+            "results": self.results_published,
+            "buffer_fill": buffer.fill_level(), "buffer_overruns": buffer.overruns,
+            "translation_pending": sum(lane.pending_count() for lane in self.lanes),
+            "dropped_interims": sum(lane.dropped_interims for lane in self.lanes),
+            "translation_fallbacks": sum(lane.translator.fallbacks for lane in self.lanes),
+            "translate_guard": self.client_pool.translate_guard.report() if self.client_pool.translate_guard else None,
+            "upload": self.recognizer.upload_stats() if self.recognizer else None,
+            "stream_recoveries": self.stream_recoveries,
+            "latency": self.latency.report(),
+        }
+
+    def _shutdown_translation(self):
+        for lane in self.lanes: lane.shutdown()
+
+    def _create_recognizer(self):
+        """RECOGNIZER_BACKEND 설정에 맞는 인식 백엔드 생성"""
+        if RECOGNIZER_BACKEND == "replay": return ReplayRecognizer(self.source_lang)
+        previous = self._speech_client
+        self._speech_client = self.client_pool.acquire_speech_client()
+        if previous is not None: self.client_pool.release_speech_client(previous) # 복구로 새 인식기를 만들 때 이전 클라이언트 반납
+        return SpeechRecognizer(self.source_lang, client=self._speech_client)
+
+    def _release_speech_client(self):
+        """빌린 Speech 클라이언트 반납 (인식 스트림이 끝난 뒤)"""
+        client, self._speech_client = self._speech_client, None
+        if client is not None: self.client_pool.release_speech_client(client)
+
+    def _open_journal(self):
+        """AUDIO_JOURNAL_ENABLED면 세션(입력) 이름별 저널을 열어 오디오 버퍼에 연결 (실패해도 저널 없이 진행)"""
+        self._final_journal_pos = 0
+        self._recoveries = 0
+        if not AUDIO_JOURNAL_ENABLED: return
+        try: self.journal = AudioJournal(os.path.join(AUDIO_JOURNAL_DIR, journal_dir_name(self.name)))
+        except OSError as e:
+            print(f"[{self.name}] 오디오 저널 열기 실패, 저널 없이 진행: {e}")
+            self.journal = None
+            return
+        self.audio_recorder.audio_buffer.set_journal(self.journal)
+
+    def _close_journal(self):
+        if not self.journal: return
+        self.audio_recorder.audio_buffer.set_journal(None)
+        print(f"[{self.name}] {self.journal.stats_summary()}")
+        self.journal.close()
+        self.journal = None
+
+    def _note_final(self):
+        """최종 결과 수신: 복구 시 재전송 시작점 갱신, 연속 복구 횟수 초기화"""
+        journal_pos = self.audio_recorder.audio_buffer.last_journal_pos
+        if journal_pos is not None: self._final_journal_pos = journal_pos
+        self._recoveries = 0
+
+    def _recovery_replay(self):
+        """
+        인식 스트림 오류 후 새 스트림에 먼저 보낼 저널 오디오 (복구할 수 없으면 None).
+        마지막 최종 결과 시점보다 AUDIO_JOURNAL_RECOVERY_OVERLAP_SEC 앞부터 지금까지 캡처한 오디오이며,
+        아직 보내지 않은 버퍼 내용도 여기에 포함되므로 버퍼는 비웁니다. 겹치는 단어는 인식기의 이음매 중복 제거로 잘라냅니다.
+        """
+        if not self.journal or self._recoveries >= AUDIO_JOURNAL_MAX_RECOVERIES: return None
+        self._recoveries += 1
+        self.stream_recoveries += 1
+        end_pos = self.audio_recorder.audio_buffer.clear()
+        start_pos = max(0, self._final_journal_pos - int(AUDIO_JOURNAL_RECOVERY_OVERLAP_SEC * BYTES_PER_SECOND),
+                        end_pos - int(AUDIO_JOURNAL_MAX_REPLAY_SEC * BYTES_PER_SECOND))
+        replay = self.journal.read(start_pos - start_pos % 2, end_pos)
+        print(f"[{self.name}] 인식 스트림 복구 #{self._recoveries}: 저널 오디오 {len(replay) / BYTES_PER_SECOND:.1f}초를 새 스트림에 재전송")
+        return replay
+
+    def _resume_recognizer(self, previous):
+        """복구용 새 인식기 (새 클라이언트). 이전 인식기의 마지막 최종 결과를 이어받아 재전송 구간의 중복 단어를 제거"""
+        recognizer = self._create_recognizer()
+        recognizer.continue_from(previous)
+        return recognizer
+
+    def _fail(self, kind, message):
+        """세션을 중단시키는 오류: 중지 상태로 바꾸고 호출 측에 알림"""
+        self.stop_event.set()
+        if self.on_error: self.on_error(kind, message)
+
+    def record_audio(self):
+        """오디오 녹음 스레드"""
+        print(f"[{self.name}] record_audio 스레드 시작")
+        try:
+            if self.audio_source:
+                # 장치 대신 WAV 파일 등을 실시간 속도로 버퍼에 공급
+                self.audio_source.play(self.audio_recorder.audio_buffer, self.stop_event, self.audio_recorder.frames_per_buffer)
+            else:
+                self.audio_recorder.record(self.stop_event)
+        except Exception as e:
+            if not self.stop_event.is_set(): # 종료 중이 아닐 때만 오류 처리
+                print(f"[{self.name}] record_audio 스레드 오류: {e}")
+                traceback.print_exc()
+                self._fail("record", str(e))
+        finally:
+            print(f"[{self.name}] record_audio 스레드 종료 (stop_event: {self.stop_event.is_set()})")
+
+    def _audio_generator(self, replay=None):
+        """오디오 버퍼에서 데이터를 읽어 스트리밍 API로 보낼 제너레이터 (replay: 먼저 보낼 저널 오디오)"""
+        buffer = self.audio_recorder.audio_buffer
+        max_bytes = SEND_CHUNK * self.audio_recorder.bytes_per_frame
+        for offset in range(0, len(replay or b""), max_bytes):
+            chunk = replay[offset:offset + max_bytes]
+            if self.vad_gate: yield from self.vad_gate.process(chunk)
+            else: yield chunk
+        while not self.stop_event.is_set():
+            try:
+                # 캡처 프레임을 SEND_CHUNK 단위로 모아서 전송 (0.1초 안에 덜 모이면 모인 만큼)
+                chunk = buffer.get_many(max_bytes, timeout=0.1)
+                if chunk is None:
+                    print(f"[{self.name}] _audio_generator: 오디오 버퍼 닫힘, 종료.")
+                    break
+                capture_ts = buffer.last_capture_ts
+                if self.vad_gate:
+                    # 무음 청크는 건너뛰고, 음성 시작 시에는 pre-roll 청크까지 함께 전송
+                    voiced_chunks = self.vad_gate.process(chunk)
+                    if voiced_chunks: self.latency.note_audio_sent(capture_ts, self.vad_gate.last_chunk_voiced)
+                    for voiced_chunk in voiced_chunks: yield voiced_chunk
+                else:
+                    self.latency.note_audio_sent(capture_ts)
+                    yield chunk
+            except queue.Empty:
+                continue
+            except Exception as e:
+                 print(f"[{self.name}] _audio_generator 오류: {e}")
+                 traceback.print_exc()
+                 break
+        yield None # 스트림 종료 알림
+
+    def process_stream(self):
+        """오디오 스트림 처리: 인식 -> 번역 언어별 lane으로 분배. 인식 스트림 오류 시 저널 오디오를 재전송하는 새 스트림으로 복구"""
+        print(f"[{self.name}] process_stream 스레드 시작")
+        replay = None
+        try:
+            while True:
+                audio = self._audio_generator(replay)
+                try:
+                    # 스트리밍 제한 시간 전에 새 세션으로 자동 전환 (무중단)
+                    responses = self.recognizer.stream_responses(audio, self.stop_event)
+                    for response in responses:
+                        if self.stop_event.is_set(): break
+
+                        parsed = parse_recognition(response)
+                        if parsed is None: continue
+                        transcript, stable_length, is_final = parsed
+
+                        self.latency.note_result(is_final)
+                        if is_final: self._note_final()
+                        if transcript:
+                            # 인식 결과 하나를 모든 번역 언어로 동시에 번역 (인식 루프는 번역을 기다리지 않음)
+                            for lane in self.lanes: lane.submit(transcript, stable_length, is_final)
+
+                    if not self.stop_event.is_set():
+                        print(f"[{self.name}] Streaming API 응답 처리 루프 정상 종료.")
+                    return
+                except OutOfRange as e:
+                    print(f"[{self.name}] process_stream: Google API 스트리밍 세션 종료됨 (OutOfRange): {e}")
+                    kind, message = "out_of_range", str(e)
+                except Exception as e:
+                    if self.stop_event.is_set(): return
+                    print(f"[{self.name}] process_stream 스레드에서 예외 발생: {e}")
+                    traceback.print_exc()
+                    # 채널 문제일 수 있으므로 새 Speech 클라이언트 사용 (다른 세션이 이미 교체했으면 그 클라이언트 사용)
+                    self.client_pool.reconnect_speech(self._speech_client)
+                    kind, message = "process", str(e)
+                if self.stop_event.is_set(): return
+                _close_generator(audio) # 이전 스트림이 버퍼를 더 읽지 않도록 (재전송 구간과 겹치지 않게)
+                replay = self._recovery_replay()
+                if replay is None:
+                    self._fail(kind, message)
+                    return
+                self.recognizer = self._resume_recognizer(self.recognizer)
+        finally:
+            self._release_speech_client()
+            print(f"[{self.name}] process_stream 스레드 종료 (stop_event: {self.stop_event.is_set()})")
+
+    def _publish(self, transcript, translated_text, is_final, target_lang):
+        """lane의 워커 풀이 언어별로 순서대로 호출하는 결과 게시 콜백"""
+        if self.stop_event.is_set(): return
+        self.results_published += 1
+        self.on_result(transcript, translated_text, is_final, target_lang)
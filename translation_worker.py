@@ -0,0 +1,158 @@
+# translation_worker.py
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import TRANSLATION_WORKERS, TRANSLATION_MAX_PENDING
+
+class ResultReorderer:
+    """
+    순번(seq) 순서대로 번역 결과를 내보내는 재정렬기.
+    워커들이 완료 순서와 관계없이 push 하더라도 publish는 항상 제출 순서대로 호출됩니다.
+    """
+    def __init__(self, publish):
+        self.publish = publish
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._pending = {}
+
+    def push(self, seq, item):
+        """seq 번 작업의 결과 등록. item이 None이면 해당 순번은 건너뜀(취소/드롭)"""
+        with self._lock:
+            self._pending[seq] = item
+            # 순서가 맞는 결과만 연속해서 내보냄 (lock 안에서 호출하여 스레드 간 순서 보장)
+            while self._next_seq in self._pending:
+                ready = self._pending.pop(self._next_seq)
+                self._next_seq += 1
+                if ready is None: continue
+                try: self.publish(*ready)
+                except Exception as e:
+                    print(f"ResultReorderer publish 오류: {e}")
+                    traceback.print_exc()
+
+
+def gather_futures(futures, combine):
+    """
+    여러 Future를 하나로 묶음. 모두 완료되면 combine(결과 목록)으로 완료되며,
+    묶은 Future가 취소되면 아직 시작되지 않은 하위 Future도 취소합니다.
+    """
+    combined = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def _child_done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] > 0: return
+        if combined.done(): return
+        if any(f.cancelled() for f in futures):
+            combined.cancel()
+            return
+        if not combined.set_running_or_notify_cancel(): return
+        try: combined.set_result(combine([f.result() for f in futures]))
+        except Exception as e: combined.set_exception(e)
+
+    def _combined_done(f):
+        if f.cancelled():
+            for child in futures: child.cancel()
+
+    combined.add_done_callback(_combined_done)
+    for f in futures: f.add_done_callback(_child_done)
+    return combined
+
+
+class TranslationWorkerPool:
+    """
+    인식 루프와 분리된 번역 단계.
+    submit()은 절대 블로킹하지 않으며, 결과는 ResultReorderer를 거쳐 순서대로 publish 됩니다.
+    """
+    def __init__(self, translate_func, publish, max_workers=TRANSLATION_WORKERS, max_pending=TRANSLATION_MAX_PENDING, batcher=None, join_segments=" ".join, latency=None, on_dispatch=None):
+        """
+        translate_func: (text) -> 번역된 문자열
+        publish: (original, translated, is_final) 콜백
+        batcher: 선택적 BatchTranslationCollector. 지정하면 작업을 묶음 요청으로 보냄 (translate_func 대신 사용)
+        join_segments: 여러 segment로 나눠 번역한 결과를 하나로 합치는 함수
+        latency: 선택적 LatencyTracker (제출~완료 시간 기록)
+        on_dispatch: 선택적 (transcript, segments, is_final) 콜백. 작업이 접수되면 호출 (버린 중간 결과는 호출 안 함)
+        """
+        self.latency = latency
+        self.on_dispatch = on_dispatch
+        self.translate_func = translate_func
+        self.join_segments = join_segments
+        self.max_pending = max_pending
+        self.batcher = batcher
+        self.executor = None if batcher else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="TranslateWorker")
+        self.reorderer = ResultReorderer(publish)
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._pending_count = 0
+        self._queued_interims = [] # 아직 시작되지 않았을 수 있는 중간 결과 작업 future
+        self.dropped_interims = 0
+        self.cancelled_interims = 0
+
+    def submit(self, transcript, is_final, segments=None):
+        """
+        번역 작업 제출 (논블로킹).
+        segments: 선택적 번역 단위 목록 (증분 번역). 각각 번역한 뒤 join_segments로 합쳐 게시.
+        대기 작업이 max_pending 이상이면 중간 결과는 버리고 False 반환. 최종 결과는 항상 접수.
+        새 작업이 들어오면 아직 시작되지 않은 이전 중간 결과 작업은 취소 (latest-wins).
+        """
+        self._cancel_queued_interims()
+        with self._lock:
+            if not is_final and self._pending_count >= self.max_pending:
+                self.dropped_interims += 1
+                return False
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending_count += 1
+        try:
+            if segments and len(segments) > 1:
+                future = gather_futures([self._submit_text(text) for text in segments], self.join_segments)
+            else:
+                future = self._submit_text(segments[0] if segments else transcript)
+        except RuntimeError as e: # shutdown 이후 제출
+            print(f"번역 작업 제출 실패 (풀 종료됨): {e}")
+            with self._lock: self._pending_count -= 1
+            self.reorderer.push(seq, None)
+            return False
+        if self.on_dispatch: self.on_dispatch(transcript, segments, is_final)
+        if not is_final:
+            with self._lock: self._queued_interims.append(future)
+        submitted_at = time.monotonic()
+        future.add_done_callback(lambda f: self._on_done(seq, transcript, is_final, f, submitted_at))
+        return True
+
+    def _submit_text(self, text):
+        if self.batcher: return self.batcher.submit(text)
+        return self.executor.submit(self.translate_func, text)
+
+    def _on_done(self, seq, transcript, is_final, future, submitted_at):
+        with self._lock: self._pending_count -= 1
+        if future.cancelled():
+            self.reorderer.push(seq, None)
+            return
+        if self.latency: self.latency.record_since("translate", submitted_at)
+        try:
+            translated_text = future.result()
+            if translated_text is None: translated_text = "[번역 실패]"
+        except Exception as e:
+            print(f"  [오류] 번역 중 오류 발생 (텍스트: '{transcript}'): {e}")
+            traceback.print_exception(e)
+            translated_text = "[번역 오류]"
+        self.reorderer.push(seq, (transcript, translated_text, is_final))
+
+    def _cancel_queued_interims(self):
+        """새 결과에 의해 무의미해진, 아직 실행 전인 중간 결과 작업 취소"""
+        with self._lock:
+            queued, self._queued_interims = self._queued_interims, []
+        for future in queued:
+            if future.cancel(): # 실행 중이거나 완료된 작업은 취소되지 않음 (취소 시 _on_done에서 순번 건너뜀)
+                with self._lock: self.cancelled_interims += 1
+
+    def pending_count(self):
+        with self._lock: return self._pending_count
+
+    def shutdown(self, wait=False):
+        """풀 종료. 아직 시작되지 않은 작업은 취소"""
+        if self.batcher: self.batcher.close()
+        else: self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,17 +1,45 @@
 # translator_service.py
 from google.cloud import translate_v2 as translate
-from config import TRANSLATE_CODES
+from config import TRANSLATE_CODES, TRANSLATE_FALLBACK
+from translate_guard import TranslateRejectedError
 import traceback # 추가 (오류 로깅 강화)
 import html      # <<< 추가: 만약을 위한 HTML 언이스케이프
+import time
+
+# 보호 장치가 던지는 예상된 실패 (추적 출력 생략)
+_GUARD_ERRORS = (TimeoutError, TranslateRejectedError)
 
 class TranslatorService:
-    def __init__(self, source_language, target_language):
+    def __init__(self, source_language, target_language, cache=None, client=None, latency=None, guard=None):
         """
         source_language, target_language: UI에서 선택한 언어 (예: "영어 (미국)", "한국어")
+        cache: 선택적 TranslationCache (동일 텍스트 재요청 시 API 호출 생략)
+        client: 재사용할 translate_v2.Client (ClientPool). 없으면 새로 생성
+        latency: 선택적 LatencyTracker (API 왕복 시간 기록)
+        guard: 선택적 TranslateRequestGuard (ClientPool 공유). 있으면 API 호출에 기한/재시도/헤지/회로 차단기 적용
         """
-        self.client = translate.Client()
+        self.client = client or translate.Client()
         self.source_language = source_language
         self.target_language = target_language
+        self.cache = cache
+        self.latency = latency
+        self.guard = guard
+        self.fallbacks = 0 # 번역 대신 대체 텍스트를 돌려준 문장 수
+
+    def _request(self, values, source_lang_code, target_lang_code):
+        """번역 API 호출 (guard가 있으면 보호해서 호출)"""
+        kwargs = dict(
+            target_language=target_lang_code,
+            source_language=source_lang_code, # 명시적으로 지정
+            format_='text'  # <<<--- 이 파라미터를 추가하여 결과 형식을 텍스트로 지정
+        )
+        if self.guard: return self.guard.call(self.client.translate, values, **kwargs)
+        return self.client.translate(values, **kwargs)
+
+    def _fallback(self, text):
+        """번역 실패 시 표시할 텍스트 (TRANSLATE_FALLBACK이 "original"이면 원문)"""
+        self.fallbacks += 1
+        return text if TRANSLATE_FALLBACK == "original" else "[번역 오류]"
 
     def translate_text(self, text):
         """텍스트를 번역하여 번역된 문자열 반환"""
@@ -26,15 +54,17 @@ class TranslatorService:
                 print(f"오류: 지원하지 않는 언어 코드 - 소스: {self.source_language}, 타겟: {self.target_language}")
                 return f"[번역 오류: 언어 코드 확인 필요]"
 
+            if self.cache is not None:
+                cached = self.cache.get(source_lang_code, target_lang_code, text)
+                if cached is not None: return cached
+
             # print(f"번역 요청: '{text}' ({source_lang_code} -> {target_lang_code})") # 디버깅용
-            translation = self.client.translate(
-                text,
-                target_language=target_lang_code,
-                source_language=source_lang_code, # 명시적으로 지정
-                format_='text'  # <<<--- 이 파라미터를 추가하여 결과 형식을 텍스트로 지정
-            )
+            request_start = time.monotonic()
+            translation = self._request(text, source_lang_code, target_lang_code)
+            if self.latency: self.latency.record_since("translate_api", request_start)
             translated = translation['translatedText']
             # print(f"번역 결과 (API): '{translated}'") # 디버깅용
+            if self.cache is not None: self.cache.put(source_lang_code, target_lang_code, text, translated)
 
             # 만약 format_='text'로도 해결되지 않는 특수한 HTML 엔티티가 있다면
             # html.unescape를 사용하여 추가로 디코딩할 수 있습니다.
@@ -48,5 +78,45 @@ class TranslatorService:
 
         except Exception as e:
             print(f"번역 API 오류 (텍스트: '{text}'): {e}")
-            traceback.print_exc() # 상세 오류 출력
-            return "[번역 오류]"
\ No newline at end of file
+            if not isinstance(e, _GUARD_ERRORS): traceback.print_exc() # 상세 오류 출력
+            return self._fallback(text)
+
+    def translate_batch(self, texts):
+        """
+        여러 텍스트를 한 번의 API 요청으로 번역하여 입력 순서대로 리스트 반환.
+        빈 텍스트는 "", 캐시 적중 텍스트는 요청에서 제외하며 중복 텍스트는 한 번만 요청합니다.
+        """
+        results = [""] * len(texts)
+        source_lang_code = TRANSLATE_CODES.get(self.source_language)
+        target_lang_code = TRANSLATE_CODES.get(self.target_language)
+        if not source_lang_code or not target_lang_code:
+            print(f"오류: 지원하지 않는 언어 코드 - 소스: {self.source_language}, 타겟: {self.target_language}")
+            return [("[번역 오류: 언어 코드 확인 필요]" if text and text.strip() else "") for text in texts]
+
+        to_request = {} # text -> 결과를 채울 인덱스 목록
+        for i, text in enumerate(texts):
+            if not text or not text.strip(): continue
+            if self.cache is not None:
+                cached = self.cache.get(source_lang_code, target_lang_code, text)
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            to_request.setdefault(text, []).append(i)
+        if not to_request: return results
+
+        request_texts = list(to_request.keys())
+        try:
+            request_start = time.monotonic()
+            translations = self._request(request_texts, source_lang_code, target_lang_code)
+            if self.latency: self.latency.record_since("translate_api", request_start)
+            for text, translation in zip(request_texts, translations):
+                translated = translation['translatedText']
+                if self.cache is not None: self.cache.put(source_lang_code, target_lang_code, text, translated)
+                for i in to_request[text]: results[i] = translated
+        except Exception as e:
+            print(f"묶음 번역 API 오류 ({len(request_texts)}건): {e}")
+            if not isinstance(e, _GUARD_ERRORS): traceback.print_exc()
+            for text, indices in to_request.items():
+                fallback = self._fallback(text)
+                for i in indices: results[i] = fallback
+        return results
@@ -1,7 +1,9 @@
 # ui.py
 import tkinter as tk
 from tkinter import scrolledtext, ttk, messagebox, font as tkFont
-from config import LANGUAGES
+from config import (LANGUAGES, RECOGNIZER_BACKEND, EXTRA_TARGET_LANGUAGES, MAX_INPUT_PIPELINES, TRANSCRIPT_MAX_LINES, TRANSCRIPT_TRIM_BATCH_LINES,
+                    SUBTITLE_RESIZE_REFRESH_HZ)
+from subtitle_layout import SubtitleLayout
 import traceback
 import os
 import platform
@@ -27,7 +29,16 @@ class FloatingWindow(tk.Toplevel):
         self.initial_font_size = 18
         self.min_font_size = 8
         self.base_font_ratio = self.initial_font_size / self.initial_height if self.initial_height > 0 else 0.18
-        self.label_font = tkFont.Font(family="Arial", size=self.initial_font_size, weight="bold")
+        # 줄바꿈/마지막 N줄 선택은 SubtitleLayout이 글꼴 크기별 측정값 캐시로 직접 계산 (레이블은 결과만 표시)
+        self.layout = SubtitleLayout(lambda size: tkFont.Font(root=self, family="Arial", size=size, weight="bold"))
+        self.font_size = self.initial_font_size
+        self.label_font = self.layout.font(self.font_size)
+        self._size = (self.initial_width, self.initial_height) # 마지막으로 알려진 창 크기 (winfo 조회 없이 배치 계산)
+        self._label_pady = 5
+        self._text = ""
+        self._shown_text = None
+        self._relayout_pending = False
+        self._relayout_interval_ms = max(1, int(1000 / SUBTITLE_RESIZE_REFRESH_HZ))
 
         # --- Widgets ---
         self.content_frame = tk.Frame(self, bg=self.cget('bg'))
@@ -81,6 +92,7 @@ class FloatingWindow(tk.Toplevel):
         self.translated_label_float.bind("<ButtonPress-1>", self.on_press)
         self.translated_label_float.bind("<ButtonRelease-1>", self.on_release)
         self.translated_label_float.bind("<B1-Motion>", self.on_drag_motion)
+        self.bind("<Configure>", self.on_configure)
 
         self.withdraw()
         self.update_font_and_wraplength()
@@ -141,7 +153,7 @@ class FloatingWindow(tk.Toplevel):
         if self.resizing and self.resize_handle:
             current_x_root = event.x_root; current_y_root = event.y_root
             delta_x = current_x_root - self._resize_origin_x; delta_y = current_y_root - self._resize_origin_y
-            current_w = self.winfo_width(); current_h = self.winfo_height()
+            current_w, current_h = self._size
             current_x = self.winfo_x(); current_y = self.winfo_y()
             new_w, new_h = current_w, current_h; new_x, new_y = current_x, current_y
 
@@ -155,7 +167,8 @@ class FloatingWindow(tk.Toplevel):
                 if new_h > self.min_height: new_y = current_y + delta_y
 
             self.geometry(f"{new_w}x{new_h}+{new_x}+{new_y}")
-            self.update_font_and_wraplength()
+            self._size = (new_w, new_h)
+            self._schedule_relayout() # 글꼴/줄바꿈 재계산은 화면 주사율 수준으로만
             self._resize_origin_x = current_x_root; self._resize_origin_y = current_y_root
         elif self.dragging:
             x = self.winfo_pointerx() - self._offset_x; y = self.winfo_pointery() - self._offset_y
@@ -167,34 +180,54 @@ class FloatingWindow(tk.Toplevel):
              handle = self.get_handle(event.x, event.y)
              if not handle: self.config(cursor=self.cursor_default)
 
-    # ... (update_font_and_wraplength, update_text, show, hide 메서드는 동일하게 유지) ...
+    def on_configure(self, event):
+        """창 크기 변경 알림: 크기만 기록하고 재배치는 묶어서 처리 (이동만 한 경우는 무시)"""
+        if event.widget is not self or (event.width, event.height) == self._size: return
+        self._size = (event.width, event.height)
+        self._schedule_relayout()
+
+    def _schedule_relayout(self):
+        if self._relayout_pending: return
+        self._relayout_pending = True
+        self.after(self._relayout_interval_ms, self._relayout)
+
+    def _relayout(self):
+        self._relayout_pending = False
+        if self.winfo_exists(): self.update_font_and_wraplength()
+
     def update_font_and_wraplength(self):
-        try: current_h = self.winfo_height(); current_w = self.winfo_width()
-        except tk.TclError: return
+        """창 크기에 맞춰 글꼴 크기와 여백을 정하고 다시 배치 (바뀐 설정만 위젯에 반영)"""
+        current_w, current_h = self._size
         if current_h <= 0 or current_w <= 0: return
 
         new_font_size = max(self.min_font_size, int(self.base_font_ratio * current_h))
-        self.label_font.config(size=new_font_size)
-
-        # Frame padding (5*2) + Label padding (15*2) = 40 total horizontal padding
-        new_wraplength = max(10, current_w - 40)
-        self.translated_label_float.config(wraplength=new_wraplength)
+        if new_font_size != self.font_size:
+            # 공유 글꼴을 재설정하지 않고 크기별로 캐시된 글꼴로 교체
+            self.font_size = new_font_size
+            self.label_font = self.layout.font(new_font_size)
+            self.translated_label_float.config(font=self.label_font)
 
         label_pady = max(5, int(current_h * 0.05))
-        self.translated_label_float.pack_configure(pady=label_pady)
+        if label_pady != self._label_pady:
+            self._label_pady = label_pady
+            self.translated_label_float.pack_configure(pady=label_pady)
+        self._render()
 
     def update_text(self, translated_text):
         if self.winfo_exists():
-            self.translated_label_float.config(text=translated_text)
-            self.translated_label_float.update_idletasks()
-            try:
-                req_h = self.translated_label_float.winfo_reqheight()
-                frame_h = self.content_frame.winfo_height()
-                label_pady = self.translated_label_float.pack_info().get('pady', 0) * 2
-                if req_h > (frame_h - label_pady): self.translated_label_float.config(anchor='sw')
-                else: self.translated_label_float.config(anchor='w')
-            except tk.TclError: pass
-            except Exception as e: print(f"Error checking label height: {e}")
+            self._text = translated_text
+            self._render()
+
+    def _render(self):
+        """현재 텍스트 중 창에 들어가는 마지막 줄들만 레이블에 표시 (내용이 같으면 위젯을 건드리지 않음)"""
+        current_w, current_h = self._size
+        # Frame padding (5*2) + Label padding (15*2) + 레이블 테두리/내부 여백 = 가로 44, 세로는 Frame(5*2) + 레이블 pady*2 + 4
+        lines, _ = self.layout.tail(self._text, self.font_size, max(10, current_w - 44), max(1, current_h - 14 - self._label_pady * 2))
+        shown_text = "\n".join(lines)
+        if shown_text == self._shown_text: return
+        self._shown_text = shown_text
+        try: self.translated_label_float.config(text=shown_text)
+        except tk.TclError: pass
 
     def show(self):
         if not self.winfo_exists(): return
@@ -219,6 +252,7 @@ class FloatingWindow(tk.Toplevel):
         if pos_y + win_h > screen_h: pos_y = screen_h - win_h
         pos_x = max(0, pos_x); pos_y = max(0, pos_y)
         self.geometry(f'+{pos_x}+{pos_y}')
+        self._size = (win_w, win_h)
         self.update_font_and_wraplength()
         self.deiconify()
         self.lift()
@@ -227,6 +261,70 @@ class FloatingWindow(tk.Toplevel):
         if self.winfo_exists(): self.withdraw()
 
 # --- RealtimeTranslatorUI class remains unchanged ---
+class TranscriptView:
+    """
+    자막 텍스트 위젯 하나의 뷰 모델.
+    위젯 내용을 다시 읽지 않고 줄 수와 입력별 중간 결과 줄 위치(mark)를 직접 관리하며 끝부분만 추가/교체하므로,
+    기록이 길어져도 결과 하나를 반영하는 비용이 일정합니다. 중간 결과 줄은 "interim" 태그로 흐리게 표시합니다.
+    """
+    INTERIM_TAG = "interim"
+
+    def __init__(self, widget, max_lines=TRANSCRIPT_MAX_LINES, trim_batch=TRANSCRIPT_TRIM_BATCH_LINES):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.trim_batch = trim_batch # 줄 수 제한을 넘으면 한 번에 지울 여분 줄 수
+        self.line_count = 0 # 위젯의 줄 수 (비어 있으면 0)
+        self._interim_keys = set() # 중간 결과 줄(mark)이 있는 입력 번호
+        widget.tag_configure(self.INTERIM_TAG, foreground="#777777")
+
+    @staticmethod
+    def _mark(key):
+        return f"interim_{key}" # 이 입력의 중간 결과 줄 시작 위치 (확정되면 제거)
+
+    def apply(self, texts):
+        """[(text, is_final, key)]를 순서대로 반영한 뒤 줄 수 제한과 스크롤은 한 번만 처리"""
+        widget = self.widget
+        widget.config(state='normal')
+        try:
+            for text, is_final, key in texts: self._set_line(text, is_final, key)
+            self._trim()
+            widget.see(tk.END)
+        finally:
+            widget.config(state='disabled')
+
+    def _set_line(self, text, is_final, key):
+        widget, mark = self.widget, self._mark(key)
+        text = text.replace('\n', ' ') # 결과 하나 = 한 줄 (줄 수 추적)
+        tags = () if is_final else (self.INTERIM_TAG,)
+        if key in self._interim_keys:
+            widget.delete(mark, f"{mark} lineend"); widget.insert(mark, text, tags)
+        elif text:
+            widget.insert('end-1c', ('\n' + text) if self.line_count else text, tags)
+            self.line_count += 1
+            widget.mark_set(mark, 'end-1c linestart'); widget.mark_gravity(mark, tk.LEFT)
+            self._interim_keys.add(key)
+        if is_final and key in self._interim_keys:
+            widget.mark_unset(mark); self._interim_keys.discard(key)
+
+    def _trim(self):
+        if self.line_count <= self.max_lines: return
+        count = min(self.line_count - self.max_lines + self.trim_batch, self.line_count - 1)
+        trim_end = f"{count + 1}.0"
+        for key in list(self._interim_keys): # 지워질 구간에 남은 오래된 중간 결과 줄은 추적 중단
+            if self.widget.compare(self._mark(key), '<', trim_end): self.widget.mark_unset(self._mark(key)); self._interim_keys.discard(key)
+        self.widget.delete('1.0', trim_end)
+        self.line_count -= count
+
+    def clear(self):
+        """내용과 중간 결과 줄 추적 초기화 (위젯 상태는 유지)"""
+        widget = self.widget
+        for key in self._interim_keys: widget.mark_unset(self._mark(key))
+        self._interim_keys.clear()
+        state = widget.cget('state')
+        widget.config(state='normal'); widget.delete('1.0', tk.END); widget.config(state=state)
+        self.line_count = 0
+
+
 class RealtimeTranslatorUI:
     # ... (No changes needed in this class) ...
     def __init__(self, root, start_callback, stop_callback, get_input_devices, update_labels_callback, default_device_name=None):
@@ -239,9 +337,14 @@ class RealtimeTranslatorUI:
         self.selected_device = tk.StringVar()
         self.selected_source_language = tk.StringVar(value="영어 (미국)")
         self.selected_target_language = tk.StringVar(value="한국어")
+        # 함께 번역할 추가 언어 (체크 메뉴)와 화면/자막 창에 표시할 번역 언어
+        self.extra_target_vars = {name: tk.BooleanVar(value=name in EXTRA_TARGET_LANGUAGES) for name in LANGUAGES}
+        self.selected_display_language = tk.StringVar(value="한국어")
+        self.display_language = "한국어" # 작업 스레드에서 읽는 표시 언어 (Tk 변수 대신 일반 문자열)
         self.languages = LANGUAGES
-        self.last_original_is_final = True
-        self.last_translated_is_final = True
+        # 추가 입력 (장치별 파이프라인): [{"frame", "label", "device", "source"}], 기본 입력의 표시 이름
+        self.primary_input_label = tk.StringVar(value="입력 1")
+        self.extra_inputs = []
         try:
             self.floating_window = FloatingWindow(self.root)
         except Exception as e:
@@ -260,6 +363,7 @@ class RealtimeTranslatorUI:
         device_frame = tk.Frame(main_frame, bg="#f0f0f0")
         device_frame.pack(fill=tk.X, pady=5)
         tk.Label(device_frame, text="오디오 입력 장치:", bg="#f0f0f0", font=("Arial", 12)).pack(side=tk.LEFT, padx=(0, 5))
+        self.primary_label_entry = tk.Entry(device_frame, textvariable=self.primary_input_label, width=8, font=("Arial", 11)); self.primary_label_entry.pack(side=tk.LEFT, padx=(0, 5))
         device_list = []
         try:
             available_devices = self.get_input_devices()
@@ -274,6 +378,11 @@ class RealtimeTranslatorUI:
             if self.default_device_name and self.default_device_name in device_list: self.device_combobox.set(self.default_device_name); print(f"기본 장치 '{self.default_device_name}' 선택됨.")
             else: self.device_combobox.current(0); print(f"기본 장치 못 찾음. 첫 번째 장치 '{device_list[0]}' 선택됨.")
         self.device_combobox.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.device_list = device_list
+        self.add_input_button = tk.Button(device_frame, text="+ 입력 추가", command=self.add_extra_input, font=("Arial", 10))
+        self.add_input_button.pack(side=tk.LEFT, padx=5)
+        # 추가 입력 행이 들어갈 영역 (장치마다 입력 언어/표시 이름을 따로 지정)
+        self.extra_inputs_frame = tk.Frame(main_frame, bg="#f0f0f0"); self.extra_inputs_frame.pack(fill=tk.X)
         # --- 컨트롤 영역 ---
         control_frame = tk.Frame(main_frame, bg="#f0f0f0")
         control_frame.pack(fill=tk.X, pady=5)
@@ -286,6 +395,14 @@ class RealtimeTranslatorUI:
         self.target_lang_combobox = ttk.Combobox(lang_frame, textvariable=self.selected_target_language, values=list(self.languages.keys()), state="readonly", width=15, font=("Arial", 11))
         self.target_lang_combobox.pack(side=tk.LEFT, padx=5)
         if "한국어" in self.languages: self.target_lang_combobox.set("한국어")
+        self.extra_target_button = tk.Menubutton(lang_frame, text="추가 번역 ▾", relief=tk.RAISED, font=("Arial", 10))
+        extra_menu = tk.Menu(self.extra_target_button, tearoff=0)
+        for name, var in self.extra_target_vars.items(): extra_menu.add_checkbutton(label=name, variable=var)
+        self.extra_target_button.config(menu=extra_menu); self.extra_target_button.pack(side=tk.LEFT, padx=5)
+        tk.Label(lang_frame, text="표시:", bg="#f0f0f0", font=("Arial", 12)).pack(side=tk.LEFT, padx=(10,5))
+        self.display_lang_combobox = ttk.Combobox(lang_frame, textvariable=self.selected_display_language, values=[self.selected_target_language.get()], state="readonly", width=12, font=("Arial", 11))
+        self.display_lang_combobox.pack(side=tk.LEFT, padx=5)
+        self.display_lang_combobox.bind('<<ComboboxSelected>>', self.on_display_language_selected)
         button_status_frame = tk.Frame(control_frame, bg="#f0f0f0"); button_status_frame.pack(side=tk.RIGHT, padx=5)
         self.toggle_float_button = tk.Button(button_status_frame, text="자막 창", command=self.toggle_floating_window, font=("Arial", 10), width=8)
         self.toggle_float_button.pack(side=tk.LEFT, padx=(0, 5))
@@ -299,11 +416,67 @@ class RealtimeTranslatorUI:
         self.original_text = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, height=10, font=("Arial", 12), state='disabled', relief=tk.SOLID, borderwidth=1); self.original_text.pack(fill=tk.BOTH, expand=True, pady=(2, 10))
         self.translated_label = tk.Label(text_frame, text=f"번역 ({self.selected_target_language.get()})", bg="#f0f0f0", font=("Arial", 12, "bold"), anchor="w"); self.translated_label.pack(fill=tk.X)
         self.translated_text = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, height=10, font=("Arial", 12), state='disabled', relief=tk.SOLID, borderwidth=1); self.translated_text.pack(fill=tk.BOTH, expand=True, pady=(2, 10))
+        self.original_view = TranscriptView(self.original_text); self.translated_view = TranscriptView(self.translated_text)
         # --- 파일 저장 정보 ---
         info_frame = tk.Frame(main_frame, bg="#f0f0f0"); info_frame.pack(fill=tk.X, pady=(5, 0))
         results_dir = os.path.abspath("results"); info_text = f"로그 저장 경로: {results_dir}"
         tk.Label(info_frame, text=info_text, bg="#f0f0f0", font=("Arial", 9), fg="gray", justify=tk.LEFT, anchor="w").pack(side=tk.LEFT)
 
+    def add_extra_input(self):
+        """추가 입력 행 생성: 표시 이름, 장치, 입력 언어 (녹음 시작 시 장치마다 별도 파이프라인 실행)"""
+        if len(self.extra_inputs) + 1 >= MAX_INPUT_PIPELINES: messagebox.showinfo("입력 추가", f"입력은 최대 {MAX_INPUT_PIPELINES}개까지 사용할 수 있습니다."); return
+        row = {"frame": tk.Frame(self.extra_inputs_frame, bg="#f0f0f0"), "label": tk.StringVar(value=f"입력 {len(self.extra_inputs) + 2}"),
+               "device": tk.StringVar(), "source": tk.StringVar(value=self.selected_source_language.get())}
+        row["frame"].pack(fill=tk.X, pady=2)
+        tk.Label(row["frame"], text="추가 입력:", bg="#f0f0f0", font=("Arial", 11)).pack(side=tk.LEFT, padx=(0, 5))
+        row["widgets"] = [
+            tk.Entry(row["frame"], textvariable=row["label"], width=8, font=("Arial", 11)),
+            ttk.Combobox(row["frame"], textvariable=row["device"], values=self.device_list, state="readonly", width=30, font=("Arial", 11)),
+            ttk.Combobox(row["frame"], textvariable=row["source"], values=list(self.languages.keys()), state="readonly", width=15, font=("Arial", 11)),
+            tk.Button(row["frame"], text="삭제", command=lambda: self.remove_extra_input(row), font=("Arial", 10)),
+        ]
+        for widget in row["widgets"]: widget.pack(side=tk.LEFT, padx=5)
+        self.extra_inputs.append(row)
+
+    def remove_extra_input(self, row):
+        if row in self.extra_inputs: self.extra_inputs.remove(row)
+        row["frame"].destroy()
+
+    def get_inputs(self):
+        """녹음할 입력 목록 [(표시 이름, 장치 이름, 입력 언어)]. 첫 항목이 기본 입력"""
+        inputs = [(self.primary_input_label.get().strip() or "입력 1", self.selected_device.get(), self.selected_source_language.get())]
+        for i, row in enumerate(self.extra_inputs):
+            inputs.append((row["label"].get().strip() or f"입력 {i + 2}", row["device"].get(), row["source"].get()))
+        return inputs
+
+    def _set_inputs_state(self, recording):
+        """녹음 중에는 입력 구성 변경 불가"""
+        self.add_input_button.config(state='disabled' if recording else 'normal')
+        self.primary_label_entry.config(state='disabled' if recording else 'normal')
+        for row in self.extra_inputs:
+            for widget in row["widgets"]: widget.config(state='disabled' if recording else ('readonly' if isinstance(widget, ttk.Combobox) else 'normal'))
+
+    def get_target_languages(self):
+        """번역할 언어 목록: 선택한 번역 언어 + 추가 번역 언어 (중복 제외, 첫 항목이 기본 언어)"""
+        primary = self.selected_target_language.get()
+        return [primary] + [name for name, var in self.extra_target_vars.items() if var.get() and name != primary]
+
+    def set_display_languages(self, languages):
+        """표시 언어 목록 갱신. 현재 표시 언어가 목록에 없으면 첫 언어로 변경"""
+        self.display_lang_combobox['values'] = languages
+        if self.display_language not in languages: self.selected_display_language.set(languages[0]); self.on_display_language_selected()
+
+    def on_display_language_selected(self, event=None):
+        """표시 언어 변경: 번역 창을 비우고 이후 결과부터 새 언어로 표시"""
+        language = self.selected_display_language.get()
+        if language == self.display_language: return
+        self.display_language = language
+        try:
+            self.translated_view.clear()
+            self.translated_label.config(text=f"번역 ({language})")
+            if self.floating_window and self.floating_window.winfo_exists(): self.floating_window.update_text("...")
+        except tk.TclError as e: print(f"표시 언어 변경 중 오류: {e}")
+
     def toggle_floating_window(self):
         if not self.floating_window: print("오류: 플로팅 윈도우 객체가 없습니다."); messagebox.showerror("오류", "자막 창 객체를 찾을 수 없습니다."); return
         try:
@@ -313,16 +486,15 @@ class RealtimeTranslatorUI:
 
     def toggle_recording(self):
         current_device = self.selected_device.get()
-        if not current_device or "오류" in current_device or "없음" in current_device: messagebox.showerror("오류", "유효한 오디오 입력 장치를 선택해주세요."); return
+        device_required = RECOGNIZER_BACKEND != "replay" # replay 백엔드는 WAV 파일을 입력으로 사용
+        if device_required and (not current_device or "오류" in current_device or "없음" in current_device): messagebox.showerror("오류", "유효한 오디오 입력 장치를 선택해주세요."); return
         if self.start_button['text'] == "번역 시작":
             if self.floating_window and self.floating_window.winfo_exists(): self.floating_window.update_text("..."); self.floating_window.show()
             else: print("경고: 플로팅 윈도우를 표시할 수 없습니다.")
-            self.last_original_is_final = True; self.last_translated_is_final = True
-            self.original_text.config(state='normal'); self.translated_text.config(state='normal')
-            self.original_text.delete('1.0', tk.END); self.translated_text.delete('1.0', tk.END)
+            self.original_view.clear(); self.translated_view.clear()
             if self.start_callback():
                 self.start_button.config(text="번역 중지", bg="#F44336"); self.status_label.config(text="번역 중...", fg="blue")
-                self.device_combobox.config(state='disabled'); self.source_lang_combobox.config(state='disabled'); self.target_lang_combobox.config(state='disabled')
+                self.device_combobox.config(state='disabled'); self.source_lang_combobox.config(state='disabled'); self.target_lang_combobox.config(state='disabled'); self.extra_target_button.config(state='disabled'); self._set_inputs_state(True)
             else:
                 self.original_text.config(state='disabled'); self.translated_text.config(state='disabled')
                 if self.floating_window and self.floating_window.winfo_exists(): self.floating_window.hide()
@@ -330,37 +502,27 @@ class RealtimeTranslatorUI:
             self.stop_callback()
             self.start_button.config(text="번역 시작", bg="#4CAF50"); self.status_label.config(text="대기 중", fg="gray")
             current_device = self.selected_device.get(); device_state = "readonly" if current_device and "오류" not in current_device and "없음" not in current_device else "disabled"
-            self.device_combobox.config(state=device_state); self.source_lang_combobox.config(state='readonly'); self.target_lang_combobox.config(state='readonly')
+            self.device_combobox.config(state=device_state); self.source_lang_combobox.config(state='readonly'); self.target_lang_combobox.config(state='readonly'); self.extra_target_button.config(state='normal'); self._set_inputs_state(False)
             self.original_text.config(state='disabled'); self.translated_text.config(state='disabled')
             if self.floating_window and self.floating_window.winfo_exists(): self.floating_window.hide()
 
-    def update_labels(self, original, translated, is_final):
-        if not self.root or not self.root.winfo_exists(): return
+    def update_labels(self, original, translated, is_final, key=0):
+        """결과 하나 반영 (apply_updates 참고)"""
+        self.apply_updates([(original, translated, is_final, key)])
+
+    def apply_updates(self, updates):
+        """
+        한 프레임에 모인 결과 [(original, translated, is_final, key)]를 순서대로 반영 (UiUpdateDispatcher가 호출).
+        key: 입력(파이프라인) 번호. 입력마다 확정 전 중간 결과 줄을 따로 두어 여러 입력의 결과가 섞여도 제자리에서 갱신.
+        각 텍스트 영역은 TranscriptView가 끝부분만 갱신하고, 스크롤, 줄 수 제한, 자막 창 갱신은 프레임마다 한 번만 수행합니다.
+        """
+        if not updates or not self.root or not self.root.winfo_exists(): return
         try:
-            def _update_main_widget(widget, text, last_is_final_flag):
-                widget.config(state='normal')
-                try: last_line_num = int(widget.index('end-1c').split('.')[0])
-                except: last_line_num = 1
-                last_line_start_index = f"{last_line_num}.0"
-                if last_is_final_flag: prefix = '\n' if widget.get('1.0', 'end-1c').strip() and text else ''; widget.insert(tk.END, prefix + text)
-                else:
-                    if widget.compare("1.0", "!=", tk.END):
-                        try: last_line_end = f"{last_line_start_index} lineend"; widget.delete(last_line_start_index, last_line_end); widget.insert(last_line_start_index, text)
-                        except tk.TclError as e: print(f"TclError: {e}"); prefix = '\n' if widget.get('1.0', 'end-1c').strip() else ''; widget.insert(tk.END, prefix + text)
-                    else: widget.insert(tk.END, text)
-                widget.see(tk.END)
-                MAX_LINES=500; DELETE_BATCH_SIZE=50
-                try:
-                    count_str = widget.index('end-1c').split('.')[0]
-                    if count_str: count=int(count_str);
-                    if count > MAX_LINES: del_end=f"{count - MAX_LINES + DELETE_BATCH_SIZE}.0"; widget.delete("1.0", del_end)
-                except: pass
-                widget.config(state='disabled'); return is_final
-            original_was_final=self.last_original_is_final; translated_was_final=self.last_translated_is_final
-            self.last_original_is_final = _update_main_widget(self.original_text, original, original_was_final)
-            self.last_translated_is_final = _update_main_widget(self.translated_text, translated, translated_was_final)
-            if self.floating_window and self.floating_window.winfo_exists(): self.floating_window.update_text(translated)
-            self.original_label.config(text=f"원본 ({self.selected_source_language.get()})"); self.translated_label.config(text=f"번역 ({self.selected_target_language.get()})")
+            self.original_view.apply([(original, is_final, key) for original, _, is_final, key in updates])
+            self.translated_view.apply([(translated, is_final, key) for _, translated, is_final, key in updates])
+            # 자막 창은 프레임의 마지막 결과만 표시
+            if self.floating_window and self.floating_window.winfo_exists(): self.floating_window.update_text(updates[-1][1])
+            self.original_label.config(text=f"원본 ({self.selected_source_language.get()})"); self.translated_label.config(text=f"번역 ({self.display_language})")
         except tk.TclError as e:
             if "application has been destroyed" in str(e): pass
             else: print(f"UI TclError: {e}"); traceback.print_exc()
@@ -0,0 +1,90 @@
+# ui_dispatcher.py
+import threading
+import time
+import traceback
+from config import UI_FRAME_RATE_HZ
+
+class UiUpdateDispatcher:
+    """
+    자막 갱신을 프레임 단위로 모아 Tk 메인 스레드에 반영하는 디스패처.
+    post()는 어느 스레드에서나 호출할 수 있고, 한 프레임(1 / frame_rate 초) 동안 들어온 결과 중
+    입력(key)별 최신 중간 결과 하나와 모든 최종 결과만 render(updates) 한 번으로 넘깁니다.
+    중간 결과가 몰려도 화면 갱신은 프레임 수를 넘지 않아 메인 스레드가 응답성을 유지합니다.
+    """
+    def __init__(self, root, render, frame_rate=UI_FRAME_RATE_HZ, latency=None):
+        """
+        render: [(original, translated, is_final, key)] 목록을 받아 화면에 반영하는 함수 (메인 스레드에서 호출)
+        latency: 선택적 LatencyTracker (post부터 화면 반영까지 "render" 구간 기록)
+        """
+        self.root = root
+        self.render = render
+        self.frame_interval = 1.0 / frame_rate
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._finals = [] # (update, post 시각), 도착 순서대로
+        self._interims = {} # key -> (update, post 시각), 프레임마다 최신 것만 유지
+        self._frame_pending = False # 프레임 반영이 예약됨
+        self._after_id = None
+        self._last_frame = 0.0
+        self._closed = False
+        # 통계
+        self.frames = 0
+        self.posted = 0
+        self.coalesced_interims = 0
+
+    def post(self, original, translated, is_final, key=0):
+        """결과 등록 (논블로킹). 아직 예약된 프레임이 없으면 다음 프레임 시각에 반영 예약"""
+        now = time.monotonic()
+        with self._lock:
+            if self._closed: return
+            self.posted += 1
+            update = ((original, translated, is_final, key), now)
+            # 같은 입력의 대기 중인 중간 결과는 새 결과(중간/최종)로 대체
+            if self._interims.pop(key, None) is not None: self.coalesced_interims += 1
+            if is_final: self._finals.append(update)
+            else: self._interims[key] = update
+            if self._frame_pending: return
+            self._frame_pending = True
+            delay_ms = max(0, int((self._last_frame + self.frame_interval - now) * 1000))
+        # 작업 스레드의 after 호출은 메인 스레드를 거치므로 lock 밖에서 호출 (_flush와 교착 방지)
+        try: after_id = self.root.after(delay_ms, self._flush)
+        except Exception as e:
+            if not isinstance(e, RuntimeError): print(f"UI 프레임 예약 실패: {e}") # RuntimeError: 메인 루프 종료됨
+            with self._lock: self._frame_pending = False
+            return
+        with self._lock: self._after_id = after_id
+
+    def _flush(self):
+        """메인 스레드: 모인 결과를 한 번에 반영 (최종 결과 먼저, 그 뒤 입력별 최신 중간 결과)"""
+        with self._lock:
+            self._frame_pending = False
+            self._last_frame = time.monotonic()
+            pending = self._finals + list(self._interims.values())
+            self._finals, self._interims = [], {}
+        if not pending: return
+        self.frames += 1
+        try: self.render([update for update, _ in pending])
+        except Exception as e:
+            print(f"UI 프레임 반영 오류: {e}")
+            traceback.print_exc()
+        if self.latency:
+            for _, posted_at in pending: self.latency.record_since("render", posted_at)
+
+    def pending(self):
+        """반영 대기 중인 결과가 있으면 True"""
+        with self._lock: return bool(self._finals or self._interims)
+
+    def close(self):
+        """예약된 프레임 취소, 이후 post는 무시"""
+        with self._lock:
+            self._closed = True
+            after_id, self._after_id = self._after_id, None
+            self._finals, self._interims = [], {}
+        if after_id is not None:
+            try: self.root.after_cancel(after_id)
+            except Exception: pass
+
+    def stats_summary(self):
+        avg = self.posted / self.frames if self.frames else 0.0
+        return (f"UI 디스패처: 결과 {self.posted}건을 {self.frames}프레임으로 반영 (프레임당 평균 {avg:.1f}건, "
+                f"대체된 중간 결과 {self.coalesced_interims}건)")
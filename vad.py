@@ -0,0 +1,113 @@
+# vad.py
+from collections import deque
+import numpy as np
+from config import (RATE, CHANNELS, VAD_FRAME_MS, VAD_ENERGY_THRESHOLD_DB, VAD_NOISE_MARGIN_DB, VAD_NOISE_FLOOR_RISE_DB_PER_SEC,
+                    VAD_ZCR_THRESHOLD, VAD_HANGOVER_SEC, VAD_PREROLL_SEC, VAD_KEEPALIVE_SEC)
+
+class VoiceActivityGate:
+    """
+    AudioRecorder와 Speech 스트림 사이의 음성 활동 감지(VAD) 게이트.
+    청크를 VAD_FRAME_MS 프레임으로 나눠 에너지(dBFS)와 영교차율을 NumPy로 한 번에 계산하고,
+    무음 구간은 보내지 않습니다 (hangover / pre-roll 적용, 필요 시 keepalive 무음 프레임만 전송).
+    """
+    def __init__(self, rate=RATE, channels=CHANNELS, frame_ms=VAD_FRAME_MS,
+                 threshold_db=VAD_ENERGY_THRESHOLD_DB, noise_margin_db=VAD_NOISE_MARGIN_DB, zcr_threshold=VAD_ZCR_THRESHOLD,
+                 hangover_sec=VAD_HANGOVER_SEC, preroll_sec=VAD_PREROLL_SEC, keepalive_sec=VAD_KEEPALIVE_SEC,
+                 noise_rise_db_per_sec=VAD_NOISE_FLOOR_RISE_DB_PER_SEC):
+        self.rate = rate
+        self.channels = channels
+        self.frame_len = max(1, int(rate * frame_ms / 1000))
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.noise_rise_db_per_sec = noise_rise_db_per_sec
+        self.zcr_threshold = zcr_threshold
+        self.hangover_sec = hangover_sec
+        self.preroll_sec = preroll_sec
+        self.keepalive_sec = keepalive_sec
+        self.reset()
+
+    def reset(self):
+        self.noise_floor_db = self.threshold_db - self.noise_margin_db
+        self.in_speech = False
+        self.last_chunk_voiced = False # 마지막으로 처리한 청크에 음성이 있었는지
+        self._hangover_left = 0.0
+        self._preroll = deque()
+        self._preroll_sec = 0.0
+        self._since_keepalive = 0.0
+        # 통계 (오디오 시간 기준, 초)
+        self.total_sec = 0.0
+        self.suppressed_sec = 0.0
+        self.speech_segments = 0
+        self.keepalive_frames = 0
+
+    def _chunk_features(self, samples):
+        """프레임별 (에너지 dBFS, 영교차율) 배열 반환"""
+        if self.channels > 1: samples = samples.reshape(-1, self.channels).mean(axis=1)
+        n_frames = max(1, len(samples) // self.frame_len)
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, -1) if len(samples) >= self.frame_len else samples.reshape(1, -1)
+        frames = frames.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(frames * frames, axis=1) + 1e-12)
+        energy_db = 20.0 * np.log10(rms)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1) if frames.shape[1] > 1 else np.zeros(len(frames))
+        return energy_db, zcr
+
+    def is_speech(self, chunk):
+        """청크에 음성 프레임이 있는지 판단 (배경 소음 추정치도 함께 갱신)"""
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        if samples.size == 0: return False
+        energy_db, zcr = self._chunk_features(samples)
+        threshold = max(self.threshold_db, self.noise_floor_db + self.noise_margin_db)
+        speech_frames = (energy_db >= threshold) | ((energy_db >= threshold - 6.0) & (zcr >= self.zcr_threshold))
+        self._update_noise_floor(float(energy_db.min()), samples.size / (self.channels * self.rate))
+        return bool(speech_frames.any())
+
+    def _update_noise_floor(self, level_db, duration):
+        """
+        청크에서 가장 조용한 프레임 에너지로 배경 소음 추정 (음성 여부와 관계없이 매 청크):
+        내려갈 때는 빠르게, 올라갈 때는 noise_rise_db_per_sec 이하로 천천히 따라갑니다.
+        계속되는 소음은 추정치가 결국 그 수준까지 올라가 억제되고, 음성은 음절 사이 조용한 프레임 때문에 학습되지 않습니다.
+        """
+        if level_db < self.noise_floor_db: self.noise_floor_db += 0.5 * (level_db - self.noise_floor_db)
+        else: self.noise_floor_db = min(level_db, self.noise_floor_db + self.noise_rise_db_per_sec * duration)
+        # 고정 임계값보다 낮은 추정치는 판단에 영향이 없으므로 그 아래로는 내려가지 않음 (디지털 무음 뒤 회복 지연 방지)
+        self.noise_floor_db = max(self.noise_floor_db, self.threshold_db - self.noise_margin_db)
+
+    def process(self, chunk):
+        """청크 하나를 받아 실제로 보낼 청크 목록 반환 (무음이면 빈 목록 또는 keepalive 프레임)"""
+        duration = len(chunk) / (2 * self.channels * self.rate)
+        self.total_sec += duration
+        self.last_chunk_voiced = self.is_speech(chunk)
+        if self.last_chunk_voiced:
+            self._hangover_left = self.hangover_sec
+            self._since_keepalive = 0.0
+            if not self.in_speech:
+                self.in_speech = True
+                self.speech_segments += 1
+                out = list(self._preroll) + [chunk] # 말머리 보존
+                self.suppressed_sec -= self._preroll_sec # pre-roll로 보낸 분량은 억제 통계에서 제외
+                self._preroll.clear(); self._preroll_sec = 0.0
+                return out
+            return [chunk]
+        if self.in_speech and self._hangover_left > 0:
+            self._hangover_left -= duration
+            return [chunk]
+        self.in_speech = False
+        # 무음: pre-roll 버퍼에만 보관
+        self.suppressed_sec += duration
+        self._preroll.append(chunk); self._preroll_sec += duration
+        while self._preroll and self._preroll_sec - len(self._preroll[0]) / (2 * self.channels * self.rate) >= self.preroll_sec:
+            old = self._preroll.popleft()
+            self._preroll_sec -= len(old) / (2 * self.channels * self.rate)
+        if self.keepalive_sec is not None:
+            self._since_keepalive += duration
+            if self._since_keepalive >= self.keepalive_sec:
+                self._since_keepalive = 0.0
+                self.keepalive_frames += 1
+                return [bytes(len(chunk))] # 스트림 시간 초과 방지용 무음 프레임
+        return []
+
+    def stats_summary(self):
+        ratio = (self.suppressed_sec / self.total_sec * 100) if self.total_sec else 0.0
+        return (f"VAD: 전체 {self.total_sec:.1f}초 중 {self.suppressed_sec:.1f}초 전송 생략 ({ratio:.1f}%), "
+                f"음성 구간 {self.speech_segments}개, keepalive {self.keepalive_frames}회")